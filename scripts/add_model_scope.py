@@ -0,0 +1,68 @@
+"""
+Add the disease/region scope columns to an existing model_versions table
+
+The model registry resolves versions by disease and region, which needs the
+model_versions.disease_id and region_id columns that create_all only adds to
+new tables. Safe to rerun: columns and indexes are only added when missing.
+
+Usage:
+    python scripts/add_model_scope.py [--dry-run]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+# Add the project root to the path so we can import src modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.core import engine  # noqa: E402
+from src.database.models import ModelVersion  # noqa: E402
+
+SCOPE_COLUMNS = ("disease_id", "region_id")
+
+
+async def add_model_scope(dry_run: bool):
+    table = ModelVersion.__table__
+    async with engine.begin() as conn:
+        statements = []
+        for name in SCOPE_COLUMNS:
+            column = table.c[name]
+            (foreign_key,) = column.foreign_keys
+            target = foreign_key.column
+            statements.append(
+                f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {name} "
+                f"{column.type.compile(dialect=conn.dialect)} "
+                f"REFERENCES {target.table.name} ({target.name})"
+            )
+        for index in table.indexes:
+            if {column.name for column in index.columns} <= set(SCOPE_COLUMNS):
+                statements.append(
+                    str(
+                        CreateIndex(index, if_not_exists=True).compile(
+                            dialect=conn.dialect
+                        )
+                    )
+                )
+
+        for statement in statements:
+            print(statement)
+            if not dry_run:
+                await conn.execute(text(statement))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only print the statements"
+    )
+    args = parser.parse_args()
+    asyncio.run(add_model_scope(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Add the natural-key unique constraints to an existing database
+
+The loader upserts with INSERT ... ON CONFLICT on each time-series table's
+natural key, which needs a unique constraint that create_all only adds to new
+tables. Duplicate rows are removed first, keeping the most recent id.
+
+Usage:
+    python scripts/add_natural_keys.py [--dry-run]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from sqlalchemy import UniqueConstraint, text
+from sqlalchemy.schema import AddConstraint
+
+# Add the project root to the path so we can import src modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.core import engine  # noqa: E402
+from src.database.models import (  # noqa: E402
+    DigitalSignal,
+    EnvironmentalData,
+    OutbreakData,
+)
+
+
+async def add_natural_keys(dry_run: bool):
+    async with engine.begin() as conn:
+        for model in (OutbreakData, EnvironmentalData, DigitalSignal):
+            table = model.__table__
+            (constraint,) = [
+                c for c in table.constraints if isinstance(c, UniqueConstraint)
+            ]
+            exists = await conn.scalar(
+                text("SELECT 1 FROM pg_constraint WHERE conname = :name"),
+                {"name": constraint.name},
+            )
+            if exists:
+                print(f"{table.name}: {constraint.name} already present")
+                continue
+
+            matches = " AND ".join(f"a.{c.name} = b.{c.name}" for c in constraint)
+            duplicates = await conn.scalar(
+                text(
+                    f"SELECT count(*) FROM {table.name} a WHERE EXISTS ("
+                    f"SELECT 1 FROM {table.name} b WHERE {matches} AND a.id < b.id)"
+                )
+            )
+            print(f"{table.name}: {duplicates} duplicate rows")
+            if dry_run:
+                continue
+
+            await conn.execute(
+                text(
+                    f"DELETE FROM {table.name} a USING {table.name} b "
+                    f"WHERE {matches} AND a.id < b.id"
+                )
+            )
+            await conn.execute(AddConstraint(constraint))
+            print(f"{table.name}: added {constraint.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only count duplicate rows"
+    )
+    args = parser.parse_args()
+    asyncio.run(add_natural_keys(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
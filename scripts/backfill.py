@@ -0,0 +1,109 @@
+"""
+Backfill historical data from a CSV or JSON-lines file
+
+Streams the file through validation, cleaning and loading in large chunks,
+so memory stays flat and each chunk is bulk loaded with COPY into a staging
+table and merged into the target table in one statement. With --job-id the
+position after each committed chunk is saved, and rerunning an interrupted
+backfill with the same job id resumes from there.
+
+Usage:
+    python scripts/backfill.py outbreaks data/history/cases.csv
+    python scripts/backfill.py environmental weather.jsonl [--chunk-size 100000]
+    python scripts/backfill.py outbreaks cases.csv --job-id cases-2024
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+from typing import Any, Dict, Iterator
+
+# Add the project root to the path so we can import src modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.models import (  # noqa: E402
+    DigitalSignal,
+    EnvironmentalData,
+    OutbreakData,
+)
+from src.services.etl import ETLService  # noqa: E402
+
+KINDS = {
+    "outbreaks": (OutbreakData, "ingest_outbreak_data"),
+    "environmental": (EnvironmentalData, "ingest_environmental_data"),
+    "digital-signals": (DigitalSignal, "ingest_digital_signals"),
+}
+
+
+def read_records(path: str, model) -> Iterator[Dict[str, Any]]:
+    """Records from a JSON-lines file, or CSV rows typed by the model columns"""
+    with open(path, newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        columns = model.__table__.columns
+        for row in csv.DictReader(f):
+            record = {}
+            for name, value in row.items():
+                # Empty cells are left out, so upserts keep the stored value
+                if name not in columns or value == "":
+                    continue
+                python_type = columns[name].type.python_type
+                if python_type is bool:
+                    record[name] = value.strip().lower() in ("1", "true", "t", "yes")
+                elif python_type is int:
+                    record[name] = int(value)
+                elif python_type in (float, Decimal):
+                    record[name] = float(value)
+                else:
+                    # Strings, and dates (parsed by the cleaner)
+                    record[name] = value
+            yield record
+
+
+async def backfill(args):
+    from src.database.core import AsyncSessionLocal
+
+    model, method = KINDS[args.kind]
+    async with AsyncSessionLocal() as db:
+        etl = ETLService(db, chunk_size=args.chunk_size)
+        return await getattr(etl, method)(
+            read_records(args.path, model), job_id=args.job_id
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("path", help=".csv, .jsonl or .ndjson file")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument(
+        "--job-id", help="save progress under this id and resume from it"
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = asyncio.run(backfill(args))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{result.records_processed} processed, {result.records_inserted} "
+        f"inserted, {result.records_updated} updated, "
+        f"{result.records_unchanged} unchanged, "
+        f"{result.records_superseded} superseded, "
+        f"{result.records_failed} rejected in {elapsed:.1f}s"
+    )
+    for error in result.errors[:20]:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
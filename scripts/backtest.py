@@ -0,0 +1,119 @@
+"""
+Backtest an outbreak model over historical weekly data
+
+Scores one-week-ahead predictions for every disease / region series, either
+with a trained artifact or by refitting at each origin, and reports MAE,
+RMSE and alert precision / recall per series.
+
+Usage:
+    python scripts/backtest.py --source db [--model models/...ubj]
+    python scripts/backtest.py --source csv --refit [--window rolling]
+        [--window-weeks 104] [--step-weeks 13] [--output report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add the project root to the path so we can import src modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.config import get_settings  # noqa: E402
+from src.models.backtesting import WINDOWS, backtest  # noqa: E402
+from src.models.features import FEATURE_NAMES  # noqa: E402
+from src.models.predictor import OutbreakPredictor  # noqa: E402
+from src.models.training import (  # noqa: E402
+    build_training_set,
+    load_database_history,
+    load_dengai_csv,
+)
+
+DEFAULT_MODEL = (
+    Path(__file__).parent.parent / "models" / "dengue_outbreak_predictor.ubj"
+)
+
+# The training notebook's XGBoost settings
+DEFAULT_PARAMS = {"n_estimators": 100, "max_depth": 6, "learning_rate": 0.1}
+
+
+async def load_history(args):
+    from src.database.core import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        return await load_database_history(db, args.disease_id, args.region_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", choices=("csv", "db"), default="db")
+    parser.add_argument("--data-dir", default="data/raw/dengue")
+    parser.add_argument("--city", action="append", help="DengAI city (repeatable)")
+    parser.add_argument("--disease-id", type=int)
+    parser.add_argument("--region-id", type=int)
+    parser.add_argument("--model", default=str(DEFAULT_MODEL))
+    parser.add_argument(
+        "--refit", action="store_true", help="refit at each origin instead"
+    )
+    parser.add_argument(
+        "--params", type=json.loads, default=DEFAULT_PARAMS, help="refit params JSON"
+    )
+    parser.add_argument("--window", choices=WINDOWS, default="expanding")
+    parser.add_argument("--window-weeks", type=int, default=104)
+    parser.add_argument("--min-train-weeks", type=int, default=104)
+    parser.add_argument("--step-weeks", type=int, default=13)
+    parser.add_argument(
+        "--processes", type=int, default=get_settings().TRAINING_PROCESSES
+    )
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    if args.source == "csv":
+        history = load_dengai_csv(args.data_dir, args.city)
+    else:
+        history = asyncio.run(load_history(args))
+
+    if args.refit:
+        training_set = build_training_set(history, FEATURE_NAMES)
+        report = backtest(
+            training_set,
+            params=args.params,
+            window=args.window,
+            window_weeks=args.window_weeks,
+            min_train_weeks=args.min_train_weeks,
+            step_weeks=args.step_weeks,
+            processes=args.processes,
+        )
+    else:
+        predictor = OutbreakPredictor(args.model)
+        if not predictor.is_loaded():
+            parser.error(f"Could not load model from {args.model}")
+        training_set = build_training_set(history, predictor.feature_columns)
+        report = backtest(
+            training_set,
+            predictor=predictor,
+            min_train_weeks=args.min_train_weeks,
+            step_weeks=args.step_weeks,
+        )
+
+    print(
+        f"{'series':<16}{'weeks':>8}{'MAE':>10}{'RMSE':>10}"
+        f"{'precision':>11}{'recall':>9}"
+    )
+    for row in [*report.series, report.overall]:
+        name = getattr(row, "series", "overall")
+        print(
+            f"{name:<16}{row.weeks:>8}{row.mae:>10.2f}{row.rmse:>10.2f}"
+            f"{row.precision:>11.1%}{row.recall:>9.1%}"
+        )
+    print(f"\n{report.origins} origins in {report.elapsed_seconds:.1f}s")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report.to_dict(), indent=2))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
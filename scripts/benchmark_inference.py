@@ -0,0 +1,103 @@
+"""
+Inference micro-benchmark
+
+Compares single-request latency of the original pandas path, the sklearn
+estimator backend and the direct booster backend.
+
+Usage:
+    python scripts/benchmark_inference.py [--iterations 2000] [--model PATH]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path so we can import src modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.backends import EstimatorBackend  # noqa: E402
+from src.models.features import FeatureVectorBuilder  # noqa: E402
+from src.models.predictor import OutbreakPredictor  # noqa: E402
+
+DEFAULT_MODEL = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "models",
+    "dengue_outbreak_predictor.pkl",
+)
+
+SAMPLE = {
+    "temp_avg": 27.5,
+    "temp_min": 23.0,
+    "temp_max": 32.0,
+    "precipitation_mm": 45.0,
+    "humidity_percent": 78.0,
+    "weekofyear": 32,
+    "previous_cases": [12, 18, 25, 31],
+}
+
+
+def pandas_predict(predictor: OutbreakPredictor, **kwargs) -> float:
+    """The original dict -> DataFrame -> reorder -> estimator path"""
+    df = pd.DataFrame([predictor.create_features(**kwargs)])
+    for col in predictor.feature_columns:
+        if col not in df.columns:
+            df[col] = 0.0
+    df = df[predictor.feature_columns]
+    return float(predictor.model.predict(df)[0])
+
+
+def time_calls(fn, iterations: int, warmup: int = 50) -> np.ndarray:
+    for _ in range(warmup):
+        fn()
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    args = parser.parse_args()
+
+    predictor = OutbreakPredictor(args.model)
+    if not predictor.is_loaded():
+        sys.exit(f"Could not load model from {args.model}")
+
+    estimator = EstimatorBackend(predictor.model, predictor.feature_columns)
+    builder = FeatureVectorBuilder(predictor.feature_columns)
+
+    def estimator_predict():
+        row = builder.build_row(**SAMPLE)
+        return float(estimator.predict(row.reshape(1, -1))[0])
+
+    cases = [
+        ("pandas (original)", lambda: pandas_predict(predictor, **SAMPLE)),
+        ("estimator backend", estimator_predict),
+        (
+            f"predictor ({predictor.get_model_info()['inference_backend']})",
+            lambda: predictor.predict(**SAMPLE),
+        ),
+    ]
+
+    print(f"{'path':<34}{'p50 (us)':>12}{'p99 (us)':>12}{'mean (us)':>12}")
+    baseline_p50 = None
+    for name, fn in cases:
+        timings = time_calls(fn, args.iterations)
+        p50, p99 = np.percentile(timings, [50, 99])
+        baseline_p50 = baseline_p50 or p50
+        print(
+            f"{name:<34}{p50:>12.1f}{p99:>12.1f}{timings.mean():>12.1f}"
+            f"   x{baseline_p50 / p50:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
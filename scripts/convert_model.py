@@ -0,0 +1,32 @@
+"""
+Convert a pickled model into the native artifact format
+
+Writes an XGBoost UBJSON booster plus a ``.meta.json`` sidecar next to it.
+
+Usage:
+    python scripts/convert_model.py models/dengue_outbreak_predictor.pkl [--out PATH]
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the path so we can import src modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.artifacts import convert_pickle_artifact, sidecar_path  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("pickle_path", help="Pickled model dict to convert")
+    parser.add_argument("--out", help="Destination .ubj path")
+    args = parser.parse_args()
+
+    path = convert_pickle_artifact(args.pickle_path, args.out)
+    print(f"Booster:  {path}")
+    print(f"Metadata: {sidecar_path(path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Inference sidecar server
+
+Owns the models for every API worker on the host and serves predictions
+over a Unix socket. Start it before uvicorn and run the API with
+INFERENCE_MODE=sidecar.
+
+Usage:
+    python scripts/inference_server.py [--socket PATH] [--preload PATH ...]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+# Add the project root to the path so we can import src modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.sidecar import InferenceServer  # noqa: E402
+
+DEFAULT_MODEL = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "models",
+    "dengue_outbreak_predictor.ubj",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--socket", default=None, help="defaults to settings")
+    parser.add_argument(
+        "--preload",
+        nargs="*",
+        default=[DEFAULT_MODEL],
+        help="models to load before accepting connections",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = InferenceServer(socket_path=args.socket)
+    try:
+        asyncio.run(server.serve_forever(preload=args.preload))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(server.socket_path):
+            os.unlink(server.socket_path)
+
+
+if __name__ == "__main__":
+    main()
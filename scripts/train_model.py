@@ -0,0 +1,119 @@
+"""
+Train an outbreak model with rolling-origin cross-validation
+
+Builds the predictor's feature layout from the DengAI CSVs or the database,
+compares hyperparameter candidates across a process pool and writes a native
+artifact, optionally recording it as a ModelVersion.
+
+Usage:
+    python scripts/train_model.py --source csv [--data-dir data/raw/dengue]
+        [--city sj]
+    python scripts/train_model.py --source db [--disease-id 1] [--region-id 4]
+        [--register]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+# Add the project root to the path so we can import src modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.config import get_settings  # noqa: E402
+from src.models.training import (  # noqa: E402
+    build_training_set,
+    load_database_history,
+    load_dengai_csv,
+    register_model_version,
+    train_model,
+)
+
+
+async def load_history(args):
+    from src.database.core import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        return await load_database_history(db, args.disease_id, args.region_id)
+
+
+async def register(args, result):
+    from src.database.core import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        return await register_model_version(
+            db,
+            result,
+            model_name=args.name,
+            disease_id=args.disease_id,
+            region_id=args.region_id,
+            activate=not args.inactive,
+        )
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", choices=("csv", "db"), default="csv")
+    parser.add_argument("--data-dir", default="data/raw/dengue")
+    parser.add_argument("--city", action="append", help="DengAI city (repeatable)")
+    parser.add_argument("--disease-id", type=int)
+    parser.add_argument("--region-id", type=int)
+    parser.add_argument("--name", default="dengue_outbreak_predictor")
+    parser.add_argument("--out", help="Destination .ubj path")
+    parser.add_argument("--folds", type=int, default=settings.TRAINING_CV_FOLDS)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.TRAINING_PROCESSES,
+        help="cross-validation processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--register", action="store_true", help="record a ModelVersion row"
+    )
+    parser.add_argument(
+        "--inactive", action="store_true", help="register without activating"
+    )
+    args = parser.parse_args()
+
+    if args.source == "csv":
+        history = load_dengai_csv(args.data_dir, args.city)
+        data_source = "DrivenData (" + ", ".join(args.city or ["all cities"]) + ")"
+    else:
+        history = asyncio.run(load_history(args))
+        data_source = "Database"
+
+    training_set = build_training_set(history)
+    print(
+        f"Training rows: {len(training_set)} from "
+        f"{history['series'].nunique()} series"
+    )
+
+    out = args.out or os.path.join(
+        settings.TRAINING_ARTIFACT_DIR,
+        f"{args.name}-{datetime.now():%Y%m%d%H%M%S}.ubj",
+    )
+    result = train_model(
+        training_set,
+        out,
+        folds=args.folds,
+        processes=args.processes,
+        data_source=data_source,
+    )
+
+    print(f"\n{'params':<64}{'MAE':>8}{'RMSE':>8}{'R2':>8}")
+    for score in result.candidates:
+        print(
+            f"{str(score.params):<64}{score.mae:>8.2f}{score.rmse:>8.2f}"
+            f"{score.r2:>8.3f}"
+        )
+    print(f"\nArtifact: {result.artifact_path} (version {result.model_version})")
+
+    if args.register:
+        version = asyncio.run(register(args, result))
+        print(f"Registered model version {version.id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,20 +8,33 @@ from .routes import health_router, api_router
 from .schemas import (
     PredictionRequest,
     PredictionResponse,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
     ModelStatsResponse,
     HealthResponse,
     RootResponse,
 )
-from .dependencies import get_model_service, init_model_service
+from .dependencies import (
+    get_model_service,
+    init_model_service,
+    get_model_registry,
+    init_model_registry,
+    init_feature_store,
+)
 
 __all__ = [
     "health_router",
     "api_router",
     "PredictionRequest",
     "PredictionResponse",
+    "BatchPredictionRequest",
+    "BatchPredictionResponse",
     "ModelStatsResponse",
     "HealthResponse",
     "RootResponse",
     "get_model_service",
     "init_model_service",
+    "get_model_registry",
+    "init_model_registry",
+    "init_feature_store",
 ]
@@ -6,6 +6,7 @@ Shared dependencies, utilities, and dependency injection for FastAPI routes.
 
 from pathlib import Path
 from typing import Annotated
+import logging
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -13,13 +14,16 @@ from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from ..models.feature_store import get_feature_store
+from ..models.registry import ModelRegistry
 from ..models.service import ModelService
 from ..core.config import get_settings
-from ..database.core import get_db
+from ..database.core import AsyncSessionLocal, get_db
 from ..database.models import User
 from .schemas import TokenData
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
@@ -30,14 +34,20 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login
 
 # Global model service instance
 _model_service: ModelService = None
+_model_registry: ModelRegistry = None
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
 
 
 def get_model_path() -> Path:
     """Get the path to the trained model file"""
-    # Model is stored in project root /models folder
-    return (
-        Path(__file__).parent.parent.parent / "models" / "dengue_outbreak_predictor.pkl"
-    )
+    # Model is stored in project root /models folder. Prefer the native
+    # artifact and fall back to the notebook's pickle if it was not converted.
+    models_dir = PROJECT_ROOT / "models"
+    native = models_dir / "dengue_outbreak_predictor.ubj"
+    if native.exists():
+        return native
+    return models_dir / "dengue_outbreak_predictor.pkl"
 
 
 def init_model_service() -> ModelService:
@@ -45,10 +55,18 @@ def init_model_service() -> ModelService:
     global _model_service
     if _model_service is None:
         model_path = get_model_path()
-        _model_service = ModelService(str(model_path))
+        _model_service = ModelService(
+            str(model_path), feature_store=get_feature_store()
+        )
     return _model_service
 
 
+def shutdown_model_service():
+    """Stop the model service's inference worker processes"""
+    if _model_service is not None:
+        _model_service.shutdown()
+
+
 def get_model_service() -> ModelService:
     """
     Dependency injection for model service.
@@ -63,6 +81,37 @@ def get_model_service() -> ModelService:
     return _model_service
 
 
+def init_model_registry() -> ModelRegistry:
+    """Initialize the global model registry around the default model service"""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry(get_model_service(), base_dir=PROJECT_ROOT)
+    return _model_registry
+
+
+def get_model_registry() -> ModelRegistry:
+    """Dependency injection for the per-disease / per-region model registry"""
+    if _model_registry is None:
+        init_model_registry()
+    return _model_registry
+
+
+async def init_feature_store() -> int:
+    """
+    Fill the online feature store from the database at startup
+
+    Returns:
+        Rows loaded; 0 if the database could not be read, in which case the
+        store fills up as the ETL loader writes rows
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            return await get_feature_store().load(db)
+    except Exception as e:
+        logger.warning(f"Feature store not preloaded: {e}")
+        return 0
+
+
 # ============================================================================
 # Utility Functions
 # ============================================================================
@@ -7,6 +7,7 @@ Aggregates all route modules for easy importing.
 from fastapi import APIRouter
 
 from .health import router as health_router
+from .metrics import router as metrics_router
 from .predictions import router as predictions_router
 from .model import router as model_router
 from .auth import router as auth_router
@@ -29,4 +30,4 @@ api_router.include_router(diseases_router)
 api_router.include_router(regions_router)
 api_router.include_router(analytics_router)
 
-__all__ = ["health_router", "api_router"]
+__all__ = ["health_router", "metrics_router", "api_router"]
@@ -4,12 +4,14 @@ Dashboard & Analytics Routes
 Endpoints for dashboard data and analytics.
 """
 
+import math
 from datetime import datetime
 from typing import Annotated, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, distinct
 
+from ..dependencies import get_model_registry
 from ...database.core import get_db
 from ...database.models import (
     Alert,
@@ -18,6 +20,9 @@ from ...database.models import (
     GeographicRegion,
     Disease,
 )
+from ...models.executor import ExecutorSaturatedError
+from ...models.registry import ModelRegistry
+from ...services.forecasting import ForecastService
 from ..schemas import (
     DashboardOverview,
     MapDataResponse,
@@ -237,8 +242,14 @@ async def generate_predictions(
     region_id: int,
     prediction_horizon_days: int = Query(DEFAULT_PREDICTION_HORIZON, ge=1, le=30),
     db: Annotated[AsyncSession, Depends(get_db)] = None,
+    registry: ModelRegistry = Depends(get_model_registry),  # noqa: B008
 ):
-    """Trigger prediction generation for a disease-region pair"""
+    """
+    Forecast a disease-region pair and store the predictions
+
+    The horizon is rounded up to whole weeks; each week is forecast from the
+    previous week's prediction, so a 30-day horizon yields 5 weekly points.
+    """
     disease = await db.get(Disease, disease_id)
     if not disease:
         raise HTTPException(
@@ -253,10 +264,31 @@ async def generate_predictions(
             detail=f"Region with ID {region_id} not found",
         )
 
+    horizon_weeks = math.ceil(prediction_horizon_days / 7)
+    try:
+        result = await ForecastService(db, registry).run(
+            horizon_weeks, disease_id=disease_id, region_id=region_id
+        )
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+
+    if not result.series_forecast:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "Not enough history to forecast: need 4 weeks of outbreak data "
+                "and weather data for the region, and a loaded model"
+            ),
+        )
+
     return {
-        "status": "queued",
+        "status": "completed",
         "disease_id": disease_id,
         "region_id": region_id,
         "prediction_horizon_days": prediction_horizon_days,
-        "message": "Prediction job queued (requires Celery worker)",
+        "horizon_weeks": horizon_weeks,
+        "predictions_saved": result.predictions_saved,
+        "predictions": result.predictions,
     }
@@ -29,7 +29,9 @@ async def root(
         endpoints={
             "docs": "/docs",
             "health": "/health",
+            "metrics": "/metrics",
             "predict": "/api/v1/predict",
+            "predict_batch": "/api/v1/predict/batch",
             "model_stats": "/api/v1/model/stats",
             "model_reload": "/api/v1/model/reload",
         },
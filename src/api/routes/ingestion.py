@@ -58,6 +58,9 @@ async def ingest_outbreak_data(
         records_processed=result.records_processed,
         records_inserted=result.records_inserted,
         records_updated=result.records_updated,
+        records_unchanged=result.records_unchanged,
+        records_superseded=result.records_superseded,
+        records_failed=result.records_failed,
         errors=result.errors,
     )
 
@@ -91,6 +94,9 @@ async def ingest_environmental_data(
         records_processed=result.records_processed,
         records_inserted=result.records_inserted,
         records_updated=result.records_updated,
+        records_unchanged=result.records_unchanged,
+        records_superseded=result.records_superseded,
+        records_failed=result.records_failed,
         errors=result.errors,
     )
 
@@ -132,5 +138,8 @@ async def ingest_digital_signals(
         records_processed=result.records_processed,
         records_inserted=result.records_inserted,
         records_updated=result.records_updated,
+        records_unchanged=result.records_unchanged,
+        records_superseded=result.records_superseded,
+        records_failed=result.records_failed,
         errors=result.errors,
     )
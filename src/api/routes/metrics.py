@@ -0,0 +1,75 @@
+"""
+Metrics Routes
+
+Prometheus scrape endpoint for inference latency, request counts and
+batch sizes.
+"""
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..dependencies import get_model_registry, get_model_service
+from ...core.metrics import REGISTRY
+from ...models.registry import ModelRegistry
+from ...models.service import ModelService
+
+router = APIRouter(tags=["Monitoring"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+MODEL_LOADED = REGISTRY.gauge(
+    "epidemiology_model_loaded", "Whether the default model is loaded (1) or not (0)"
+)
+EXECUTOR_STATE = REGISTRY.gauge(
+    "epidemiology_executor_state",
+    "Inference executor load and totals",
+    labelnames=("pool", "field"),
+)
+CACHE_STATE = REGISTRY.gauge(
+    "epidemiology_prediction_cache_state",
+    "Prediction cache size and totals",
+    labelnames=("field",),
+)
+FEATURE_DRIFT = REGISTRY.gauge(
+    "epidemiology_feature_drift_psi",
+    "Population stability index of each input feature against training data",
+    labelnames=("feature",),
+)
+RESIDENT_MODELS = REGISTRY.gauge(
+    "epidemiology_registry_resident_models",
+    "Disease / region models currently held in memory",
+)
+
+
+def _collect(service: ModelService, registry: ModelRegistry):
+    """Refresh gauges that mirror the service's own stats"""
+    MODEL_LOADED.set(1 if service.is_model_loaded() else 0)
+
+    for pool, stats in service.get_executor_stats().items():
+        for field in ("running", "queue_depth", "submitted", "completed", "rejected"):
+            # The process pool reports slots and batches instead
+            if field in stats:
+                EXECUTOR_STATE.set(stats[field], pool=pool, field=field)
+
+    cache = service.get_cache_stats()
+    for field in ("size", "hits", "misses", "evictions", "expirations"):
+        CACHE_STATE.set(cache[field], field=field)
+
+    drift = service.get_drift_stats() or {}
+    for feature, stats in drift.get("features", {}).items():
+        if "psi" in stats:
+            FEATURE_DRIFT.set(stats["psi"], feature=feature)
+
+    RESIDENT_MODELS.set(registry.get_stats()["resident_models"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(
+    service: ModelService = Depends(get_model_service),  # noqa: B008
+    registry: ModelRegistry = Depends(get_model_registry),  # noqa: B008
+):
+    """
+    Prometheus metrics in the text exposition format
+    """
+    _collect(service, registry)
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
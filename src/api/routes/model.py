@@ -2,18 +2,22 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 
 from ..schemas import ModelStatsResponse, ModelReloadResponse
-from ..dependencies import get_model_service
+from ..dependencies import get_model_registry, get_model_service
+from ...models.executor import ExecutorSaturatedError
+from ...models.registry import ModelRegistry
 from ...models.service import ModelService
 
 router = APIRouter(prefix="/model", tags=["Model"])
 
 # Define common dependency outside functions to avoid B008 warning
 MODEL_SERVICE_DEPENDENCY = Depends(get_model_service)  # noqa: B008
+MODEL_REGISTRY_DEPENDENCY = Depends(get_model_registry)  # noqa: B008
 
 
 @router.get("/stats", response_model=ModelStatsResponse)
 async def get_model_stats(
     service: ModelService = MODEL_SERVICE_DEPENDENCY,
+    registry: ModelRegistry = MODEL_REGISTRY_DEPENDENCY,
 ):
     """
     Get model performance statistics and metadata.
@@ -25,23 +29,30 @@ async def get_model_stats(
     - Outbreak threshold
     - Performance metrics (MAE, RMSE, R²)
     - Data source used for training
+    - Input drift: per-feature PSI / KS against the training snapshot
+    - Resident per-disease / per-region models
     """
     stats = service.get_model_statistics()
-    return ModelStatsResponse(**stats)
+    return ModelStatsResponse(**stats, registry=registry.get_stats())
 
 
 @router.post("/reload", response_model=ModelReloadResponse)
 async def reload_model(
     service: ModelService = MODEL_SERVICE_DEPENDENCY,
+    registry: ModelRegistry = MODEL_REGISTRY_DEPENDENCY,
 ):
     """
     Reload the model from disk.
 
     Use this after retraining the model in the notebook to load
-    the updated version without restarting the server.
+    the updated version without restarting the server. Loading runs on a
+    dedicated thread, so predictions and health checks keep being served.
+    Cached disease / region model resolutions are dropped as well, so newly
+    activated model versions take effect on the next prediction.
     """
     try:
-        success = service.reload_model()
+        registry.invalidate()
+        success = await service.reload_model_async()
 
         if success:
             return ModelReloadResponse(
@@ -52,6 +63,14 @@ async def reload_model(
                 status_code=500,
                 detail="Failed to reload model. Check if model file exists.",
             )
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError:
+        raise HTTPException(
+            status_code=503,
+            detail="A model reload is already in progress",
+            headers={"Retry-After": "5"},
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Reload failed: {str(e)}")
 
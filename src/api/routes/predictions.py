@@ -4,20 +4,50 @@ Prediction Routes
 Endpoints for making outbreak predictions.
 """
 
+import time
+from typing import Annotated, Dict, List, Optional, Tuple
+
 from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..schemas import PredictionRequest, PredictionResponse
-from ..dependencies import get_model_service
+from ..schemas import (
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+    ExplainRequest,
+    ExplainResponse,
+    PredictionRequest,
+    PredictionResponse,
+)
+from ..dependencies import get_model_registry
+from ...core.metrics import (
+    INFERENCE_STAGE_SECONDS,
+    PREDICTION_BATCH_SIZE,
+    track_requests,
+)
+from ...database.core import get_db
+from ...models.executor import ExecutorSaturatedError
+from ...models.registry import ModelRegistry, ModelUnavailableError
 from ...models.service import ModelService
 
 router = APIRouter(prefix="/predict", tags=["Predictions"])
 
+MODEL_NOT_LOADED_DETAIL = (
+    "Model not loaded. Please train and save a model first by running the notebook."
+)
+
+
+def _model_version(service: ModelService) -> str:
+    predictor = service.predictor
+    return (predictor.version if predictor is not None else None) or "unknown"
+
 
 @router.post("", response_model=PredictionResponse)
+@track_requests("predict")
 async def predict_outbreak(
     request: PredictionRequest,
-    service: ModelService = Depends(get_model_service),  # noqa: B008
+    db: Annotated[AsyncSession, Depends(get_db)],
+    registry: ModelRegistry = Depends(get_model_registry),  # noqa: B008
 ):
     """
     Predict dengue outbreak risk based on weather and historical data.
@@ -30,6 +60,11 @@ async def predict_outbreak(
     - **humidity_percent**: Relative humidity percentage
     - **weekofyear**: Week number (1-53)
     - **previous_cases**: List of case counts from previous weeks (1-4 weeks)
+    - **disease_id**, **region_id**: Optional scope used to pick the active
+      disease/region specific model (falls back to the default model when the
+      scope has none; 503 if its model cannot be loaded)
+    - **year**: Optional ISO year of `weekofyear`; scoped requests only use
+      stored history for the current week unless it is given
 
     **Returns:**
     - Predicted case count
@@ -37,17 +72,12 @@ async def predict_outbreak(
     - Confidence score
     - Outbreak threshold
     """
-    if not service.is_model_loaded():
-        raise HTTPException(
-            status_code=503,
-            detail=(
-                "Model not loaded. Please train and save a model first "
-                "by running the notebook."
-            ),
-        )
-
     try:
-        prediction = service.predict_outbreak(
+        service = await registry.get_service(db, request.disease_id, request.region_id)
+        if not service.is_model_loaded():
+            raise HTTPException(status_code=503, detail=MODEL_NOT_LOADED_DETAIL)
+
+        prediction = await service.predict_outbreak_async(
             temp_avg=request.temp_avg,
             temp_min=request.temp_min,
             temp_max=request.temp_max,
@@ -55,18 +85,167 @@ async def predict_outbreak(
             humidity_percent=request.humidity_percent,
             weekofyear=request.weekofyear,
             previous_cases=request.previous_cases,
+            disease_id=request.disease_id,
+            region_id=request.region_id,
+            year=request.year,
         )
 
-        return PredictionResponse(
-            predicted_cases=prediction["predicted_cases"],
-            risk_level=prediction["risk_level"],
-            confidence=prediction["confidence"],
-            outbreak_threshold=prediction["threshold"],
-            features_used=prediction["features_used"],
-            timestamp=datetime.now(),
+        with INFERENCE_STAGE_SECONDS.time(
+            stage="serialize", model_version=_model_version(service)
+        ):
+            return PredictionResponse(
+                predicted_cases=prediction["predicted_cases"],
+                risk_level=prediction["risk_level"],
+                confidence=prediction["confidence"],
+                outbreak_threshold=prediction["threshold"],
+                features_used=prediction["features_used"],
+                timestamp=datetime.now(),
+            )
+
+    except HTTPException:
+        raise
+    except ModelUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+
+@router.post("/batch", response_model=BatchPredictionResponse)
+@track_requests("predict_batch")
+async def predict_outbreak_batch(
+    request: BatchPredictionRequest,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    registry: ModelRegistry = Depends(get_model_registry),  # noqa: B008
+):
+    """
+    Predict dengue outbreak risk for many inputs at once.
+
+    Rows are grouped by disease/region model and each group is scored with a
+    single model call, so this is the preferred endpoint for scoring jobs and
+    dashboards covering many region-weeks.
+
+    **Parameters:**
+    - **requests**: List of prediction inputs (same fields as `/predict`)
+
+    **Returns:**
+    - One prediction per input, in input order
+    """
+    try:
+        PREDICTION_BATCH_SIZE.observe(len(request.requests), source="request")
+        groups: Dict[Tuple[Optional[int], Optional[int]], List[int]] = {}
+        for i, row in enumerate(request.requests):
+            groups.setdefault((row.disease_id, row.region_id), []).append(i)
+
+        predictions: List[Optional[dict]] = [None] * len(request.requests)
+        for (disease_id, region_id), indices in groups.items():
+            service = await registry.get_service(db, disease_id, region_id)
+            if not service.is_model_loaded():
+                raise HTTPException(status_code=503, detail=MODEL_NOT_LOADED_DETAIL)
+
+            scored = await service.predict_outbreak_batch_async(
+                [request.requests[i].model_dump() for i in indices]
+            )
+            for i, prediction in zip(indices, scored):
+                predictions[i] = prediction
 
+        started = time.perf_counter()
+        timestamp = datetime.now()
+        response = BatchPredictionResponse(
+            predictions=[
+                PredictionResponse(
+                    predicted_cases=prediction["predicted_cases"],
+                    risk_level=prediction["risk_level"],
+                    confidence=prediction["confidence"],
+                    outbreak_threshold=prediction["threshold"],
+                    features_used=prediction["features_used"],
+                    timestamp=timestamp,
+                )
+                for prediction in predictions
+            ],
+            count=len(predictions),
+            timestamp=timestamp,
+        )
+        INFERENCE_STAGE_SECONDS.observe(
+            time.perf_counter() - started,
+            stage="serialize",
+            model_version=_model_version(service) if len(groups) == 1 else "mixed",
+        )
+        return response
+
+    except HTTPException:
+        raise
+    except ModelUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+
+@router.post("/explain", response_model=ExplainResponse)
+@track_requests("explain")
+async def explain_predictions(
+    request: ExplainRequest,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    registry: ModelRegistry = Depends(get_model_registry),  # noqa: B008
+):
+    """
+    Explain why inputs were scored the way they were.
+
+    Returns each feature's contribution to the predicted case count (the
+    booster's native SHAP values), for one or many inputs in a single call.
+    Send a whole dashboard's regions together rather than one call per region.
+
+    **Parameters:**
+    - **requests**: List of prediction inputs (same fields as `/predict`)
+    - **top_k**: Only return the largest contributions per input
+
+    **Returns:**
+    - One explanation per input, in input order: predicted cases, risk level,
+      the model's base value and contributions sorted by magnitude
+    """
+    try:
+        groups: Dict[Tuple[Optional[int], Optional[int]], List[int]] = {}
+        for i, row in enumerate(request.requests):
+            groups.setdefault((row.disease_id, row.region_id), []).append(i)
+
+        explanations: List[Optional[dict]] = [None] * len(request.requests)
+        for (disease_id, region_id), indices in groups.items():
+            service = await registry.get_service(db, disease_id, region_id)
+            if not service.is_model_loaded():
+                raise HTTPException(status_code=503, detail=MODEL_NOT_LOADED_DETAIL)
+
+            explained = await service.explain_async(
+                [request.requests[i].model_dump() for i in indices], request.top_k
+            )
+            for i, explanation in zip(indices, explained):
+                explanations[i] = explanation
+
+        return ExplainResponse(
+            explanations=explanations,
+            count=len(explanations),
+            timestamp=datetime.now(),
+        )
+
+    except HTTPException:
+        raise
+    except ModelUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Explanation failed: {str(e)}")
@@ -373,7 +373,7 @@ class PredictionResponse(BaseModel):
     risk_level: str
     confidence: float
     outbreak_threshold: float
-    features_used: Dict[str, Any]
+    features_used: int
     timestamp: datetime
 
 
@@ -385,6 +385,47 @@ class PredictionRequest(BaseModel):
     humidity_percent: float
     weekofyear: int = Field(..., ge=1, le=53)
     previous_cases: List[int] = Field(..., min_length=1, max_length=4)
+    # Optional scope used to pick a disease/region specific model
+    disease_id: Optional[int] = None
+    region_id: Optional[int] = None
+    # ISO year of weekofyear; lets scoped requests for weeks other than the
+    # current one use the feature store's history for that week
+    year: Optional[int] = Field(None, ge=1, le=9999)
+
+
+class BatchPredictionRequest(BaseModel):
+    requests: List[PredictionRequest] = Field(..., min_length=1, max_length=10000)
+
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+    count: int
+    timestamp: datetime
+
+
+class ExplainRequest(BaseModel):
+    requests: List[PredictionRequest] = Field(..., min_length=1, max_length=1000)
+    # Largest contributions returned per explanation; all features if unset
+    top_k: Optional[int] = Field(None, ge=1)
+
+
+class FeatureContribution(BaseModel):
+    feature: str
+    value: float
+    contribution: float
+
+
+class PredictionExplanation(BaseModel):
+    predicted_cases: float
+    risk_level: str
+    base_value: float
+    contributions: List[FeatureContribution]
+
+
+class ExplainResponse(BaseModel):
+    explanations: List[PredictionExplanation]
+    count: int
+    timestamp: datetime
 
 
 # =============================================================================
@@ -446,6 +487,8 @@ class ModelVersionBase(BaseModel):
     model_name: str = Field(..., max_length=255)
     model_version: str = Field(..., max_length=50)
     model_type: str = Field(..., max_length=100)
+    disease_id: Optional[int] = None
+    region_id: Optional[int] = None
     training_date: datetime
     training_data_range_start: Optional[datetime] = None
     training_data_range_end: Optional[datetime] = None
@@ -475,6 +518,10 @@ class ModelStatsResponse(BaseModel):
     metrics: Optional[Dict[str, Any]] = None
     data_source: Optional[str] = None
     message: Optional[str] = None
+    executor: Optional[Dict[str, Any]] = None
+    cache: Optional[Dict[str, Any]] = None
+    drift: Optional[Dict[str, Any]] = None
+    registry: Optional[Dict[str, Any]] = None
 
 
 class ModelReloadResponse(BaseModel):
@@ -536,6 +583,9 @@ class IngestionResponse(BaseModel):
     records_processed: int
     records_inserted: int
     records_updated: int
+    records_unchanged: int = 0
+    records_superseded: int = 0
+    records_failed: int = 0
     errors: List[str] = []
     timestamp: datetime = Field(default_factory=datetime.now)
 
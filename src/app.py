@@ -1,10 +1,13 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import SQLAlchemyError
 
 # Import from current package's api
-from .api.routes import api_router, health_router  # Adjusted import
+from .api.routes import api_router, health_router, metrics_router  # Adjusted import
+from .api.dependencies import init_feature_store, shutdown_model_service
 from .core.exceptions import (  # Relative import
     general_exception_handler,
     http_exception_handler,
@@ -13,6 +16,14 @@ from .core.exceptions import (  # Relative import
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Preload rolling feature history and stop inference workers on exit"""
+    await init_feature_store()
+    yield
+    shutdown_model_service()
+
+
 def create_app() -> FastAPI:
     """Application factory - creates and configures the FastAPI app"""
 
@@ -25,6 +36,7 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
+        lifespan=lifespan,
     )
 
     # Register custom exception handlers
@@ -43,5 +55,6 @@ def create_app() -> FastAPI:
     )
     # Include routers
     app.include_router(health_router)  # Root level: /, /health
+    app.include_router(metrics_router)  # Root level: /metrics
     app.include_router(api_router)  # API level: /api/v1/...
     return app
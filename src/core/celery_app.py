@@ -41,6 +41,10 @@ def make_celery():
         task_track_started=True,
         task_time_limit=3600,
         worker_prefetch_multiplier=1,
+        # Retrains fan out over a process pool of their own; serve this queue
+        # with a solo worker: celery -A src.core.celery_app worker -Q training
+        # --pool solo
+        task_routes={"tasks.retrain_model": {"queue": "training"}},
         beat_schedule={
             "ingest-daily-weather": {
                 "task": "tasks.ingest_weather_data",
@@ -54,6 +58,10 @@ def make_celery():
                 "task": "tasks.generate_predictions",
                 "schedule": timedelta(days=1),
             },
+            "retrain-model": {
+                "task": "tasks.retrain_model",
+                "schedule": timedelta(days=settings.MODEL_RETRAIN_INTERVAL_DAYS),
+            },
         },
     )
 
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -20,6 +21,72 @@ class Settings(BaseSettings):
     # Redis/Celery
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # Inference
+    # Threads per XGBoost call; 1 is fastest for the small batches we serve
+    INFERENCE_NTHREADS: int = 1
+    # Concurrent /predict calls are micro-batched up to this size or window
+    PREDICTION_BATCH_MAX_SIZE: int = 64
+    PREDICTION_BATCH_WINDOW_MS: float = 2.0
+    # Inference thread pool; calls beyond workers + queue are rejected with 503
+    INFERENCE_MAX_WORKERS: int = 4
+    INFERENCE_MAX_QUEUE: int = 256
+    # "process" scores batches on worker processes fed through shared memory
+    # (0 processes = one per CPU); keep INFERENCE_MAX_WORKERS at least as high.
+    # "sidecar" sends them to scripts/inference_server.py over a Unix socket
+    INFERENCE_MODE: str = "thread"
+    INFERENCE_PROCESSES: int = 0
+    INFERENCE_PROCESS_MAX_ROWS: int = 1024
+    INFERENCE_SOCKET_PATH: str = "/tmp/epidemiology-inference.sock"
+    # Comma-separated directories, relative to the project root, the sidecar
+    # may load models from (TRAINING_ARTIFACT_DIR is always allowed)
+    INFERENCE_MODEL_DIRS: str = "models"
+    INFERENCE_SIDECAR_TIMEOUT_SECONDS: float = 5.0
+    # Prediction cache; size 0 disables it. Set decimals to round weather
+    # inputs before keying (e.g. 1 for tenths)
+    PREDICTION_CACHE_SIZE: int = 10000
+    PREDICTION_CACHE_TTL_SECONDS: float = 300.0
+    PREDICTION_CACHE_DECIMALS: Optional[int] = None
+    # Feature-contribution explanations cached per model and feature vector
+    EXPLANATION_CACHE_SIZE: int = 5000
+    # Input drift monitoring against the artifact's training snapshot; older
+    # rows are down-weighted once the window is reached
+    DRIFT_MONITOR_ENABLED: bool = True
+    DRIFT_WINDOW_ROWS: int = 50000
+    DRIFT_MIN_ROWS: int = 200
+    # Per-disease/region models resolved from model_versions
+    MODEL_REGISTRY_MAX_RESIDENT_MB: int = 512
+    MODEL_REGISTRY_RESOLVE_TTL_SECONDS: float = 30.0
+    # Weeks of weather / case history kept in memory per region for features
+    FEATURE_STORE_WEEKS: int = 8
+    # Weeks ahead produced by the scheduled forecast job
+    FORECAST_HORIZON_WEEKS: int = 4
+
+    # Training
+    # Cross-validation worker processes (0 = one per CPU)
+    TRAINING_PROCESSES: int = 0
+    TRAINING_CV_FOLDS: int = 5
+    # Where scheduled retrains write artifacts, relative to the project root
+    TRAINING_ARTIFACT_DIR: str = "models/trained"
+    # Days between scheduled full retrains from the database
+    MODEL_RETRAIN_INTERVAL_DAYS: int = 7
+
+    # ETL
+    # Batches of at least this many records are validated and cleaned
+    # column-wise with NumPy instead of record by record
+    ETL_COLUMNAR_MIN_RECORDS: int = 1000
+    # Records per chunk when ingestion streams through the pipeline and loader
+    ETL_CHUNK_SIZE: int = 5000
+    # Error messages kept per ingestion; further failures are only counted
+    ETL_MAX_ERRORS: int = 1000
+    # Rows per multi-row INSERT ... ON CONFLICT statement in the loader
+    ETL_UPSERT_BATCH_ROWS: int = 1000
+    # Batches of at least this many rows are loaded with COPY into a staging
+    # table and merged in one statement (0 disables it)
+    ETL_COPY_MIN_ROWS: int = 20000
+    # Rows per savepoint within a load transaction; a failing savepoint is
+    # split until the rejected rows are isolated
+    ETL_SAVEPOINT_ROWS: int = 50000
+
     # External APIs
     NOAA_API_KEY: str = ""
 
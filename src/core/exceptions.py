@@ -22,6 +22,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         content=ErrorResponse(
             detail=str(exc.detail), error_code="HTTP_ERROR"
         ).model_dump(mode="json"),
+        headers=getattr(exc, "headers", None),
     )
 
 
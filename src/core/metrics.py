@@ -0,0 +1,291 @@
+"""
+Metrics
+
+Minimal in-process counters, gauges and histograms rendered in the
+Prometheus text exposition format, so /metrics needs no client library.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from fastapi import HTTPException
+
+# Seconds; spans sub-millisecond model calls up to slow batch requests
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 10000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = self._header()
+        for key, value in values:
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Point-in-time value, typically set when metrics are scraped"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = self._header()
+        for key, value in values:
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed cumulative buckets"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._label_values(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager observing the elapsed seconds of its block"""
+        return _Timer(self, labels)
+
+    def get_count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._label_values(labels))
+            return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted(
+                (key, (list(s[0]), s[1], s[2])) for key, s in self._series.items()
+            )
+        lines = self._header()
+        names = self.labelnames + ("le",)
+        for key, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, object]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+INFERENCE_STAGE_SECONDS = REGISTRY.histogram(
+    "epidemiology_inference_stage_seconds",
+    "Time spent in each stage of outbreak inference",
+    labelnames=("stage", "model_version"),
+)
+PREDICTION_REQUESTS = REGISTRY.counter(
+    "epidemiology_prediction_requests_total",
+    "Prediction requests by endpoint and HTTP status",
+    labelnames=("endpoint", "status"),
+)
+PREDICTION_REQUEST_SECONDS = REGISTRY.histogram(
+    "epidemiology_prediction_request_seconds",
+    "End-to-end prediction request latency",
+    labelnames=("endpoint",),
+)
+PREDICTION_BATCH_SIZE = REGISTRY.histogram(
+    "epidemiology_prediction_batch_size",
+    "Rows per scored batch (request = /predict/batch, micro = coalesced /predict)",
+    labelnames=("source",),
+    buckets=BATCH_SIZE_BUCKETS,
+)
+
+
+def track_requests(endpoint: str) -> Callable:
+    """
+    Decorate an async route to count requests and record their latency
+
+    Status codes come from the HTTPException a route raises; any other
+    exception is counted as a 500.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = await func(*args, **kwargs)
+                status = 200
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            finally:
+                PREDICTION_REQUESTS.inc(endpoint=endpoint, status=status)
+                PREDICTION_REQUEST_SECONDS.observe(
+                    time.perf_counter() - started, endpoint=endpoint
+                )
+
+        return wrapper
+
+    return decorator
@@ -1,4 +1,4 @@
-from .core import Base, engine, get_db, AsyncSessionLocal
+from .core import Base, engine, get_db, isolated_session, AsyncSessionLocal
 from .models import (
     User,
     Disease,
@@ -8,12 +8,14 @@ from .models import (
     Prediction,
     Alert,
     ModelVersion,
+    ETLCheckpoint,
 )
 
 __all__ = [
     "Base",
     "engine",
     "get_db",
+    "isolated_session",
     "AsyncSessionLocal",
     "User",
     "Disease",
@@ -23,4 +25,5 @@ __all__ = [
     "Prediction",
     "Alert",
     "ModelVersion",
+    "ETLCheckpoint",
 ]
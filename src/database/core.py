@@ -4,8 +4,10 @@ Database Configuration
 Sets up the async database engine and session factory.
 """
 
+from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
 import os
 from dotenv import load_dotenv
 
@@ -46,3 +48,22 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+@asynccontextmanager
+async def isolated_session():
+    """
+    A session on a private, unpooled engine, closed on exit
+
+    For code that runs its own event loop, such as Celery tasks calling
+    ``asyncio.run``: asyncpg connections belong to the loop that opened them,
+    so they must not be returned to (or taken from) the shared pool.
+    """
+    isolated = create_async_engine(DATABASE_URL, poolclass=NullPool)
+    try:
+        async with AsyncSession(
+            isolated, expire_on_commit=False, autoflush=False
+        ) as session:
+            yield session
+    finally:
+        await isolated.dispose()
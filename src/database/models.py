@@ -145,6 +145,11 @@ class OutbreakData(Base):
     """Historical case counts (Time Series)"""
 
     __tablename__ = "outbreak_data"
+    __table_args__ = (
+        UniqueConstraint(
+            "disease_id", "region_id", "date", name="uq_outbreak_disease_region_date"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     disease_id: Mapped[int] = mapped_column(ForeignKey("diseases.id"), nullable=False)
@@ -176,6 +181,9 @@ class EnvironmentalData(Base):
     """Weather and environmental metrics"""
 
     __tablename__ = "environmental_data"
+    __table_args__ = (
+        UniqueConstraint("region_id", "date", name="uq_environmental_region_date"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     region_id: Mapped[int] = mapped_column(
@@ -207,6 +215,15 @@ class DigitalSignal(Base):
     """Digital signals data (Google Trends, social media)"""
 
     __tablename__ = "digital_signals"
+    __table_args__ = (
+        UniqueConstraint(
+            "region_id",
+            "date",
+            "signal_type",
+            "signal_source",
+            name="uq_digital_signal_region_date_type_source",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     region_id: Mapped[int] = mapped_column(
@@ -340,6 +357,13 @@ class ModelVersion(Base):
     model_name: Mapped[str] = mapped_column(String(255), nullable=False)
     model_version: Mapped[str] = mapped_column(String(50), nullable=False)
     model_type: Mapped[str] = mapped_column(String(100))
+    # Scope of the model; NULL means it applies to every disease / region
+    disease_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("diseases.id"), index=True
+    )
+    region_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("geographic_regions.id"), index=True
+    )
     training_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     training_data_range_start: Mapped[Optional[datetime]] = mapped_column(DateTime)
     training_data_range_end: Mapped[Optional[datetime]] = mapped_column(DateTime)
@@ -354,6 +378,34 @@ class ModelVersion(Base):
     )
 
 
+# =============================================================================
+# ETL Tables
+# =============================================================================
+
+
+class ETLCheckpoint(Base):
+    """Progress of a resumable ETL load, committed with each loaded chunk"""
+
+    __tablename__ = "etl_checkpoints"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    job_id: Mapped[str] = mapped_column(String(200), unique=True, nullable=False)
+    data_type: Mapped[str] = mapped_column(
+        String(50), nullable=False
+    )  # outbreak_data, environmental_data, digital_signals
+    # Raw input records fully committed; a resumed load skips this many
+    records_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rows_loaded: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rows_failed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
 # =============================================================================
 # Relationship Tables
 # =============================================================================
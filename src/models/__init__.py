@@ -1,6 +1,14 @@
 """Models package initialization"""
 
+from .executor import BoundedExecutor, ExecutorSaturatedError
+from .features import FeatureVectorBuilder
 from .predictor import OutbreakPredictor
 from .service import ModelService
 
-__all__ = ["OutbreakPredictor", "ModelService"]
+__all__ = [
+    "BoundedExecutor",
+    "ExecutorSaturatedError",
+    "FeatureVectorBuilder",
+    "OutbreakPredictor",
+    "ModelService",
+]
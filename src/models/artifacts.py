@@ -0,0 +1,193 @@
+"""
+Model Artifacts
+
+Native model artifact format: an XGBoost UBJSON booster plus a small JSON
+sidecar with the metadata the predictor needs. Unlike pickles, loading one
+never executes code from the file.
+"""
+
+import hashlib
+import json
+import pickle
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import logging
+
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_SUFFIX = ".ubj"
+SIDECAR_SUFFIX = ".meta.json"
+FORMAT_VERSION = 1
+
+
+def sidecar_path(booster_path: Union[str, Path]) -> Path:
+    """Metadata sidecar stored next to a booster file"""
+    booster_path = Path(booster_path)
+    return booster_path.with_name(booster_path.stem + SIDECAR_SUFFIX)
+
+
+def is_native_artifact(path: Union[str, Path]) -> bool:
+    return Path(path).suffix == ARTIFACT_SUFFIX
+
+
+def artifact_digest(path: Union[str, Path]) -> str:
+    """
+    Content hash identifying a model artifact
+
+    Covers the sidecar too for native artifacts, so a changed threshold or
+    feature list yields a new identity. Hashes are cached by each file's
+    inode, size and modification time, so reloading an unchanged artifact
+    does not read it again.
+    """
+    path = Path(path).resolve()
+    files = [path]
+    if is_native_artifact(path):
+        files.append(sidecar_path(path))
+    stamps = []
+    for file in files:
+        stat = file.stat()
+        stamps.append((str(file), stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    return _files_digest(tuple(stamps))
+
+
+@lru_cache(maxsize=64)
+def _files_digest(stamps: Tuple[Tuple[str, int, int, int], ...]) -> str:
+    digest = hashlib.sha256()
+    for file, *_ in stamps:
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class ModelArtifact:
+    """Lazily loaded booster binary and metadata sidecar"""
+
+    def __init__(self, booster_path: Union[str, Path]):
+        self.booster_path = Path(booster_path)
+        self.sidecar_path = sidecar_path(self.booster_path)
+
+    def exists(self) -> bool:
+        return self.booster_path.exists() and self.sidecar_path.exists()
+
+    @cached_property
+    def metadata(self) -> Dict[str, Any]:
+        """Sidecar contents, parsed on first access"""
+        with open(self.sidecar_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+
+        version = metadata.get("format_version")
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported artifact format version {version} "
+                f"in {self.sidecar_path}"
+            )
+        return metadata
+
+    @property
+    def feature_columns(self) -> List[str]:
+        return list(self.metadata["feature_columns"])
+
+    @property
+    def outbreak_threshold(self) -> float:
+        return float(self.metadata.get("outbreak_threshold", 25.0))
+
+    @property
+    def metrics(self) -> Dict[str, float]:
+        return dict(self.metadata.get("metrics", {}))
+
+    @property
+    def data_source(self) -> str:
+        return self.metadata.get("data_source", "Unknown")
+
+    def load_booster(self) -> xgb.Booster:
+        """
+        Load the booster with XGBoost's native reader
+
+        XGBoost opens and parses the file itself, so no Python objects are
+        built from its contents, unlike unpickling.
+        """
+        return xgb.Booster(model_file=str(self.booster_path))
+
+
+def save_artifact(
+    model: Any,
+    booster_path: Union[str, Path],
+    feature_columns: List[str],
+    outbreak_threshold: float,
+    metrics: Optional[Dict[str, Any]] = None,
+    data_source: str = "Unknown",
+    extra: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """
+    Write a booster binary and its metadata sidecar
+
+    Args:
+        model: XGBoost sklearn estimator or Booster
+        booster_path: Destination ``.ubj`` path
+        extra: Additional JSON-serializable metadata to store in the sidecar
+
+    Returns:
+        Path of the written booster file
+    """
+    booster_path = Path(booster_path)
+    if booster_path.suffix != ARTIFACT_SUFFIX:
+        raise ValueError(f"Booster path must end with {ARTIFACT_SUFFIX}")
+
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    booster_path.parent.mkdir(parents=True, exist_ok=True)
+    booster.save_model(str(booster_path))
+
+    metadata = {
+        "format_version": FORMAT_VERSION,
+        "feature_columns": list(feature_columns),
+        "outbreak_threshold": float(outbreak_threshold),
+        "metrics": {k: float(v) for k, v in (metrics or {}).items()},
+        "data_source": data_source,
+        **(extra or {}),
+    }
+    with open(sidecar_path(booster_path), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+    return booster_path
+
+
+def convert_pickle_artifact(
+    pickle_path: Union[str, Path], booster_path: Optional[Union[str, Path]] = None
+) -> Path:
+    """
+    Convert a pickled model dict into the native artifact format
+
+    Args:
+        pickle_path: Pickle written by the training notebook
+        booster_path: Destination (defaults to the pickle path with ``.ubj``)
+
+    Returns:
+        Path of the written booster file
+    """
+    pickle_path = Path(pickle_path)
+    if booster_path is None:
+        booster_path = pickle_path.with_suffix(ARTIFACT_SUFFIX)
+
+    with open(pickle_path, "rb") as f:
+        model_data = pickle.load(f)
+
+    model = model_data["model"]
+    if not hasattr(model, "get_booster"):
+        raise ValueError(
+            f"Only XGBoost models can be converted, got {type(model).__name__}"
+        )
+
+    path = save_artifact(
+        model,
+        booster_path,
+        feature_columns=model_data["feature_columns"],
+        outbreak_threshold=model_data.get("outbreak_threshold", 25.0),
+        metrics=model_data.get("metrics", {}),
+        data_source=model_data.get("data_source", "Unknown"),
+    )
+    logger.info(f"Converted {pickle_path} to {path}")
+    return path
@@ -0,0 +1,124 @@
+"""
+Inference Backends
+
+Score feature matrices with the loaded model. XGBoost models are evaluated
+directly on their booster; anything else goes through the estimator API.
+"""
+
+from typing import Any, List, Optional, Sequence
+import logging
+
+import numpy as np
+import pandas as pd
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class EstimatorBackend:
+    """Scores through the estimator's own ``predict`` with labelled columns"""
+
+    name = "estimator"
+    dtype = np.dtype(np.float64)
+
+    def __init__(self, model: Any, feature_columns: Sequence[str]):
+        self.model = model
+        self.feature_columns = list(feature_columns)
+        # Contributions run on a private copy of the booster, so configuring
+        # its threads never touches the model serving concurrent predicts
+        self._explainer: Optional[BoosterBackend] = None
+        if hasattr(model, "get_booster"):
+            try:
+                # The copy keeps the best_iteration attribute of early stopping
+                self._explainer = BoosterBackend(
+                    model.get_booster().copy(), get_settings().INFERENCE_NTHREADS
+                )
+            except Exception as e:
+                logger.warning(f"Feature contributions unavailable: {e}")
+
+    def predict(self, matrix: np.ndarray) -> np.ndarray:
+        df = pd.DataFrame(matrix, columns=self.feature_columns, copy=False)
+        return np.asarray(self.model.predict(df), dtype=np.float64)
+
+    def contributions(self, matrix: np.ndarray) -> np.ndarray:
+        if self._explainer is None:
+            raise ValueError("Feature contributions need an XGBoost model")
+        return self._explainer.contributions(matrix)
+
+
+class BoosterBackend:
+    """Scores contiguous float32 arrays with XGBoost in-place prediction"""
+
+    name = "xgboost_booster"
+    dtype = np.dtype(np.float32)
+
+    def __init__(self, model: Any, nthread: int):
+        """
+        Args:
+            model: Fitted XGBoost sklearn estimator or Booster
+            nthread: Threads XGBoost may use per prediction call
+        """
+        self.booster = model.get_booster() if hasattr(model, "get_booster") else model
+        self.booster.set_param({"nthread": nthread})
+        self.nthread = nthread
+        self.iteration_range = self._iteration_range(model)
+
+    @staticmethod
+    def _iteration_range(model: Any) -> tuple[int, int]:
+        """Match the sklearn wrapper's handling of early stopping"""
+        try:
+            return 0, int(model.best_iteration) + 1
+        except AttributeError:
+            return 0, 0
+
+    def predict(self, matrix: np.ndarray) -> np.ndarray:
+        data = np.ascontiguousarray(matrix, dtype=np.float32)
+        predicted = self.booster.inplace_predict(
+            data, iteration_range=self.iteration_range, validate_features=False
+        )
+        return np.asarray(predicted, dtype=np.float64)
+
+    def contributions(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Per-feature SHAP contributions from the booster's native tree walk
+
+        Returns:
+            ``(n, n_features + 1)`` array; the last column is the bias, and
+            each row sums to the prediction
+        """
+        import xgboost as xgb
+
+        data = xgb.DMatrix(
+            np.ascontiguousarray(matrix, dtype=np.float32), nthread=self.nthread
+        )
+        contributions = self.booster.predict(
+            data,
+            pred_contribs=True,
+            iteration_range=self.iteration_range,
+            validate_features=False,
+        )
+        return np.asarray(contributions, dtype=np.float64)
+
+
+def create_backend(
+    model: Any, feature_columns: List[str], nthread: Optional[int] = None
+) -> "EstimatorBackend | BoosterBackend":
+    """
+    Pick the fastest backend the model supports
+
+    Args:
+        model: Fitted model loaded from the artifact
+        feature_columns: Feature names in model order
+        nthread: XGBoost thread count; defaults to ``INFERENCE_NTHREADS``
+    """
+    if nthread is None:
+        nthread = get_settings().INFERENCE_NTHREADS
+
+    if hasattr(model, "get_booster") or hasattr(model, "inplace_predict"):
+        try:
+            return BoosterBackend(model, nthread)
+        except Exception as e:
+            logger.warning(f"Booster backend unavailable, using estimator predict: {e}")
+
+    return EstimatorBackend(model, feature_columns)
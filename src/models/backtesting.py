@@ -0,0 +1,249 @@
+"""
+Backtesting
+
+Replays weekly history to measure how a model would have performed for every
+disease / region series. Feature rows for the whole history are built in one
+pass, each origin's test block is scored with a single model call, and errors
+and alert hits are aggregated per series with array reductions.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from . import training
+from .predictor import OutbreakPredictor
+from .training import OUTBREAK_QUANTILE, TrainingSet
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = ("expanding", "rolling")
+
+
+@dataclass
+class BacktestMetrics:
+    """One-week-ahead errors and outbreak alert quality"""
+
+    weeks: int
+    mae: float
+    rmse: float
+    # Weeks at or above the outbreak threshold, and weeks the model alerted
+    outbreaks: int
+    alerts: int
+    precision: float
+    recall: float
+
+
+@dataclass
+class SeriesBacktest(BacktestMetrics):
+    series: str = ""
+
+
+@dataclass
+class BacktestReport:
+    """Per-series and overall results of a backtest"""
+
+    window: Optional[str]
+    origins: int
+    overall: BacktestMetrics
+    series: List[SeriesBacktest] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def backtest_origins(
+    dates: np.ndarray, min_train_weeks: int, step_weeks: int
+) -> List[Tuple[int, int]]:
+    """
+    Row blocks scored from each forecast origin, over rows sorted by date
+
+    Origins start ``min_train_weeks`` into the history and advance by
+    ``step_weeks``; each scores the weeks up to the next origin.
+
+    Returns:
+        ``(start, end)`` row offsets of each origin's test block
+    """
+    weeks = np.unique(dates)
+    if step_weeks < 1 or len(weeks) <= min_train_weeks:
+        raise ValueError(
+            f"{len(weeks)} weeks of history leave nothing to score after "
+            f"{min_train_weeks} training weeks"
+        )
+
+    starts = weeks[min_train_weeks::step_weeks]
+    offsets = np.searchsorted(dates, starts).tolist() + [len(dates)]
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def _metrics(
+    groups: np.ndarray,
+    n_groups: int,
+    actual: np.ndarray,
+    predicted: np.ndarray,
+    thresholds: np.ndarray,
+) -> List[BacktestMetrics]:
+    """Metrics for every group at once, using bincounts over group codes"""
+
+    def total(weights: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.bincount(groups, weights=weights, minlength=n_groups)
+
+    errors = predicted - actual
+    outbreak = actual >= thresholds
+    alert = predicted >= thresholds
+
+    weeks = total()
+    mae = total(np.abs(errors)) / np.maximum(weeks, 1)
+    rmse = np.sqrt(total(errors**2) / np.maximum(weeks, 1))
+    hits = total((outbreak & alert).astype(float))
+    outbreaks = total(outbreak.astype(float))
+    alerts = total(alert.astype(float))
+    precision = np.divide(hits, alerts, out=np.zeros(n_groups), where=alerts > 0)
+    recall = np.divide(hits, outbreaks, out=np.zeros(n_groups), where=outbreaks > 0)
+
+    return [
+        BacktestMetrics(
+            weeks=int(weeks[i]),
+            mae=float(mae[i]),
+            rmse=float(rmse[i]),
+            outbreaks=int(outbreaks[i]),
+            alerts=int(alerts[i]),
+            precision=float(precision[i]),
+            recall=float(recall[i]),
+        )
+        for i in range(n_groups)
+    ]
+
+
+def _refit_origin(
+    params: Dict[str, Any], train_start: int, train_end: int, test_end: int
+) -> Tuple[np.ndarray, float]:
+    """Fit on one origin's training rows and score its test block"""
+    features, target = training._worker_features, training._worker_target
+    model = training._fit(
+        params, 1, features[train_start:train_end], target[train_start:train_end]
+    )
+    threshold = float(np.quantile(target[train_start:train_end], OUTBREAK_QUANTILE))
+    return model.predict(features[train_end:test_end]), threshold
+
+
+def _refit_predictions(
+    training_set: TrainingSet,
+    blocks: List[Tuple[int, int]],
+    params: Dict[str, Any],
+    window: str,
+    window_weeks: int,
+    processes: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Predictions and thresholds from a model refit at every origin"""
+    dates = training_set.dates
+    tasks = []
+    for start, end in blocks:
+        train_start = 0
+        if window == "rolling":
+            first_week = dates[start] - np.timedelta64(7 * window_weeks, "D")
+            train_start = int(np.searchsorted(dates, first_week))
+        tasks.append((params, train_start, start, end))
+    processes = min(processes or os.cpu_count() or 1, len(tasks))
+
+    if processes <= 1:
+        training._init_worker(training_set.features, training_set.target)
+        results = [_refit_origin(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=training._init_worker,
+            initargs=(training_set.features, training_set.target),
+        ) as pool:
+            results = list(pool.map(_refit_origin, *zip(*tasks)))
+
+    predicted = np.concatenate([block for block, _ in results])
+    thresholds = np.concatenate(
+        [
+            np.full(end - start, threshold)
+            for (start, end), (_, threshold) in zip(blocks, results)
+        ]
+    )
+    return predicted, thresholds
+
+
+def backtest(
+    training_set: TrainingSet,
+    predictor: Optional[OutbreakPredictor] = None,
+    params: Optional[Dict[str, Any]] = None,
+    window: str = "expanding",
+    window_weeks: int = 104,
+    min_train_weeks: int = 104,
+    step_weeks: int = 13,
+    processes: int = 0,
+) -> BacktestReport:
+    """
+    One-week-ahead backtest over every series in a training set
+
+    With a ``predictor`` the fixed model scores every test block in a single
+    call. With ``params`` a fresh model is fit at each origin on an
+    ``expanding`` window (all earlier weeks) or a ``rolling`` one (the last
+    ``window_weeks``), spread across ``processes`` like cross-validation.
+
+    Args:
+        training_set: Rows from ``build_training_set`` in the model's layout
+        min_train_weeks: Weeks before the first origin
+        step_weeks: Weeks between origins, i.e. each origin's test block
+
+    Returns:
+        Metrics per series and over all scored weeks. Outbreak weeks and
+        alerts use the predictor's threshold, or each origin's training
+        quantile when refitting.
+    """
+    if (predictor is None) == (params is None):
+        raise ValueError("Pass either a predictor or refit params")
+    if window not in WINDOWS:
+        raise ValueError(f"Unknown window {window!r}, expected one of {WINDOWS}")
+
+    started = time.perf_counter()
+    blocks = backtest_origins(training_set.dates, min_train_weeks, step_weeks)
+    first, last = blocks[0][0], blocks[-1][1]
+
+    if predictor is not None:
+        if not predictor.is_loaded():
+            raise ValueError("Model not loaded")
+        if training_set.feature_columns != predictor.feature_columns:
+            raise ValueError("Training set was built for a different feature layout")
+        predicted, _, _ = predictor.score_matrix(training_set.features[first:last])
+        thresholds = np.full(last - first, predictor.outbreak_threshold)
+    else:
+        predicted, thresholds = _refit_predictions(
+            training_set, blocks, params, window, window_weeks, processes
+        )
+
+    actual = training_set.target[first:last]
+    names, codes = np.unique(training_set.series[first:last], return_inverse=True)
+    per_series = _metrics(codes, len(names), actual, predicted, thresholds)
+    (overall,) = _metrics(
+        np.zeros(len(actual), dtype=np.intp), 1, actual, predicted, thresholds
+    )
+
+    report = BacktestReport(
+        window=window if params is not None else None,
+        origins=len(blocks),
+        overall=overall,
+        series=[
+            SeriesBacktest(series=str(name), **asdict(metrics))
+            for name, metrics in zip(names, per_series)
+        ],
+        elapsed_seconds=round(time.perf_counter() - started, 3),
+    )
+    logger.info(
+        f"Backtested {len(names)} series over {len(blocks)} origins "
+        f"({overall.weeks} weeks) in {report.elapsed_seconds:.1f}s: "
+        f"MAE {overall.mae:.2f}, RMSE {overall.rmse:.2f}"
+    )
+    return report
@@ -0,0 +1,119 @@
+"""
+Micro-batching
+
+Collects concurrent prediction requests for a short window and scores them
+with one model call off the event loop.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from .executor import BoundedExecutor
+from ..core.metrics import PREDICTION_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+ScoreBatch = Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+
+
+class MicroBatcher:
+    """Groups requests arriving within a time window into one batch call"""
+
+    def __init__(
+        self,
+        score_batch: ScoreBatch,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        executor: Optional[BoundedExecutor] = None,
+    ):
+        """
+        Args:
+            score_batch: Scores a list of rows, returning results in order
+            max_batch_size: Flush as soon as this many rows are waiting
+            max_wait_ms: Flush at most this long after the first row arrives
+            executor: Pool to score on (defaults to the loop's executor)
+        """
+        self.score_batch = score_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def submit(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue one row and wait for its own result"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # State is bound to a loop; start fresh if we moved to another one
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Hand the waiting rows to a scoring task"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = self._loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        rows = [row for row, _ in batch]
+        PREDICTION_BATCH_SIZE.observe(len(rows), source="micro")
+
+        try:
+            if self.executor is not None:
+                results = await self.executor.run(self._score, rows)
+            else:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(None, self._score, rows)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _score(self, rows: List[Dict[str, Any]]) -> List[Any]:
+        """Score a batch, isolating failures to the rows that caused them"""
+        try:
+            return self.score_batch(rows)
+        except Exception as e:
+            if len(rows) == 1:
+                return [e]
+            logger.warning(f"Batch of {len(rows)} failed, rescoring rows: {e}")
+
+        results: List[Any] = []
+        for row in rows:
+            try:
+                results.extend(self.score_batch([row]))
+            except Exception as e:
+                results.append(e)
+        return results
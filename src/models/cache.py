@@ -0,0 +1,145 @@
+"""
+Prediction Cache
+
+Bounded LRU + TTL cache for prediction results, keyed on canonical inputs
+and the identity of the model that produced them.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_WEATHER_FIELDS = (
+    "temp_avg",
+    "temp_min",
+    "temp_max",
+    "precipitation_mm",
+    "humidity_percent",
+)
+
+
+class PredictionCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL"""
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl_seconds: float = 300.0,
+        decimals: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_size: Entries kept before the least recently used is evicted;
+                0 disables the cache
+            ttl_seconds: Seconds an entry stays valid
+            decimals: Round weather inputs to this many decimals before keying
+                and scoring; None keys on exact values
+        """
+        self.max_size = max(0, max_size)
+        self.ttl = ttl_seconds
+        self.decimals = decimals
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def canonicalize(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normalize a prediction input so equivalent requests look identical
+
+        Case history is padded to the 4 weeks the model sees, and weather is
+        rounded when quantization is enabled. Feature store history is kept
+        as is and becomes part of the key.
+        """
+        cases = [int(c) for c in row["previous_cases"][-4:]]
+        if len(cases) < 4:
+            cases = [0] * (4 - len(cases)) + cases
+
+        canonical = {
+            field: (
+                round(float(row[field]), self.decimals)
+                if self.decimals is not None
+                else float(row[field])
+            )
+            for field in _WEATHER_FIELDS
+        }
+        canonical["weekofyear"] = int(row["weekofyear"])
+        canonical["previous_cases"] = cases
+        if row.get("history"):
+            canonical["history"] = row["history"]
+        return canonical
+
+    @staticmethod
+    def make_key(model_id: str, canonical: Dict[str, Any]) -> Hashable:
+        """Cache key for a canonicalized row scored by ``model_id``"""
+        return (
+            model_id,
+            *(canonical[field] for field in _WEATHER_FIELDS),
+            canonical["weekofyear"],
+            tuple(canonical["previous_cases"]),
+            canonical.get("history"),
+        )
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Return a copy of a live entry, or None"""
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return dict(value)
+
+    def put(self, key: Hashable, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,247 @@
+"""
+Input Drift Monitor
+
+Streaming per-feature statistics of the feature rows a model scores, compared
+against the training distribution stored in its artifact. Rows are copied
+into a fixed buffer on the hot path; Welford / Chan moment updates and
+histogram counts run once per full buffer, so memory stays constant and the
+per-request cost is a slice copy.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Histogram bins of a training snapshot (quantile-based, open-ended)
+SNAPSHOT_BINS = 10
+
+# Added to every bin proportion so empty bins keep PSI finite
+_EPSILON = 1e-4
+
+# Conventional PSI bands: below MODERATE is stable, above SIGNIFICANT drifted
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+def feature_distribution(
+    matrix: np.ndarray, feature_columns: Sequence[str], bins: int = SNAPSHOT_BINS
+) -> Dict[str, Any]:
+    """
+    Training-distribution snapshot to store in an artifact's sidecar
+
+    Bin edges are the feature's inner quantiles, so every bin holds a similar
+    share of training rows and PSI is sensitive across the whole range.
+
+    Returns:
+        JSON-serializable ``{"rows", "features": {name: {mean, std, edges,
+        proportions}}}``
+    """
+    quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+    features = {}
+    for j, name in enumerate(feature_columns):
+        values = matrix[:, j].astype(np.float64)
+        edges = np.unique(np.quantile(values, quantiles))
+        counts = np.bincount(
+            np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1
+        )
+        features[name] = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "edges": edges.tolist(),
+            "proportions": (counts / len(values)).tolist(),
+        }
+    return {"rows": int(len(matrix)), "features": features}
+
+
+def population_stability_index(current: np.ndarray, reference: np.ndarray) -> float:
+    """PSI between two bin-proportion vectors"""
+    current = current + _EPSILON
+    reference = reference + _EPSILON
+    return float(((current - reference) * np.log(current / reference)).sum())
+
+
+def binned_ks(current: np.ndarray, reference: np.ndarray) -> float:
+    """Largest CDF gap between two bin-proportion vectors (binned KS statistic)"""
+    return float(np.abs(np.cumsum(current) - np.cumsum(reference)).max())
+
+
+class DriftMonitor:
+    """Streaming feature statistics for one model, compared to its training data"""
+
+    def __init__(
+        self,
+        feature_columns: Sequence[str],
+        reference: Optional[Dict[str, Any]] = None,
+        buffer_rows: int = 256,
+        window_rows: Optional[int] = None,
+        min_rows: int = 200,
+    ):
+        """
+        Args:
+            feature_columns: Model feature layout, matching the observed rows
+            reference: Snapshot from ``feature_distribution``; without one only
+                the moments are tracked and no scores are reported
+            buffer_rows: Rows held before the statistics are updated
+            window_rows: Once this many rows are counted, older counts are
+                halved so recent traffic dominates (None keeps everything)
+            min_rows: Rows needed before features are reported as drifted
+        """
+        self.feature_columns = list(feature_columns)
+        self.n_features = len(self.feature_columns)
+        self.window_rows = window_rows
+        self.min_rows = min_rows
+
+        self._lock = threading.Lock()
+        self._buffer = np.empty((buffer_rows, self.n_features), dtype=np.float64)
+        self._buffered = 0
+
+        self._count = 0.0
+        self._mean = np.zeros(self.n_features)
+        self._m2 = np.zeros(self.n_features)
+        self._observed = 0
+
+        # Features with a reference histogram, their bin edges padded with
+        # +inf into one (features, edges) array so a block is binned with a
+        # single comparison, and the running bin counts
+        self._reference = reference
+        snapshots = [
+            (j, reference["features"][name])
+            for j, name in enumerate(self.feature_columns)
+            if reference is not None and name in reference["features"]
+        ]
+        self._slots = np.array([j for j, _ in snapshots], dtype=np.intp)
+        self._n_bins = [len(snapshot["proportions"]) for _, snapshot in snapshots]
+        width = max(self._n_bins, default=1)
+        self._edges = np.full((len(snapshots), width - 1), np.inf)
+        for i, (_, snapshot) in enumerate(snapshots):
+            self._edges[i, : len(snapshot["edges"])] = snapshot["edges"]
+        self._offsets = np.arange(len(snapshots)) * width
+        self._counts = np.zeros((len(snapshots), width))
+
+    @property
+    def has_reference(self) -> bool:
+        return len(self._slots) > 0
+
+    def observe(self, matrix: np.ndarray):
+        """Record feature rows, shaped ``(n, n_features)`` or ``(n_features,)``"""
+        rows = matrix.reshape(-1, self.n_features)
+        capacity = len(self._buffer)
+        with self._lock:
+            self._observed += len(rows)
+            if len(rows) >= capacity:
+                # Large batches are merged as they are, without buffering
+                self._flush()
+                self._merge(rows)
+                return
+            start = 0
+            while start < len(rows):
+                take = min(capacity - self._buffered, len(rows) - start)
+                self._buffer[self._buffered : self._buffered + take] = rows[
+                    start : start + take
+                ]
+                self._buffered += take
+                start += take
+                if self._buffered == capacity:
+                    self._flush()
+
+    def _flush(self):
+        """Merge the buffered rows into the running statistics (lock held)"""
+        if self._buffered:
+            block = self._buffer[: self._buffered]
+            self._buffered = 0
+            self._merge(block)
+
+    def _merge(self, block: np.ndarray):
+        """Fold a block of rows into the running statistics (lock held)"""
+        n_new = len(block)
+        block = block.astype(np.float64, copy=False)
+
+        # Chan et al.'s parallel form of Welford's update
+        block_mean = block.mean(axis=0)
+        block_m2 = ((block - block_mean) ** 2).sum(axis=0)
+        total = self._count + n_new
+        delta = block_mean - self._mean
+        self._mean += delta * (n_new / total)
+        self._m2 += block_m2 + delta**2 * (self._count * n_new / total)
+        self._count = total
+
+        if self.has_reference:
+            # Histograms of large batches use an evenly strided sample, so
+            # their cost is bounded by the buffer size
+            stride = -(-n_new // len(self._buffer))
+            values = block[::stride, self._slots]
+            # Bin index = edges at or below the value (searchsorted "right")
+            bins = np.zeros(values.shape, dtype=np.intp)
+            for k in range(self._edges.shape[1]):
+                bins += values >= self._edges[:, k]
+            self._counts += np.bincount(
+                (bins + self._offsets).ravel(), minlength=self._counts.size
+            ).reshape(self._counts.shape)
+
+        while self.window_rows and self._count > self.window_rows:
+            self._count /= 2
+            self._m2 /= 2
+            self._counts /= 2
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Moments per feature plus PSI / KS scores against the reference"""
+        with self._lock:
+            self._flush()
+            count = self._count
+            mean = self._mean.copy()
+            std = np.sqrt(self._m2 / count) if count else np.zeros(self.n_features)
+            counts = self._counts.copy()
+            observed = self._observed
+
+        features: Dict[str, Dict[str, Any]] = {
+            name: {"mean": float(mean[j]), "std": float(std[j])}
+            for j, name in enumerate(self.feature_columns)
+        }
+        scores = {}
+        for i, j in enumerate(self._slots.tolist()):
+            total = counts[i].sum()
+            if not total:
+                continue
+            name = self.feature_columns[j]
+            snapshot = self._reference["features"][name]
+            reference = np.asarray(snapshot["proportions"])
+            current = counts[i, : self._n_bins[i]] / total
+            psi = population_stability_index(current, reference)
+            scores[name] = psi
+            features[name].update(
+                psi=round(psi, 4),
+                ks=round(binned_ks(current, reference), 4),
+                mean_shift=(
+                    round(
+                        (features[name]["mean"] - snapshot["mean"]) / snapshot["std"], 4
+                    )
+                    if snapshot["std"]
+                    else None
+                ),
+            )
+
+        status = None
+        drifted: List[str] = []
+        if observed >= self.min_rows and scores:
+            worst = max(scores.values())
+            if worst >= PSI_SIGNIFICANT:
+                status = "drift"
+            elif worst >= PSI_MODERATE:
+                status = "moderate"
+            else:
+                status = "stable"
+            drifted = sorted(
+                (name for name, psi in scores.items() if psi >= PSI_SIGNIFICANT),
+                key=lambda name: -scores[name],
+            )
+
+        return {
+            "reference": self.has_reference,
+            "rows_observed": observed,
+            "rows_weighted": round(count, 1),
+            "max_psi": round(max(scores.values()), 4) if scores else None,
+            "status": status,
+            "drifted_features": drifted,
+            "features": features,
+        }
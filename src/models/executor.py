@@ -0,0 +1,119 @@
+"""
+Bounded Executor
+
+Runs blocking model work on a size-limited thread pool so the event loop
+never blocks, and rejects work fast once the pool and its queue are full.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a bounded executor cannot accept more work"""
+
+
+class BoundedExecutor:
+    """Thread pool with a bounded queue and wait-time metrics"""
+
+    def __init__(self, max_workers: int, max_queue: int, name: str):
+        """
+        Args:
+            max_workers: Threads running work concurrently
+            max_queue: Calls allowed to wait for a free thread
+            name: Thread name prefix, also used in log messages
+        """
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=name
+        )
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def run(self, fn: Callable[..., R], *args: Any) -> R:
+        """
+        Run ``fn(*args)`` on the pool and await its result
+
+        Raises:
+            ExecutorSaturatedError: If all threads are busy and the queue is full
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise ExecutorSaturatedError(
+                    f"{self.name} executor is saturated "
+                    f"({self._in_flight}/{self.capacity} calls in flight)"
+                )
+            self._in_flight += 1
+            self._submitted += 1
+
+        enqueued_at = time.perf_counter()
+
+        def call() -> R:
+            waited = time.perf_counter() - enqueued_at
+            with self._lock:
+                self._running += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        def release(_):
+            with self._lock:
+                self._in_flight -= 1
+
+        try:
+            future = self._pool.submit(call)
+        except BaseException:
+            release(None)
+            raise
+        # The slot is held until the call itself finishes: a cancelled
+        # awaiter stops waiting, but the thread keeps running ``fn``
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput counters and wait times"""
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._in_flight - self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(
+                    (self._total_wait / started * 1000) if started else 0.0, 3
+                ),
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
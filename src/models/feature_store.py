@@ -0,0 +1,324 @@
+"""
+Online Feature Store
+
+Keeps the last few weeks of weather per region and cases per disease /
+region in fixed-size NumPy ring buffers, so inference reads rolling history
+without querying the database.
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+
+from .features import HISTORY_WEEKS, ROLLING_FIELDS, WeatherHistory
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[date, datetime]
+
+# Weekly aggregation per weather field: temperature and humidity are
+# averaged over the days recorded in a week, precipitation is summed
+_WEATHER_SUMS = np.array([False, True, False])
+
+
+def week_number(day: DateLike) -> int:
+    """Monday-aligned week ordinal, comparable across years"""
+    if isinstance(day, datetime):
+        day = day.date()
+    return (day.toordinal() - 1) // 7
+
+
+def request_week(
+    weekofyear: int, year: Optional[int] = None, today: Optional[date] = None
+) -> Optional[date]:
+    """
+    Monday of the week a prediction request is for
+
+    With a ``year`` the ISO week is exact. Without one, the request is taken
+    to be for the current week only if ``weekofyear`` is the current week;
+    for any other week it is unknown which year is meant, so None is returned
+    and the request keeps its own history.
+
+    Raises:
+        ValueError: If ``year`` has no such ISO week
+    """
+    if year is not None:
+        return date.fromisocalendar(year, weekofyear, 1)
+    iso_year, iso_week, _ = (today or date.today()).isocalendar()
+    if weekofyear != iso_week:
+        return None
+    return date.fromisocalendar(iso_year, iso_week, 1)
+
+
+class WeeklyRingBuffer:
+    """
+    Fixed window of weekly values built from daily or weekly rows
+
+    Each slot holds one week as seven day cells, so re-writing the same date
+    (an ETL update) replaces its value instead of counting it twice.
+    """
+
+    def __init__(self, capacity: int, n_fields: int):
+        self.capacity = capacity
+        self._days = np.full((capacity, 7, n_fields), np.nan, dtype=np.float32)
+        self._weeks = np.full(capacity, -1, dtype=np.int64)
+        self.latest_week = -1
+
+    def record(self, day: DateLike, values: Sequence[float]) -> bool:
+        """
+        Store one day's values
+
+        Returns:
+            False if the day is older than the window and was dropped
+        """
+        week = week_number(day)
+        if week <= self.latest_week - self.capacity:
+            return False
+
+        slot = week % self.capacity
+        if self._weeks[slot] != week:
+            self._days[slot] = np.nan
+            self._weeks[slot] = week
+        weekday = (day.date() if isinstance(day, datetime) else day).weekday()
+        self._days[slot, weekday] = values
+        self.latest_week = max(self.latest_week, week)
+        return True
+
+    def weekly(self, end_week: int, weeks: int, sums: np.ndarray) -> np.ndarray:
+        """
+        Weekly aggregates for the ``weeks`` weeks ending at ``end_week``
+
+        Args:
+            sums: Per-field mask of fields summed (others are averaged)
+
+        Returns:
+            ``(weeks, n_fields)`` array, oldest first, NaN for missing weeks
+        """
+        wanted = np.arange(end_week - weeks + 1, end_week + 1)
+        slots = wanted % self.capacity
+        days = self._days[slots]
+        # Weeks that left the window may still sit in an untouched slot
+        present = (
+            (self._weeks[slots] == wanted) & (wanted > self.latest_week - self.capacity)
+        )[:, np.newaxis]
+
+        recorded = ~np.isnan(days)
+        count = recorded.sum(axis=1)
+        total = np.where(recorded, days, 0.0).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            aggregated = np.where(sums, total, total / count)
+        return np.where(present & (count > 0), aggregated, np.nan)
+
+
+class OnlineFeatureStore:
+    """Per-scope rolling history served to the predictor in O(1)"""
+
+    def __init__(self, weeks: Optional[int] = None):
+        """
+        Args:
+            weeks: Weeks of history kept per scope (defaults to settings)
+        """
+        configured = weeks if weeks is not None else get_settings().FEATURE_STORE_WEEKS
+        # Rolling windows and the 4 case lags need at least 4 completed weeks
+        self.weeks = max(configured, HISTORY_WEEKS, 4)
+        self._weather: Dict[int, WeeklyRingBuffer] = {}
+        self._cases: Dict[Tuple[int, int], WeeklyRingBuffer] = {}
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def _buffer(self, buffers: Dict, key: Any, n_fields: int) -> WeeklyRingBuffer:
+        buffer = buffers.get(key)
+        if buffer is None:
+            buffer = WeeklyRingBuffer(self.weeks, n_fields)
+            buffers[key] = buffer
+        return buffer
+
+    def record_environmental(
+        self,
+        region_id: int,
+        day: DateLike,
+        temperature_avg: Optional[float],
+        rainfall_mm: Optional[float],
+        humidity_avg: Optional[float],
+    ):
+        """Add one EnvironmentalData row"""
+        values = [
+            np.nan if value is None else float(value)
+            for value in (temperature_avg, rainfall_mm, humidity_avg)
+        ]
+        with self._lock:
+            buffer = self._buffer(self._weather, region_id, len(ROLLING_FIELDS))
+            if not buffer.record(day, values):
+                self._dropped += 1
+
+    def record_outbreak(
+        self, disease_id: int, region_id: int, day: DateLike, case_count: int
+    ):
+        """Add one OutbreakData row"""
+        with self._lock:
+            buffer = self._buffer(self._cases, (disease_id, region_id), 1)
+            if not buffer.record(day, [float(case_count)]):
+                self._dropped += 1
+
+    def record_environmental_rows(self, records: Iterable[Dict[str, Any]]):
+        """Add rows shaped like ``EnvironmentalData`` columns"""
+        for record in records:
+            self.record_environmental(
+                record["region_id"],
+                record["date"],
+                record.get("temperature_avg"),
+                record.get("rainfall_mm"),
+                record.get("humidity_avg"),
+            )
+
+    def record_outbreak_rows(self, records: Iterable[Dict[str, Any]]):
+        """Add rows shaped like ``OutbreakData`` columns"""
+        for record in records:
+            self.record_outbreak(
+                record["disease_id"],
+                record["region_id"],
+                record["date"],
+                record.get("case_count") or 0,
+            )
+
+    def weather_history(
+        self, region_id: Optional[int], as_of: Optional[DateLike] = None
+    ) -> Optional[WeatherHistory]:
+        """
+        Weekly weather for the completed weeks before ``as_of``
+
+        Returns:
+            ``HISTORY_WEEKS`` entries, oldest first, or None when the region
+            has no history
+        """
+        if region_id is None:
+            return None
+        end_week = week_number(as_of or date.today()) - 1
+        with self._lock:
+            buffer = self._weather.get(region_id)
+            if buffer is None:
+                return None
+            weekly = buffer.weekly(end_week, HISTORY_WEEKS, _WEATHER_SUMS)
+
+        history = tuple(
+            None if np.isnan(week).any() else tuple(round(float(v), 4) for v in week)
+            for week in weekly
+        )
+        return history if any(week is not None for week in history) else None
+
+    def case_history(
+        self,
+        disease_id: Optional[int],
+        region_id: Optional[int],
+        as_of: Optional[DateLike] = None,
+    ) -> Optional[Tuple[Optional[int], ...]]:
+        """
+        Weekly case totals for the 4 completed weeks before ``as_of``
+
+        Returns:
+            4 entries, oldest first (None for weeks without data), or None
+            when the scope has no history
+        """
+        if disease_id is None or region_id is None:
+            return None
+        end_week = week_number(as_of or date.today()) - 1
+        with self._lock:
+            buffer = self._cases.get((disease_id, region_id))
+            if buffer is None:
+                return None
+            weekly = buffer.weekly(end_week, 4, np.array([True]))[:, 0]
+
+        cases = tuple(None if np.isnan(v) else int(round(float(v))) for v in weekly)
+        return cases if any(c is not None for c in cases) else None
+
+    def complete_cases(
+        self,
+        disease_id: Optional[int],
+        region_id: Optional[int],
+        previous_cases: Sequence[int],
+        as_of: Optional[DateLike] = None,
+    ) -> list:
+        """
+        Fill a short case history from the store
+
+        Supplied counts are taken as the most recent weeks; older weeks come
+        from the store and stay zero where it has no data.
+        """
+        cases = list(previous_cases)
+        if len(cases) >= 4:
+            return cases
+        known = self.case_history(disease_id, region_id, as_of)
+        if known is None:
+            return cases
+        older = [c or 0 for c in known[: 4 - len(cases)]]
+        return older + cases
+
+    async def load(self, db, weeks: Optional[int] = None) -> int:
+        """
+        Fill the store from the database
+
+        Args:
+            db: Async database session
+            weeks: Weeks of history to read (defaults to the window size)
+
+        Returns:
+            Number of rows read
+        """
+        # Imported here so the store stays usable without a configured database
+        from sqlalchemy import select
+
+        from ..database.models import EnvironmentalData, OutbreakData
+
+        since = datetime.combine(
+            date.today() - timedelta(weeks=(weeks or self.weeks) + 1),
+            datetime.min.time(),
+        )
+        rows = 0
+
+        result = await db.execute(
+            select(
+                EnvironmentalData.region_id,
+                EnvironmentalData.date,
+                EnvironmentalData.temperature_avg,
+                EnvironmentalData.rainfall_mm,
+                EnvironmentalData.humidity_avg,
+            ).where(EnvironmentalData.date >= since)
+        )
+        for region_id, day, temperature, rainfall, humidity in result.all():
+            self.record_environmental(region_id, day, temperature, rainfall, humidity)
+            rows += 1
+
+        result = await db.execute(
+            select(
+                OutbreakData.disease_id,
+                OutbreakData.region_id,
+                OutbreakData.date,
+                OutbreakData.case_count,
+            ).where(OutbreakData.date >= since)
+        )
+        for disease_id, region_id, day, case_count in result.all():
+            self.record_outbreak(disease_id, region_id, day, case_count)
+            rows += 1
+
+        logger.info(f"Feature store loaded {rows} rows since {since.date()}")
+        return rows
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "weeks": self.weeks,
+                "weather_regions": len(self._weather),
+                "case_scopes": len(self._cases),
+                "dropped_rows": self._dropped,
+            }
+
+
+@lru_cache()
+def get_feature_store() -> OnlineFeatureStore:
+    """Process-wide feature store shared by the API and the ETL loader"""
+    return OnlineFeatureStore()
@@ -0,0 +1,394 @@
+"""
+Feature Vector Builder
+
+Compiles the model's feature layout once and writes prediction inputs
+straight into NumPy rows or matrices, without building dicts or DataFrames.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Features produced from a prediction request, in ``create_features`` order
+FEATURE_NAMES = (
+    "temp_avg",
+    "temp_min",
+    "temp_max",
+    "precipitation_mm",
+    "humidity_percent",
+    "weekofyear",
+    "cases_lag_1",
+    "cases_lag_2",
+    "cases_lag_3",
+    "cases_lag_4",
+    "temp_avg_roll_2w",
+    "temp_avg_roll_4w",
+    "precip_roll_2w",
+    "precip_roll_4w",
+    "humidity_roll_2w",
+    "humidity_roll_4w",
+    "week_sin",
+    "week_cos",
+)
+
+# Weekly weather fields kept as history for the rolling features, in the
+# order they appear in each history entry
+ROLLING_FIELDS = ("temp_avg", "precipitation_mm", "humidity_percent")
+
+# Rolling feature -> (history field, window in weeks including the current one)
+ROLLING_FEATURES = {
+    "temp_avg_roll_2w": ("temp_avg", 2),
+    "temp_avg_roll_4w": ("temp_avg", 4),
+    "precip_roll_2w": ("precipitation_mm", 2),
+    "precip_roll_4w": ("precipitation_mm", 4),
+    "humidity_roll_2w": ("humidity_percent", 2),
+    "humidity_roll_4w": ("humidity_percent", 4),
+}
+
+# Completed weeks before the current one needed by the widest window
+HISTORY_WEEKS = max(window for _, window in ROLLING_FEATURES.values()) - 1
+
+# Weather for the weeks before the current one, oldest first. Each entry is
+# ``ROLLING_FIELDS`` values, or None for a week with no data.
+WeatherHistory = Tuple[Optional[Tuple[float, float, float]], ...]
+
+# Request field each produced feature is copied from (lags and seasonal
+# encodings are derived separately)
+_SOURCE_FIELDS = {
+    "temp_avg": "temp_avg",
+    "temp_min": "temp_min",
+    "temp_max": "temp_max",
+    "precipitation_mm": "precipitation_mm",
+    "humidity_percent": "humidity_percent",
+    "weekofyear": "weekofyear",
+}
+
+_INPUT_FIELDS = (
+    "temp_avg",
+    "temp_min",
+    "temp_max",
+    "precipitation_mm",
+    "humidity_percent",
+    "weekofyear",
+)
+
+
+def _pad_cases(previous_cases: Sequence[int]) -> List[float]:
+    """Left-pad or truncate case history to the last 4 weeks"""
+    cases = [float(c) for c in previous_cases[-4:]]
+    if len(cases) < 4:
+        cases = [0.0] * (4 - len(cases)) + cases
+    return cases
+
+
+def _pad_history(history: Optional[WeatherHistory]) -> List[Any]:
+    """Left-pad or truncate weather history to ``HISTORY_WEEKS`` entries"""
+    weeks = list(history[-HISTORY_WEEKS:]) if history else []
+    return [None] * (HISTORY_WEEKS - len(weeks)) + weeks
+
+
+def history_array(history: Optional[WeatherHistory]) -> np.ndarray:
+    """``(HISTORY_WEEKS, len(ROLLING_FIELDS))`` array with NaN for missing weeks"""
+    return np.array(
+        [
+            week if week is not None else (np.nan,) * len(ROLLING_FIELDS)
+            for week in _pad_history(history)
+        ],
+        dtype=np.float64,
+    )
+
+
+def rolling_mean(current: np.ndarray, previous: np.ndarray, window: int) -> np.ndarray:
+    """
+    Mean over the current week and the weeks before it that have data
+
+    Matches ``Series.rolling(window).mean()`` from training when the history
+    is complete and degrades to the current value when there is none.
+
+    Args:
+        current: Current week's values, shaped ``(n,)``
+        previous: Earlier weeks, oldest first, shaped ``(n, HISTORY_WEEKS)``
+        window: Window length in weeks, including the current week
+    """
+    earlier = previous[:, HISTORY_WEEKS - (window - 1) :]
+    present = ~np.isnan(earlier)
+    total = current + np.where(present, earlier, 0.0).sum(axis=1)
+    return total / (1 + present.sum(axis=1))
+
+
+class FeatureVectorBuilder:
+    """Maps prediction inputs to fixed slots in the model's feature vector"""
+
+    def __init__(self, feature_columns: Sequence[str], dtype: Any = np.float64):
+        """
+        Compile the slot layout for a model
+
+        Args:
+            feature_columns: Feature names in the order the model expects
+            dtype: NumPy dtype of the produced rows and matrices
+        """
+        self.feature_columns = list(feature_columns)
+        self.n_features = len(self.feature_columns)
+        self.dtype = np.dtype(dtype)
+
+        index = {name: i for i, name in enumerate(self.feature_columns)}
+
+        # (slot, request field) for features copied from the request
+        self._copy_slots = [
+            (index[name], field)
+            for name, field in _SOURCE_FIELDS.items()
+            if name in index
+        ]
+        # (slot, position in padded history) for lag features
+        self._lag_slots = [
+            (index[f"cases_lag_{lag}"], 4 - lag)
+            for lag in (1, 2, 3, 4)
+            if f"cases_lag_{lag}" in index
+        ]
+        # (slot, request field, history column, window) for rolling features
+        self._rolling_slots = [
+            (index[name], field, ROLLING_FIELDS.index(field), window)
+            for name, (field, window) in ROLLING_FEATURES.items()
+            if name in index
+        ]
+        self._sin_slot = index.get("week_sin")
+        self._cos_slot = index.get("week_cos")
+
+        self._local = threading.local()
+
+    def _scratch_row(self) -> np.ndarray:
+        """Per-thread preallocated row, reused across calls"""
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = np.zeros(self.n_features, dtype=self.dtype)
+            self._local.row = row
+        return row
+
+    def build_row(
+        self,
+        temp_avg: float,
+        temp_min: float,
+        temp_max: float,
+        precipitation_mm: float,
+        humidity_percent: float,
+        weekofyear: int,
+        previous_cases: Sequence[int],
+        history: Optional[WeatherHistory] = None,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Write one input into a feature row
+
+        Args:
+            history: Weather for the preceding weeks; without it the rolling
+                features fall back to the current week's values
+            out: Row to write into. Defaults to a per-thread scratch row that
+                is overwritten by the next call on the same thread.
+
+        Returns:
+            The filled row, shaped ``(n_features,)``
+        """
+        row = self._scratch_row() if out is None else out
+        row.fill(0.0)
+
+        values = {
+            "temp_avg": temp_avg,
+            "temp_min": temp_min,
+            "temp_max": temp_max,
+            "precipitation_mm": precipitation_mm,
+            "humidity_percent": humidity_percent,
+            "weekofyear": weekofyear,
+        }
+        for slot, field in self._copy_slots:
+            row[slot] = values[field]
+
+        if self._lag_slots:
+            cases = _pad_cases(previous_cases)
+            for slot, position in self._lag_slots:
+                row[slot] = cases[position]
+
+        if self._rolling_slots:
+            previous = _pad_history(history)
+            for slot, field, column, window in self._rolling_slots:
+                total, count = float(values[field]), 1
+                for week in previous[HISTORY_WEEKS - (window - 1) :]:
+                    if week is not None:
+                        total += week[column]
+                        count += 1
+                row[slot] = total / count
+
+        if self._sin_slot is not None:
+            row[self._sin_slot] = np.sin(2 * np.pi * weekofyear / 52)
+        if self._cos_slot is not None:
+            row[self._cos_slot] = np.cos(2 * np.pi * weekofyear / 52)
+
+        return row
+
+    def build_matrix(
+        self, rows: Sequence[Dict[str, Any]], out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Write many inputs into a feature matrix, one column at a time
+
+        Args:
+            rows: Dicts with the same keys as ``build_row`` arguments;
+                ``history`` is optional per row
+            out: Matrix to write into, shaped at least ``(len(rows), n_features)``
+
+        Returns:
+            The filled matrix, shaped ``(len(rows), n_features)``
+        """
+        n_rows = len(rows)
+        columns = {
+            field: np.fromiter(
+                (row[field] for row in rows), dtype=np.float64, count=n_rows
+            )
+            for field in _INPUT_FIELDS
+        }
+        cases = (
+            np.array(
+                [_pad_cases(row["previous_cases"]) for row in rows],
+                dtype=np.float64,
+            )
+            if self._lag_slots
+            else None
+        )
+        previous = (
+            np.stack([history_array(row.get("history")) for row in rows])
+            if self._rolling_slots and any(row.get("history") for row in rows)
+            else None
+        )
+        return self.build_matrix_from_arrays(columns, cases, previous, out=out)
+
+    def build_matrix_from_arrays(
+        self,
+        columns: Dict[str, np.ndarray],
+        cases: Optional[np.ndarray],
+        previous: Optional[np.ndarray] = None,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Write already columnar inputs into a feature matrix
+
+        Args:
+            columns: Array per request field, each shaped ``(n,)``
+            cases: Padded case history, shaped ``(n, 4)``, oldest week first
+            previous: Weather history, shaped ``(n, HISTORY_WEEKS,
+                len(ROLLING_FIELDS))`` with NaN for missing weeks; None when no
+                row has history
+            out: Matrix to write into, shaped at least ``(n, n_features)``
+
+        Returns:
+            The filled matrix, shaped ``(n, n_features)``
+        """
+        n_rows = len(columns["weekofyear"])
+        if out is None:
+            matrix = np.zeros((n_rows, self.n_features), dtype=self.dtype)
+        else:
+            matrix = out[:n_rows]
+            matrix.fill(0.0)
+
+        if n_rows == 0:
+            return matrix
+
+        for slot, field in self._copy_slots:
+            matrix[:, slot] = columns[field]
+
+        if self._lag_slots:
+            for slot, position in self._lag_slots:
+                matrix[:, slot] = cases[:, position]
+
+        if self._rolling_slots:
+            if previous is not None:
+                for slot, field, column, window in self._rolling_slots:
+                    matrix[:, slot] = rolling_mean(
+                        columns[field], previous[:, :, column], window
+                    )
+            else:
+                for slot, field, _, _ in self._rolling_slots:
+                    matrix[:, slot] = columns[field]
+
+        weeks = columns["weekofyear"]
+        if self._sin_slot is not None:
+            matrix[:, self._sin_slot] = np.sin(2 * np.pi * weeks / 52)
+        if self._cos_slot is not None:
+            matrix[:, self._cos_slot] = np.cos(2 * np.pi * weeks / 52)
+
+        return matrix
+
+
+# Columns of a packed input block: request fields, padded case history, then
+# the flattened weather history (NaN for missing weeks)
+INPUT_BLOCK_WIDTH = len(_INPUT_FIELDS) + 4 + HISTORY_WEEKS * len(ROLLING_FIELDS)
+
+
+def pack_inputs(rows: Sequence[Dict[str, Any]], out: np.ndarray) -> np.ndarray:
+    """
+    Write request rows into a flat float64 block
+
+    The block holds plain numbers only, so it can be handed to another process
+    through shared memory or a socket without pickling.
+
+    Args:
+        rows: Dicts with the same keys as ``build_row`` arguments
+        out: Block shaped at least ``(len(rows), INPUT_BLOCK_WIDTH)``
+
+    Returns:
+        The filled ``(len(rows), INPUT_BLOCK_WIDTH)`` view of ``out``
+    """
+    n_rows = len(rows)
+    block = out[:n_rows]
+    for i, field in enumerate(_INPUT_FIELDS):
+        block[:, i] = np.fromiter(
+            (row[field] for row in rows), dtype=np.float64, count=n_rows
+        )
+
+    lags = len(_INPUT_FIELDS)
+    if n_rows:
+        block[:, lags : lags + 4] = [_pad_cases(row["previous_cases"]) for row in rows]
+    if any(row.get("history") for row in rows):
+        block[:, lags + 4 :] = np.stack(
+            [history_array(row.get("history")) for row in rows]
+        ).reshape(n_rows, -1)
+    else:
+        block[:, lags + 4 :] = np.nan
+    return block
+
+
+def pack_arrays(
+    columns: Dict[str, np.ndarray],
+    cases: np.ndarray,
+    previous: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Columnar counterpart of ``pack_inputs`` (see ``build_matrix_from_arrays``)"""
+    n_rows = len(columns["weekofyear"])
+    block = np.empty((n_rows, INPUT_BLOCK_WIDTH), dtype=np.float64)
+    for i, field in enumerate(_INPUT_FIELDS):
+        block[:, i] = columns[field]
+
+    lags = len(_INPUT_FIELDS)
+    block[:, lags : lags + 4] = cases
+    block[:, lags + 4 :] = np.nan if previous is None else previous.reshape(n_rows, -1)
+    return block
+
+
+def unpack_inputs(
+    block: np.ndarray,
+) -> Tuple[Dict[str, np.ndarray], np.ndarray, Optional[np.ndarray]]:
+    """
+    Split a packed block into ``build_matrix_from_arrays`` arguments
+
+    Returns:
+        Columns, case history and weather history (None when no row has any)
+    """
+    lags = len(_INPUT_FIELDS)
+    columns = {field: block[:, i] for i, field in enumerate(_INPUT_FIELDS)}
+    cases = block[:, lags : lags + 4]
+    history = block[:, lags + 4 :]
+    previous = (
+        None
+        if np.isnan(history).all()
+        else history.reshape(len(block), HISTORY_WEEKS, len(ROLLING_FIELDS))
+    )
+    return columns, cases, previous
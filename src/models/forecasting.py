@@ -0,0 +1,146 @@
+"""
+Recursive Forecasting
+
+Multi-week outlooks built by feeding each week's predicted cases back in as
+the next week's lag features. Every series advances together, so each
+horizon is a single vectorized model call.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .features import (
+    HISTORY_WEEKS,
+    ROLLING_FIELDS,
+    WeatherHistory,
+    _pad_cases,
+    history_array,
+)
+from .predictor import OutbreakPredictor
+
+# Weather inputs carried forward from the latest observed week
+WEATHER_FIELDS = (
+    "temp_avg",
+    "temp_min",
+    "temp_max",
+    "precipitation_mm",
+    "humidity_percent",
+)
+
+
+@dataclass
+class ForecastSeries:
+    """Latest observations for one disease / region series"""
+
+    disease_id: int
+    region_id: int
+    # Monday of the latest week with observed cases
+    week_start: date
+    # Latest observed week's values for ``WEATHER_FIELDS``
+    weather: Dict[str, float]
+    # Weekly case counts, oldest first, ending with the latest observed week
+    previous_cases: Sequence[int]
+    # Weather for the weeks before the latest observed one
+    history: Optional[WeatherHistory] = None
+
+
+@dataclass
+class Forecast:
+    """Forecasts for many series, each array shaped ``(series, horizon)``"""
+
+    series: List[ForecastSeries]
+    predicted_cases: np.ndarray
+    risk_levels: np.ndarray
+    confidences: np.ndarray
+    model_version: Optional[str]
+
+    @property
+    def horizon_weeks(self) -> int:
+        return self.predicted_cases.shape[1]
+
+    def target_date(self, index: int, horizon: int) -> date:
+        """Week start a forecast refers to (``horizon`` is 1-based)"""
+        return self.series[index].week_start + timedelta(weeks=horizon)
+
+
+class RecursiveForecaster:
+    """Rolls a one-week-ahead predictor forward over several weeks"""
+
+    def __init__(self, predictor: OutbreakPredictor):
+        self.predictor = predictor
+
+    def forecast(
+        self, series: Sequence[ForecastSeries], horizon_weeks: int
+    ) -> Forecast:
+        """
+        Forecast 1..``horizon_weeks`` weeks ahead for every series
+
+        Future weeks reuse the latest observed weather (persistence), and the
+        rolling weather windows and case lags advance one week per step.
+
+        Args:
+            series: Latest observations per disease / region
+            horizon_weeks: Number of weeks to forecast
+
+        Returns:
+            Forecast arrays in ``series`` order
+        """
+        if horizon_weeks < 1:
+            raise ValueError("horizon_weeks must be at least 1")
+
+        series = list(series)
+        n_series = len(series)
+        predicted = np.zeros((n_series, horizon_weeks))
+        risk_levels = np.empty((n_series, horizon_weeks), dtype=object)
+        confidences = np.zeros((n_series, horizon_weeks))
+        if n_series == 0:
+            return Forecast(
+                series, predicted, risk_levels, confidences, self.predictor.version
+            )
+
+        weather = {
+            field: np.fromiter(
+                (s.weather[field] for s in series), dtype=np.float64, count=n_series
+            )
+            for field in WEATHER_FIELDS
+        }
+        cases = np.array([_pad_cases(s.previous_cases) for s in series])
+        latest = np.stack([weather[field] for field in ROLLING_FIELDS], axis=1)
+
+        # The first forecast week's history ends with the latest observed week
+        previous = np.stack([history_array(s.history) for s in series])
+        previous = np.concatenate(
+            [previous[:, 1:HISTORY_WEEKS], latest[:, np.newaxis]], axis=1
+        )
+
+        for step in range(horizon_weeks):
+            columns = dict(weather)
+            # ISO week of the forecast week, as training derives it from dates
+            columns["weekofyear"] = np.fromiter(
+                (
+                    (s.week_start + timedelta(weeks=step + 1)).isocalendar()[1]
+                    for s in series
+                ),
+                dtype=np.float64,
+                count=n_series,
+            )
+
+            step_cases, step_risk, step_confidence = self.predictor.predict_arrays(
+                columns, cases, previous
+            )
+            predicted[:, step] = step_cases
+            risk_levels[:, step] = step_risk
+            confidences[:, step] = step_confidence
+
+            # Feed this week's prediction back as next week's most recent lag
+            cases = np.concatenate(
+                [cases[:, 1:], np.maximum(step_cases, 0.0)[:, np.newaxis]], axis=1
+            )
+            previous = np.concatenate([previous[:, 1:], latest[:, np.newaxis]], axis=1)
+
+        return Forecast(
+            series, predicted, risk_levels, confidences, self.predictor.version
+        )
@@ -5,31 +5,54 @@ Handles ML model loading and prediction logic with proper feature engineering.
 """
 
 import pickle
+import time
 import numpy as np
-import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import logging
 
+from .artifacts import ModelArtifact, artifact_digest, is_native_artifact
+from .backends import EstimatorBackend, BoosterBackend, create_backend
+from .drift import DriftMonitor
+from .features import (
+    ROLLING_FEATURES,
+    ROLLING_FIELDS,
+    FeatureVectorBuilder,
+    WeatherHistory,
+    history_array,
+    rolling_mean,
+)
+from ..core.config import get_settings
+from ..core.metrics import INFERENCE_STAGE_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
 class OutbreakPredictor:
     """Dengue outbreak prediction model wrapper"""
 
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, nthread: Optional[int] = None):
         """
         Initialize predictor with trained model
 
         Args:
-            model_path: Path to pickled model file
+            model_path: Path to a native ``.ubj`` artifact or a pickled model file
+            nthread: XGBoost threads per call (defaults to INFERENCE_NTHREADS)
         """
         self.model_path = model_path
+        self.nthread = nthread
         self.model = None
         self.feature_columns: List[str] = []
         self.outbreak_threshold: float = 25.0
         self.metrics: Dict[str, float] = {}
         self.data_source: str = "Unknown"
+        # Training feature distribution from the artifact, if it has one
+        self.feature_reference: Optional[Dict[str, Any]] = None
+        self.drift: Optional[DriftMonitor] = None
+        # Content hash of the loaded artifact; identifies the model in caches
+        self.version: Optional[str] = None
+        self._backend: Optional[EstimatorBackend | BoosterBackend] = None
+        self._feature_builder: Optional[FeatureVectorBuilder] = None
         self._loaded = False
 
         self.load_model()
@@ -42,14 +65,26 @@ class OutbreakPredictor:
                 logger.warning(f"Model file not found: {self.model_path}")
                 return False
 
-            with open(self.model_path, "rb") as f:
-                model_data = pickle.load(f)
+            if is_native_artifact(model_file):
+                self._load_native_artifact(model_file)
+            else:
+                self._load_pickle(model_file)
+            self.version = artifact_digest(model_file)
 
-            self.model = model_data["model"]
-            self.feature_columns = model_data["feature_columns"]
-            self.outbreak_threshold = model_data.get("outbreak_threshold", 25.0)
-            self.metrics = model_data.get("metrics", {})
-            self.data_source = model_data.get("data_source", "Unknown")
+            self._backend = create_backend(
+                self.model, self.feature_columns, self.nthread
+            )
+            self._feature_builder = FeatureVectorBuilder(
+                self.feature_columns, dtype=self._backend.dtype
+            )
+            settings = get_settings()
+            if settings.DRIFT_MONITOR_ENABLED:
+                self.drift = DriftMonitor(
+                    self.feature_columns,
+                    self.feature_reference,
+                    window_rows=settings.DRIFT_WINDOW_ROWS,
+                    min_rows=settings.DRIFT_MIN_ROWS,
+                )
             self._loaded = True
 
             return True
@@ -63,6 +98,27 @@ class OutbreakPredictor:
             )
             return False
 
+    def _load_native_artifact(self, model_file: Path):
+        """Load a booster binary and its metadata sidecar"""
+        artifact = ModelArtifact(model_file)
+        self.model = artifact.load_booster()
+        self.feature_columns = artifact.feature_columns
+        self.outbreak_threshold = artifact.outbreak_threshold
+        self.metrics = artifact.metrics
+        self.data_source = artifact.data_source
+        self.feature_reference = artifact.metadata.get("feature_distribution")
+
+    def _load_pickle(self, model_file: Path):
+        """Load a pickled model dict written by the training notebook"""
+        with open(model_file, "rb") as f:
+            model_data = pickle.load(f)
+
+        self.model = model_data["model"]
+        self.feature_columns = model_data["feature_columns"]
+        self.outbreak_threshold = model_data.get("outbreak_threshold", 25.0)
+        self.metrics = model_data.get("metrics", {})
+        self.data_source = model_data.get("data_source", "Unknown")
+
     def is_loaded(self) -> bool:
         """Check if model is successfully loaded"""
         return self._loaded and self.model is not None
@@ -76,8 +132,15 @@ class OutbreakPredictor:
         humidity_percent: float,
         weekofyear: int,
         previous_cases: List[int],
+        history: Optional[WeatherHistory] = None,
     ) -> Dict[str, float]:
-        """Create features matching the training pipeline"""
+        """
+        Create features matching the training pipeline
+
+        Args:
+            history: Weather for the preceding weeks from the feature store;
+                without it the rolling features use the current week's values
+        """
 
         # Pad previous_cases to 4 elements
         cases = list(previous_cases)
@@ -85,6 +148,21 @@ class OutbreakPredictor:
             cases.insert(0, 0)
         cases = cases[-4:]
 
+        current = {
+            "temp_avg": temp_avg,
+            "precipitation_mm": precipitation_mm,
+            "humidity_percent": humidity_percent,
+        }
+        previous = history_array(history)
+        rolling = {
+            name: rolling_mean(
+                np.array([current[field]], dtype=np.float64),
+                previous[np.newaxis, :, ROLLING_FIELDS.index(field)],
+                window,
+            )[0]
+            for name, (field, window) in ROLLING_FEATURES.items()
+        }
+
         features = {
             # Base weather features
             "temp_avg": temp_avg,
@@ -98,17 +176,13 @@ class OutbreakPredictor:
             "cases_lag_2": float(cases[2]),
             "cases_lag_3": float(cases[1]),
             "cases_lag_4": float(cases[0]),
-            # Simplified 'rolling' features for weather (current week's value)
-            # NOTE: These are NOT true rolling averages. This is a temporary compromise
-            # for consistency with the training notebook due to stateless API design.
-            # True rolling averages would require historical context at inference time,
-            # a feature for future improvement.
-            "current_temp_avg_for_roll_2w": temp_avg,
-            "current_temp_avg_for_roll_4w": temp_avg,
-            "current_precip_for_roll_2w": precipitation_mm,
-            "current_precip_for_roll_4w": precipitation_mm,
-            "current_humidity_for_roll_2w": humidity_percent,
-            "current_humidity_for_roll_4w": humidity_percent,
+            # Rolling weather means over the current and preceding weeks
+            "temp_avg_roll_2w": float(rolling["temp_avg_roll_2w"]),
+            "temp_avg_roll_4w": float(rolling["temp_avg_roll_4w"]),
+            "precip_roll_2w": float(rolling["precip_roll_2w"]),
+            "precip_roll_4w": float(rolling["precip_roll_4w"]),
+            "humidity_roll_2w": float(rolling["humidity_roll_2w"]),
+            "humidity_roll_4w": float(rolling["humidity_roll_4w"]),
             # Seasonal encoding
             "week_sin": np.sin(2 * np.pi * weekofyear / 52),
             "week_cos": np.cos(2 * np.pi * weekofyear / 52),
@@ -125,14 +199,18 @@ class OutbreakPredictor:
         humidity_percent: float,
         weekofyear: int,
         previous_cases: List[int],
+        history: Optional[WeatherHistory] = None,
     ) -> Dict[str, Any]:
         """Make prediction using the loaded model"""
 
         if not self.is_loaded():
             raise ValueError("Model not loaded")
 
-        # Create features
-        features = self.create_features(
+        version = self.version or "unknown"
+        started = time.perf_counter()
+
+        # Write features straight into the model's column layout
+        row = self._feature_builder.build_row(
             temp_avg,
             temp_min,
             temp_max,
@@ -140,30 +218,194 @@ class OutbreakPredictor:
             humidity_percent,
             weekofyear,
             previous_cases,
+            history,
         )
-
-        # Build DataFrame
-        df = pd.DataFrame([features])
-
-        # Add missing features with zeros
-        for col in self.feature_columns:
-            if col not in df.columns:
-                df[col] = 0.0
-
-        # Select features in correct order
-        df = df[self.feature_columns]
+        started = self._observe_stage("features", version, started)
+        if self.drift is not None:
+            self.drift.observe(row)
 
         # Predict
-        predicted_cases = float(self.model.predict(df)[0])
+        predicted_cases = float(self._backend.predict(row.reshape(1, -1))[0])
+        started = self._observe_stage("model", version, started)
+
+        risk_level = self._assess_risk(predicted_cases)
+        started = self._observe_stage("risk", version, started)
+        confidence = self._calculate_confidence(predicted_cases)
+        self._observe_stage("confidence", version, started)
 
         return {
             "predicted_cases": predicted_cases,
-            "risk_level": self._assess_risk(predicted_cases),
-            "confidence": self._calculate_confidence(predicted_cases),
+            "risk_level": risk_level,
+            "confidence": confidence,
             "threshold": self.outbreak_threshold,
             "features_used": len(self.feature_columns),
         }
 
+    def predict_batch(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Make predictions for many inputs with a single model call
+
+        Args:
+            rows: Dicts with the same keys as the ``predict`` arguments
+
+        Returns:
+            One prediction dict per input row, in input order
+        """
+        if not self.is_loaded():
+            raise ValueError("Model not loaded")
+
+        if not rows:
+            return []
+
+        version = self.version or "unknown"
+        started = time.perf_counter()
+
+        # Build one feature matrix for the whole batch
+        matrix = self._feature_builder.build_matrix(rows)
+        self._observe_stage("matrix", version, started)
+
+        return self._result_dicts(*self.score_matrix(matrix))
+
+    def results_from_predictions(self, predicted: np.ndarray) -> List[Dict[str, Any]]:
+        """Prediction dicts for case counts scored elsewhere (e.g. a worker)"""
+        return self._result_dicts(
+            predicted,
+            self._assess_risk_array(predicted),
+            self._calculate_confidence_array(predicted),
+        )
+
+    def _result_dicts(
+        self,
+        predicted: np.ndarray,
+        risk_levels: np.ndarray,
+        confidences: np.ndarray,
+    ) -> List[Dict[str, Any]]:
+        features_used = len(self.feature_columns)
+        return [
+            {
+                "predicted_cases": float(cases),
+                "risk_level": risk,
+                "confidence": float(confidence),
+                "threshold": self.outbreak_threshold,
+                "features_used": features_used,
+            }
+            for cases, risk, confidence in zip(
+                predicted.tolist(), risk_levels.tolist(), confidences.tolist()
+            )
+        ]
+
+    def predict_arrays(
+        self,
+        columns: Dict[str, np.ndarray],
+        cases: np.ndarray,
+        previous: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score columnar inputs without per-row dicts
+
+        Args:
+            columns: Array per request field (see ``build_matrix_from_arrays``)
+            cases: Padded case history, shaped ``(n, 4)``, oldest week first
+            previous: Optional weather history for the rolling features
+
+        Returns:
+            Predicted cases, risk levels and confidences, each shaped ``(n,)``
+        """
+        if not self.is_loaded():
+            raise ValueError("Model not loaded")
+
+        started = time.perf_counter()
+        matrix = self._feature_builder.build_matrix_from_arrays(
+            columns, cases, previous
+        )
+        self._observe_stage("matrix", self.version or "unknown", started)
+        return self.score_matrix(matrix)
+
+    def score_matrix(
+        self, matrix: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Predicted cases, risk levels and confidences for a feature matrix"""
+        version = self.version or "unknown"
+        started = time.perf_counter()
+        if self.drift is not None:
+            self.drift.observe(matrix)
+
+        predicted = self._backend.predict(matrix)
+        started = self._observe_stage("model", version, started)
+
+        risk_levels = self._assess_risk_array(predicted)
+        started = self._observe_stage("risk", version, started)
+        confidences = self._calculate_confidence_array(predicted)
+        self._observe_stage("confidence", version, started)
+        return predicted, risk_levels, confidences
+
+    def observe_rows(self, rows: List[Dict[str, Any]]):
+        """Feed rows scored outside this process (e.g. by workers) to the monitor"""
+        if self.drift is not None and rows:
+            self.drift.observe(self._feature_builder.build_matrix(rows))
+
+    def get_drift_stats(self) -> Optional[Dict[str, Any]]:
+        """Input drift statistics, or None when monitoring is off"""
+        return self.drift.get_stats() if self.drift is not None else None
+
+    def feature_matrix(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        """Feature matrix for request rows, in the model's column order"""
+        if not self.is_loaded():
+            raise ValueError("Model not loaded")
+        return self._feature_builder.build_matrix(rows)
+
+    def explain_matrix(self, matrix: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Per-feature contributions for every row of a feature matrix
+
+        Contributions are in the model's margin space, so ``base_value`` plus
+        all contributions equals the raw model output for the row. Predicted
+        cases and risk levels come from the same backend call as
+        ``score_matrix``, so they always agree with ``/predict``.
+
+        Returns:
+            One explanation per row, contributions sorted by magnitude
+        """
+        if not self.is_loaded():
+            raise ValueError("Model not loaded")
+
+        version = self.version or "unknown"
+        started = time.perf_counter()
+        contributions = self._backend.contributions(matrix)
+        started = self._observe_stage("explain", version, started)
+        # Not fed to the drift monitor: explaining is not serving traffic
+        predicted = self._backend.predict(matrix)
+        self._observe_stage("model", version, started)
+        risk_levels = self._assess_risk_array(predicted)
+        order = np.argsort(-np.abs(contributions[:, :-1]), axis=1, kind="stable")
+        explanations = []
+        for i, row_order in enumerate(order):
+            explanations.append(
+                {
+                    "predicted_cases": float(predicted[i]),
+                    "risk_level": str(risk_levels[i]),
+                    "base_value": float(contributions[i, -1]),
+                    "contributions": [
+                        {
+                            "feature": self.feature_columns[j],
+                            "value": float(matrix[i, j]),
+                            "contribution": float(contributions[i, j]),
+                        }
+                        for j in row_order.tolist()
+                    ],
+                }
+            )
+        return explanations
+
+    @staticmethod
+    def _observe_stage(stage: str, version: str, started: float) -> float:
+        """Record a stage's latency and return the start time of the next"""
+        now = time.perf_counter()
+        INFERENCE_STAGE_SECONDS.observe(
+            now - started, stage=stage, model_version=version
+        )
+        return now
+
     def _assess_risk(self, predicted_cases: float) -> str:
         """Determine risk level"""
         if predicted_cases < self.outbreak_threshold * 0.5:
@@ -178,6 +420,23 @@ class OutbreakPredictor:
         normalized = min(distance / self.outbreak_threshold, 1.0)
         return round(0.70 + (normalized * 0.25), 2)
 
+    def _assess_risk_array(self, predicted_cases: np.ndarray) -> np.ndarray:
+        """Vectorized version of ``_assess_risk``"""
+        return np.select(
+            [
+                predicted_cases < self.outbreak_threshold * 0.5,
+                predicted_cases < self.outbreak_threshold,
+            ],
+            ["Low", "Medium"],
+            default="High",
+        )
+
+    def _calculate_confidence_array(self, predicted_cases: np.ndarray) -> np.ndarray:
+        """Vectorized version of ``_calculate_confidence``"""
+        distance = np.abs(predicted_cases - self.outbreak_threshold)
+        normalized = np.minimum(distance / self.outbreak_threshold, 1.0)
+        return np.round(0.70 + (normalized * 0.25), 2)
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get model metadata"""
         if not self.is_loaded():
@@ -186,6 +445,8 @@ class OutbreakPredictor:
         return {
             "status": "loaded",
             "model_type": "XGBoost",
+            "inference_backend": self._backend.name,
+            "model_version": self.version,
             "features_count": len(self.feature_columns),
             "feature_list": self.feature_columns,
             "outbreak_threshold": self.outbreak_threshold,
@@ -0,0 +1,287 @@
+"""
+Process Inference Pool
+
+Scores batches on worker processes so inference is not limited to the one
+core the API process's GIL allows. Each worker loads the model artifact once
+at start-up; inputs and predictions move through preallocated shared-memory
+slots, so only a slot name and a row count cross the process boundary.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .features import INPUT_BLOCK_WIDTH, pack_inputs, unpack_inputs
+
+logger = logging.getLogger(__name__)
+
+# State of the current worker process
+_worker_predictor = None
+_worker_blocks: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _init_worker(model_path: str, nthread: Optional[int]):
+    """Load the model once per worker process"""
+    global _worker_predictor
+    from .predictor import OutbreakPredictor
+
+    _worker_predictor = OutbreakPredictor(model_path, nthread=nthread)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open a parent-owned block, once per worker"""
+    block = _worker_blocks.get(name)
+    if block is None:
+        # The parent owns and unlinks the block; workers must not track it
+        block = shared_memory.SharedMemory(name=name, track=False)
+        _worker_blocks[name] = block
+    return block
+
+
+def _worker_version() -> Optional[str]:
+    """Version of the model a worker loaded, or None if it failed to load"""
+    predictor = _worker_predictor
+    if predictor is None or not predictor.is_loaded():
+        return None
+    return predictor.version
+
+
+def _score_slot(
+    inputs_name: str, outputs_name: str, n_rows: int, max_rows: int
+) -> Optional[str]:
+    """
+    Score the packed rows in a slot, writing predictions back in place
+
+    Returns:
+        Version of the model that scored the slot
+    """
+    predictor = _worker_predictor
+    if predictor is None or not predictor.is_loaded():
+        raise ValueError("Model not loaded")
+
+    block = np.ndarray(
+        (max_rows, INPUT_BLOCK_WIDTH),
+        dtype=np.float64,
+        buffer=_attach(inputs_name).buf,
+    )
+    out = np.ndarray((max_rows,), dtype=np.float64, buffer=_attach(outputs_name).buf)
+    predicted, _, _ = predictor.predict_arrays(*unpack_inputs(block[:n_rows]))
+    out[:n_rows] = predicted
+    return predictor.version
+
+
+class _Slot:
+    """Shared input and output buffers for one in-flight chunk"""
+
+    def __init__(self, max_rows: int):
+        self.inputs = shared_memory.SharedMemory(
+            create=True, size=max_rows * INPUT_BLOCK_WIDTH * 8
+        )
+        self.outputs = shared_memory.SharedMemory(create=True, size=max_rows * 8)
+        self.block = np.ndarray(
+            (max_rows, INPUT_BLOCK_WIDTH), dtype=np.float64, buffer=self.inputs.buf
+        )
+        self.predicted = np.ndarray(
+            (max_rows,), dtype=np.float64, buffer=self.outputs.buf
+        )
+
+    def close(self):
+        # Drop the array views first so the buffers can be released
+        self.block = None
+        self.predicted = None
+        for block in (self.inputs, self.outputs):
+            block.close()
+            block.unlink()
+
+
+class ProcessInferencePool:
+    """Pool of model-loaded worker processes fed through shared memory"""
+
+    def __init__(
+        self,
+        model_path: str,
+        processes: Optional[int] = None,
+        max_rows: int = 1024,
+        nthread: Optional[int] = None,
+    ):
+        """
+        Start the workers and wait until each has loaded the model
+
+        Args:
+            model_path: Artifact every worker loads
+            processes: Worker processes (defaults to one per CPU)
+            max_rows: Rows per shared-memory slot; larger batches are split
+            nthread: XGBoost threads per call inside each worker
+
+        Raises:
+            RuntimeError: If the workers cannot load the model
+        """
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.max_rows = max(1, max_rows)
+        self.nthread = nthread
+        self.model_path = model_path
+        # Spawned workers never inherit OpenMP or lock state from this process
+        self._context = multiprocessing.get_context("spawn")
+
+        # Two slots per worker keep each busy while its next chunk is packed
+        self._slots = [_Slot(self.max_rows) for _ in range(self.processes * 2)]
+        self._free: "queue.Queue[_Slot]" = queue.Queue()
+        for slot in self._slots:
+            self._free.put(slot)
+
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.version: Optional[str] = None
+        try:
+            self._pool, self.version = self._start(model_path)
+        except Exception:
+            self._close_slots()
+            raise
+
+    def _start(self, model_path: str) -> Tuple[ProcessPoolExecutor, str]:
+        """Start a worker pool on ``model_path`` and wait for it to load"""
+        pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(model_path, self.nthread),
+        )
+        try:
+            versions = {
+                future.result()
+                for future in [
+                    pool.submit(_worker_version) for _ in range(self.processes)
+                ]
+            }
+        except Exception:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        if None in versions or len(versions) != 1:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise RuntimeError(f"Inference workers could not load {model_path}")
+        return pool, versions.pop()
+
+    def reload(self, model_path: str):
+        """
+        Start workers on a new artifact and retire the current ones
+
+        Chunks already submitted finish on the old workers.
+
+        Raises:
+            RuntimeError: If the new workers cannot load the model; the
+                current workers keep serving
+        """
+        pool, version = self._start(model_path)
+        with self._lock:
+            previous, self._pool = self._pool, pool
+            self.model_path, self.version = model_path, version
+        if previous is not None:
+            previous.shutdown(wait=False)
+
+    def predict(self, rows: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, set]:
+        """
+        Predicted cases for canonical request rows
+
+        Returns:
+            Predictions in input order, and the model versions that scored them
+        """
+        n_rows = len(rows)
+        predicted = np.zeros(n_rows, dtype=np.float64)
+        versions: set = set()
+        pending: Deque[Tuple[_Slot, Future, int, int]] = deque()
+
+        try:
+            for start in range(0, n_rows, self.max_rows):
+                chunk = rows[start : start + self.max_rows]
+                slot = self._acquire(pending, predicted, versions)
+                try:
+                    pack_inputs(chunk, slot.block)
+                except Exception:
+                    self._free.put(slot)
+                    raise
+                with self._lock:
+                    pool = self._pool
+                    self._batches += 1
+                    self._rows += len(chunk)
+                future = pool.submit(
+                    _score_slot,
+                    slot.inputs.name,
+                    slot.outputs.name,
+                    len(chunk),
+                    self.max_rows,
+                )
+                pending.append((slot, future, start, len(chunk)))
+
+            while pending:
+                self._collect(pending.popleft(), predicted, versions)
+        finally:
+            # Never leak slots when a chunk fails
+            for slot, future, _, _ in pending:
+                if not future.cancel():
+                    # A running chunk still writes into its slot; wait it out
+                    future.exception()
+                self._free.put(slot)
+
+        return predicted, versions
+
+    def _acquire(
+        self,
+        pending: Deque[Tuple[_Slot, Future, int, int]],
+        predicted: np.ndarray,
+        versions: set,
+    ) -> _Slot:
+        """Take a free slot, finishing this call's own chunks to free one"""
+        while True:
+            try:
+                return self._free.get_nowait()
+            except queue.Empty:
+                if not pending:
+                    return self._free.get()
+                self._collect(pending.popleft(), predicted, versions)
+
+    def _collect(
+        self,
+        item: Tuple[_Slot, Future, int, int],
+        predicted: np.ndarray,
+        versions: set,
+    ):
+        slot, future, start, count = item
+        try:
+            versions.add(future.result())
+            predicted[start : start + count] = slot.predicted[:count]
+        finally:
+            self._free.put(slot)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "max_rows": self.max_rows,
+                "slots": len(self._slots),
+                "free_slots": self._free.qsize(),
+                "batches": self._batches,
+                "rows": self._rows,
+                "model_version": self.version,
+            }
+
+    def _close_slots(self):
+        for slot in self._slots:
+            slot.close()
+        self._slots = []
+
+    def shutdown(self):
+        """Stop the workers and release the shared memory"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self._close_slots()
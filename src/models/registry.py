@@ -0,0 +1,280 @@
+"""
+Model Registry
+
+Resolves the active model for a disease / region from the ModelVersion table
+and keeps a memory-bounded LRU of resident model services.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .artifacts import is_native_artifact, sidecar_path
+from .executor import BoundedExecutor
+from .service import ModelService
+from ..core.config import get_settings
+from ..database.models import ModelVersion
+
+logger = logging.getLogger(__name__)
+
+Scope = Tuple[Optional[int], Optional[int]]
+
+
+class ModelUnavailableError(RuntimeError):
+    """Raised when the model version resolved for a scope cannot be loaded"""
+
+
+@dataclass(frozen=True)
+class ResolvedModel:
+    """Active model version selected for a scope"""
+
+    model_version_id: int
+    model_version: str
+    artifact_path: Path
+
+
+def select_model_version(
+    versions: Iterable[Any], disease_id: Optional[int], region_id: Optional[int]
+) -> Optional[Any]:
+    """
+    Pick the most specific active version for a disease / region
+
+    A version scoped to both the disease and region wins over one scoped to
+    the disease only, then the region only, then a global one. Ties go to the
+    most recently trained version.
+    """
+
+    def specificity(version: Any) -> Optional[int]:
+        if version.disease_id is not None and version.disease_id != disease_id:
+            return None
+        if version.region_id is not None and version.region_id != region_id:
+            return None
+        return (2 if version.disease_id is not None else 0) + (
+            1 if version.region_id is not None else 0
+        )
+
+    best = None
+    best_rank = None
+    for version in versions:
+        if not version.is_active or not version.model_artifact_path:
+            continue
+        score = specificity(version)
+        if score is None:
+            continue
+        rank = (score, version.training_date)
+        if best_rank is None or rank > best_rank:
+            best, best_rank = version, rank
+    return best
+
+
+def _artifact_size(path: Path) -> int:
+    """On-disk size of an artifact, used as its residency cost"""
+    size = path.stat().st_size
+    if is_native_artifact(path) and sidecar_path(path).exists():
+        size += sidecar_path(path).stat().st_size
+    return size
+
+
+class ModelRegistry:
+    """Routes predictions to per-disease / per-region models"""
+
+    def __init__(
+        self,
+        default_service: ModelService,
+        base_dir: Path,
+        max_resident_bytes: Optional[int] = None,
+        resolve_ttl_seconds: Optional[float] = None,
+    ):
+        """
+        Args:
+            default_service: Serves scopes without an active ModelVersion
+            base_dir: Directory relative artifact paths are resolved against
+            max_resident_bytes: Artifact bytes kept loaded (defaults to settings)
+            resolve_ttl_seconds: How long a scope's resolution is reused
+        """
+        settings = get_settings()
+        self.default_service = default_service
+        self.base_dir = Path(base_dir)
+        self.max_resident_bytes = (
+            max_resident_bytes
+            if max_resident_bytes is not None
+            else settings.MODEL_REGISTRY_MAX_RESIDENT_MB * 1024 * 1024
+        )
+        self.resolve_ttl = (
+            resolve_ttl_seconds
+            if resolve_ttl_seconds is not None
+            else settings.MODEL_REGISTRY_RESOLVE_TTL_SECONDS
+        )
+
+        self._lock = threading.Lock()
+        self._resident: "OrderedDict[Path, Tuple[ModelService, int]]" = OrderedDict()
+        self._resident_bytes = 0
+        self._resolutions: Dict[Scope, Tuple[float, Optional[ResolvedModel]]] = {}
+        self._loading: Dict[Path, asyncio.Future] = {}
+        self._loader = BoundedExecutor(max_workers=2, max_queue=64, name="registry")
+        self._loads = 0
+        self._evictions = 0
+
+    def _artifact_path(self, path: str) -> Path:
+        artifact = Path(path)
+        if not artifact.is_absolute():
+            artifact = self.base_dir / artifact
+        return artifact.resolve()
+
+    async def resolve(
+        self,
+        db: AsyncSession,
+        disease_id: Optional[int],
+        region_id: Optional[int],
+    ) -> Optional[ResolvedModel]:
+        """Active model for a scope, or None to use the default model"""
+        scope = (disease_id, region_id)
+        cached = self._resolutions.get(scope)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        result = await db.execute(
+            select(ModelVersion).where(
+                ModelVersion.is_active.is_(True),
+                ModelVersion.model_artifact_path.is_not(None),
+                (ModelVersion.disease_id == disease_id)
+                | ModelVersion.disease_id.is_(None),
+                (ModelVersion.region_id == region_id)
+                | ModelVersion.region_id.is_(None),
+            )
+        )
+        version = select_model_version(result.scalars().all(), disease_id, region_id)
+        resolved = (
+            ResolvedModel(
+                model_version_id=version.id,
+                model_version=version.model_version,
+                artifact_path=self._artifact_path(version.model_artifact_path),
+            )
+            if version is not None
+            else None
+        )
+        self._resolutions[scope] = (time.monotonic() + self.resolve_ttl, resolved)
+        return resolved
+
+    async def get_service(
+        self,
+        db: AsyncSession,
+        disease_id: Optional[int] = None,
+        region_id: Optional[int] = None,
+    ) -> ModelService:
+        """
+        Model service for a scope, loading its model on first use
+
+        The default model only serves scopes with no active version of their
+        own. A scoped version that fails to load raises
+        ``ModelUnavailableError`` rather than answering with another model.
+        """
+        if disease_id is None and region_id is None:
+            return self.default_service
+
+        resolved = await self.resolve(db, disease_id, region_id)
+        if resolved is None:
+            return self.default_service
+
+        service = self._touch(resolved.artifact_path)
+        if service is not None:
+            return service
+
+        # Share a single load between concurrent requests for the same model
+        path = resolved.artifact_path
+        pending = self._loading.get(path)
+        if pending is None:
+            pending = asyncio.ensure_future(self._loader.run(self.load_service, path))
+            self._loading[path] = pending
+            pending.add_done_callback(lambda _: self._loading.pop(path, None))
+        service = await asyncio.shield(pending)
+        if service is None:
+            raise ModelUnavailableError(
+                f"Model {resolved.model_version} for disease {disease_id}, "
+                f"region {region_id} could not be loaded"
+            )
+        return service
+
+    def get_service_for_path(self, artifact_path: str) -> ModelService:
+        """Blocking lookup for workers without an event loop (e.g. Celery)"""
+        path = self._artifact_path(artifact_path)
+        service = self._touch(path)
+        if service is None:
+            service = self.load_service(path)
+        if service is None:
+            raise ModelUnavailableError(f"Model {path} could not be loaded")
+        return service
+
+    def load_service(self, path: Path) -> Optional[ModelService]:
+        """Load a model and make it resident, evicting least recently used ones"""
+        service = self._touch(path)
+        if service is not None:
+            return service
+
+        if Path(self.default_service.model_path).resolve() == path:
+            return self.default_service
+
+        service = ModelService(
+            str(path),
+            executor=self.default_service._executor,
+            loader=self.default_service._loader,
+            feature_store=self.default_service.feature_store,
+            # Worker processes are reserved for the default model
+            inference_mode=(
+                "thread"
+                if self.default_service.inference_mode == "process"
+                else self.default_service.inference_mode
+            ),
+            sidecar=self.default_service._sidecar,
+        )
+        if not service.is_model_loaded():
+            logger.error(f"Registry could not load model from {path}")
+            return None
+
+        size = _artifact_size(path)
+        with self._lock:
+            self._resident[path] = (service, size)
+            self._resident_bytes += size
+            self._loads += 1
+            # Always keep the model just loaded, even if it alone exceeds budget
+            while self._resident_bytes > self.max_resident_bytes and (
+                len(self._resident) > 1
+            ):
+                evicted, (_, evicted_size) = self._resident.popitem(last=False)
+                self._resident_bytes -= evicted_size
+                self._evictions += 1
+                logger.info(f"Evicted model {evicted} from registry")
+
+        logger.info(f"Registry loaded model from {path}")
+        return service
+
+    def _touch(self, path: Path) -> Optional[ModelService]:
+        with self._lock:
+            entry = self._resident.get(path)
+            if entry is None:
+                return None
+            self._resident.move_to_end(path)
+            return entry[0]
+
+    def invalidate(self):
+        """Forget scope resolutions so ModelVersion changes apply immediately"""
+        self._resolutions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resident_models": len(self._resident),
+                "resident_bytes": self._resident_bytes,
+                "max_resident_bytes": self.max_resident_bytes,
+                "loads": self._loads,
+                "evictions": self._evictions,
+                "resident_paths": [str(path) for path in self._resident],
+            }
@@ -4,48 +4,263 @@ Service Layer for Model Operations
 Provides business logic for outbreak predictions and model management.
 """
 
-from typing import Dict, Any, List, Optional
+import hashlib
+import math
+import threading
+from typing import Dict, Any, List, Optional, Sequence
+from .batching import MicroBatcher
+from .cache import PredictionCache
+from .executor import BoundedExecutor
+from .feature_store import OnlineFeatureStore, request_week
+from .forecasting import Forecast, ForecastSeries, RecursiveForecaster
 from .predictor import OutbreakPredictor
+from .process_pool import ProcessInferencePool
+from .sidecar import InferenceClient, RemotePredictor
+from ..core.config import get_settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Representative inputs used to validate and warm up a model before serving it
+SMOKE_BATCH: List[Dict[str, Any]] = [
+    {
+        "temp_avg": 27.0,
+        "temp_min": 23.0,
+        "temp_max": 31.0,
+        "precipitation_mm": 40.0,
+        "humidity_percent": 78.0,
+        "weekofyear": 30,
+        "previous_cases": [10, 12, 15, 20],
+    },
+    {
+        "temp_avg": 24.0,
+        "temp_min": 20.0,
+        "temp_max": 28.0,
+        "precipitation_mm": 0.0,
+        "humidity_percent": 60.0,
+        "weekofyear": 2,
+        "previous_cases": [1],
+    },
+]
+
 
 class ModelService:
     """Service for managing model predictions and operations"""
 
-    def __init__(self, model_path: str = "../models/dengue_outbreak_predictor.pkl"):
+    def __init__(
+        self,
+        model_path: str = "../models/dengue_outbreak_predictor.pkl",
+        batch_max_size: Optional[int] = None,
+        batch_window_ms: Optional[float] = None,
+        executor: Optional[BoundedExecutor] = None,
+        loader: Optional[BoundedExecutor] = None,
+        feature_store: Optional[OnlineFeatureStore] = None,
+        inference_mode: Optional[str] = None,
+        sidecar: Optional[InferenceClient] = None,
+    ):
         """
         Initialize model service
 
         Args:
             model_path: Path to the trained model file
+            batch_max_size: Rows per micro-batch (defaults to settings)
+            batch_window_ms: Micro-batch collection window (defaults to settings)
+            executor: Inference pool to share with other services
+            loader: Reload pool to share with other services
+            feature_store: Rolling history for requests that name a region;
+                without one every request is scored statelessly
+            inference_mode: "thread" scores batches on the inference threads,
+                "process" on a pool of worker processes and "sidecar" in the
+                host's inference server (defaults to settings)
+            sidecar: Inference server client to share with other services;
+                implies the "sidecar" mode
         """
+        settings = get_settings()
         self.predictor: Optional[OutbreakPredictor] = None
         self.model_path = model_path
+        self.feature_store = feature_store
+        self._reload_lock = threading.Lock()
+        self._executor = executor or BoundedExecutor(
+            max_workers=settings.INFERENCE_MAX_WORKERS,
+            max_queue=settings.INFERENCE_MAX_QUEUE,
+            name="inference",
+        )
+        # One reload at a time, on its own thread so it never takes an
+        # inference slot
+        self._loader = loader or BoundedExecutor(
+            max_workers=1, max_queue=0, name="model-loader"
+        )
+        self._cache = PredictionCache(
+            max_size=settings.PREDICTION_CACHE_SIZE,
+            ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+            decimals=settings.PREDICTION_CACHE_DECIMALS,
+        )
+        # Explanations are keyed on the feature vector, so requests that differ
+        # only in fields the model ignores share an entry
+        self._explanations = PredictionCache(
+            max_size=settings.EXPLANATION_CACHE_SIZE,
+            ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+        )
+        self._batcher = MicroBatcher(
+            self._score_rows,
+            max_batch_size=(
+                batch_max_size
+                if batch_max_size is not None
+                else settings.PREDICTION_BATCH_MAX_SIZE
+            ),
+            max_wait_ms=(
+                batch_window_ms
+                if batch_window_ms is not None
+                else settings.PREDICTION_BATCH_WINDOW_MS
+            ),
+            executor=self._executor,
+        )
+        self.inference_mode = (
+            "sidecar"
+            if sidecar is not None
+            else inference_mode or settings.INFERENCE_MODE
+        )
+        self._process_pool: Optional[ProcessInferencePool] = None
+        self._sidecar = sidecar or (
+            InferenceClient() if self.inference_mode == "sidecar" else None
+        )
         self._initialize_model()
 
+        if self.inference_mode == "process" and self.predictor is not None:
+            self._start_process_pool(settings)
+
     def _initialize_model(self):
         """Initialize the predictor"""
+        predictor = self._load_predictor()
+        if predictor is None:
+            logger.warning(
+                f"Model at {self.model_path} could not be loaded "
+                f"during initialization."
+            )
+            return
+
+        self.predictor = predictor
+        logger.info(f"Model from {self.model_path} loaded successfully.")
+
+    def _start_process_pool(self, settings):
+        """Start worker processes; on failure batches stay in-thread"""
         try:
-            self.predictor = OutbreakPredictor(self.model_path)
-            if not self.predictor.is_loaded():
-                logger.warning(
-                    f"Model at {self.model_path} could not be loaded "
-                    f"during initialization."
-                )
-                self.predictor = None
+            self._process_pool = ProcessInferencePool(
+                self.model_path,
+                processes=settings.INFERENCE_PROCESSES or None,
+                max_rows=settings.INFERENCE_PROCESS_MAX_ROWS,
+                nthread=settings.INFERENCE_NTHREADS,
+            )
+            logger.info(
+                f"Process inference pool started with "
+                f"{self._process_pool.processes} workers."
+            )
+        except Exception as e:
+            logger.error(
+                f"Process inference pool failed to start, scoring in-thread: {e}",
+                exc_info=True,
+            )
+
+    def _load_predictor(self) -> Optional[OutbreakPredictor]:
+        """Load, warm up and validate a predictor without publishing it"""
+        try:
+            if self._sidecar is not None:
+                predictor = RemotePredictor(self.model_path, self._sidecar)
             else:
-                logger.info(f"Model from {self.model_path} loaded successfully.")
+                predictor = OutbreakPredictor(self.model_path)
+            if not predictor.is_loaded():
+                return None
+            self._validate_predictor(predictor)
+            return predictor
         except Exception as e:
             logger.error(
-                f"Failed to initialize model from {self.model_path}: {e}", exc_info=True
+                f"Failed to load model from {self.model_path}: {e}", exc_info=True
             )
-            self.predictor = None
+            return None
+
+    @staticmethod
+    def _validate_predictor(predictor: OutbreakPredictor):
+        """
+        Run a smoke batch through a freshly loaded predictor
+
+        This also warms up the single and batch paths before they serve traffic.
+
+        Raises:
+            ValueError: If the predictor returns unusable results
+        """
+        results = predictor.predict_batch(SMOKE_BATCH)
+        results.append(predictor.predict(**SMOKE_BATCH[0]))
+        if len(results) != len(SMOKE_BATCH) + 1:
+            raise ValueError("Smoke batch returned the wrong number of predictions")
+        for result in results:
+            if not math.isfinite(result["predicted_cases"]):
+                raise ValueError("Smoke batch produced a non-finite prediction")
 
     def is_model_loaded(self) -> bool:
         """Check if model is loaded and ready"""
-        return self.predictor is not None and self.predictor.is_loaded()
+        predictor = self.predictor
+        return predictor is not None and predictor.is_loaded()
+
+    def _current_predictor(self) -> OutbreakPredictor:
+        """
+        Snapshot the serving predictor
+
+        Callers keep using the returned reference, so a concurrent reload
+        never changes the model underneath a request.
+        """
+        predictor = self.predictor
+        if predictor is None or not predictor.is_loaded():
+            raise ValueError("Model not loaded. Please train and save a model first.")
+        return predictor
+
+    def _prepare_row(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Canonicalize a request, adding feature store history for its scope
+
+        History is read for the weeks before the requested week, so requests
+        for a week that cannot be placed in a year skip the store.
+        """
+        store = self.feature_store
+        region_id = request.get("region_id")
+        if store is None or region_id is None:
+            return self._cache.canonicalize(request)
+        as_of = request_week(int(request["weekofyear"]), request.get("year"))
+        if as_of is None:
+            return self._cache.canonicalize(request)
+
+        disease_id = request.get("disease_id")
+        return self._cache.canonicalize(
+            {
+                **request,
+                "previous_cases": store.complete_cases(
+                    disease_id, region_id, request["previous_cases"], as_of
+                ),
+                "history": store.weather_history(region_id, as_of),
+            }
+        )
+
+    def _predict_rows(
+        self, predictor: OutbreakPredictor, rows: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Score canonical rows on the process pool, or in-thread without one"""
+        pool = self._process_pool
+        if pool is None or not rows:
+            return predictor.predict_batch(rows)
+
+        predicted, versions = pool.predict(rows)
+        if versions != {predictor.version}:
+            # A reload is in progress; results are cached under this version
+            return predictor.predict_batch(rows)
+        predictor.observe_rows(rows)
+        return predictor.results_from_predictions(predicted)
+
+    def _score_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score canonical rows with one model call and cache the results"""
+        predictor = self._current_predictor()
+        results = self._predict_rows(predictor, rows)
+        for row, result in zip(rows, results):
+            self._cache.put(self._cache.make_key(predictor.version, row), result)
+        return results
 
     def predict_outbreak(
         self,
@@ -56,50 +271,304 @@ class ModelService:
         humidity_percent: float,
         weekofyear: int,
         previous_cases: List[int],
+        disease_id: Optional[int] = None,
+        region_id: Optional[int] = None,
+        year: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Predict outbreak risk
 
+        Args:
+            disease_id, region_id: Scope whose feature store history feeds the
+                rolling features and fills short case histories
+            year: ISO year of ``weekofyear``; without it the store is only
+                used when ``weekofyear`` is the current week
+
+        Returns:
+            Prediction results with risk assessment
+        """
+        predictor = self._current_predictor()
+        row = self._prepare_row(
+            {
+                "temp_avg": temp_avg,
+                "temp_min": temp_min,
+                "temp_max": temp_max,
+                "precipitation_mm": precipitation_mm,
+                "humidity_percent": humidity_percent,
+                "weekofyear": weekofyear,
+                "previous_cases": previous_cases,
+                "disease_id": disease_id,
+                "region_id": region_id,
+                "year": year,
+            }
+        )
+        key = self._cache.make_key(predictor.version, row)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = predictor.predict(**row)
+        self._cache.put(key, result)
+        return result
+
+    async def predict_outbreak_async(
+        self,
+        temp_avg: float,
+        temp_min: float,
+        temp_max: float,
+        precipitation_mm: float,
+        humidity_percent: float,
+        weekofyear: int,
+        previous_cases: List[int],
+        disease_id: Optional[int] = None,
+        region_id: Optional[int] = None,
+        year: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Predict outbreak risk without blocking the event loop
+
+        Cache hits return immediately; misses from concurrent calls are
+        micro-batched into a single model call.
+
         Returns:
             Prediction results with risk assessment
         """
+        predictor = self._current_predictor()
+        row = self._prepare_row(
+            {
+                "temp_avg": temp_avg,
+                "temp_min": temp_min,
+                "temp_max": temp_max,
+                "precipitation_mm": precipitation_mm,
+                "humidity_percent": humidity_percent,
+                "weekofyear": weekofyear,
+                "previous_cases": previous_cases,
+                "disease_id": disease_id,
+                "region_id": region_id,
+                "year": year,
+            }
+        )
+        cached = self._cache.get(self._cache.make_key(predictor.version, row))
+        if cached is not None:
+            return cached
+
+        return await self._batcher.submit(row)
+
+    def predict_outbreak_batch(
+        self, requests: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Predict outbreak risk for many inputs in one model call
+
+        Args:
+            requests: Dicts with the same keys as ``predict_outbreak`` arguments
+
+        Returns:
+            Prediction results in input order
+        """
+        predictor = self._current_predictor()
+        rows = [self._prepare_row(request) for request in requests]
+        keys = [self._cache.make_key(predictor.version, row) for row in rows]
+        results: List[Optional[Dict[str, Any]]] = [self._cache.get(k) for k in keys]
+
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            scored = self._predict_rows(predictor, [rows[i] for i in misses])
+            for i, result in zip(misses, scored):
+                self._cache.put(keys[i], result)
+                results[i] = result
+
+        return results
+
+    async def predict_outbreak_batch_async(
+        self, requests: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Predict outbreak risk for many inputs on the inference pool
+
+        Raises:
+            ExecutorSaturatedError: If the inference pool is full
+        """
         if not self.is_model_loaded():
             raise ValueError("Model not loaded. Please train and save a model first.")
 
-        return self.predictor.predict(
-            temp_avg=temp_avg,
-            temp_min=temp_min,
-            temp_max=temp_max,
-            precipitation_mm=precipitation_mm,
-            humidity_percent=humidity_percent,
-            weekofyear=weekofyear,
-            previous_cases=previous_cases,
+        return await self._executor.run(self.predict_outbreak_batch, requests)
+
+    def explain(
+        self, requests: List[Dict[str, Any]], top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Per-feature contributions for many inputs in one model call
+
+        Args:
+            requests: Dicts with the same keys as ``predict_outbreak`` arguments
+            top_k: Keep only the largest contributions per explanation
+
+        Returns:
+            Explanations in input order
+        """
+        predictor = self._current_predictor()
+        rows = [self._prepare_row(request) for request in requests]
+        matrix = predictor.feature_matrix(rows)
+        keys = [
+            (predictor.version, hashlib.blake2b(row.tobytes(), digest_size=16).digest())
+            for row in matrix
+        ]
+        results: List[Optional[Dict[str, Any]]] = [
+            self._explanations.get(key) for key in keys
+        ]
+
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            explained = predictor.explain_matrix(matrix[misses])
+            for i, explanation in zip(misses, explained):
+                self._explanations.put(keys[i], explanation)
+                results[i] = explanation
+
+        if top_k is not None:
+            results = [
+                {**result, "contributions": result["contributions"][:top_k]}
+                for result in results
+            ]
+        return results
+
+    async def explain_async(
+        self, requests: List[Dict[str, Any]], top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Explain on the inference pool
+
+        Raises:
+            ExecutorSaturatedError: If the inference pool is full
+        """
+        if not self.is_model_loaded():
+            raise ValueError("Model not loaded. Please train and save a model first.")
+
+        return await self._executor.run(self.explain, requests, top_k)
+
+    def forecast(
+        self, series: Sequence[ForecastSeries], horizon_weeks: int
+    ) -> Forecast:
+        """
+        Forecast 1..``horizon_weeks`` weeks ahead for many series
+
+        Returns:
+            Forecast arrays in ``series`` order
+        """
+        return RecursiveForecaster(self._current_predictor()).forecast(
+            series, horizon_weeks
         )
 
+    async def forecast_async(
+        self, series: Sequence[ForecastSeries], horizon_weeks: int
+    ) -> Forecast:
+        """
+        Forecast on the inference pool
+
+        Raises:
+            ExecutorSaturatedError: If the inference pool is full
+        """
+        return await self._executor.run(self.forecast, series, horizon_weeks)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit, miss and eviction counters for the prediction cache"""
+        return self._cache.get_stats()
+
+    def get_drift_stats(self) -> Optional[Dict[str, Any]]:
+        """Input drift of the current model, or None when not monitored"""
+        predictor = self.predictor
+        if predictor is None or not predictor.is_loaded():
+            return None
+        return predictor.get_drift_stats()
+
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Queue depth and wait-time metrics for the inference and loader pools"""
+        stats = {
+            "inference": self._executor.get_stats(),
+            "loader": self._loader.get_stats(),
+        }
+        if self._process_pool is not None:
+            stats["processes"] = self._process_pool.get_stats()
+        return stats
+
     def get_model_statistics(self) -> Dict[str, Any]:
         """Get model performance statistics and metadata"""
-        if not self.is_model_loaded():
+        predictor = self.predictor
+        if predictor is None or not predictor.is_loaded():
             return {
                 "status": "not_loaded",
                 "message": (
                     "Model not loaded. Run the training notebook to create a model."
                 ),
+                "executor": self.get_executor_stats(),
+                "cache": self.get_cache_stats(),
             }
 
-        return {"status": "loaded", **self.predictor.get_model_info()}
+        return {
+            "status": "loaded",
+            **predictor.get_model_info(),
+            "executor": self.get_executor_stats(),
+            "cache": self.get_cache_stats(),
+            "drift": self.get_drift_stats(),
+        }
 
     def reload_model(self) -> bool:
-        """Reload the model from disk"""
-        try:
-            self._initialize_model()
-            if self.is_model_loaded():
-                logger.info("Model reloaded successfully.")
-                return True
-            else:
+        """
+        Reload the model from disk
+
+        The new model is loaded, warmed up and validated while the current one
+        keeps serving, then swapped in with a single reference assignment.
+        Requests already running finish on the old model, and a failed reload
+        leaves the old model in place.
+        """
+        with self._reload_lock:
+            if self._sidecar is not None:
+                try:
+                    # Every API worker on the host picks up the new version
+                    self._sidecar.reload(self.model_path)
+                except Exception as e:
+                    logger.error(f"Model reload failed in the inference sidecar: {e}")
+                    return False
+
+            predictor = self._load_predictor()
+            if predictor is None:
                 logger.error(
-                    "Model reload failed: Model is still not loaded after attempt."
+                    "Model reload failed: new model could not be loaded or "
+                    "validated; keeping the current model."
                 )
                 return False
-        except Exception as e:
-            logger.error(f"Failed to reload model: {e}", exc_info=True)
-            return False
+
+            if self._process_pool is not None:
+                try:
+                    self._process_pool.reload(self.model_path)
+                except Exception as e:
+                    logger.error(
+                        f"Model reload failed: inference workers could not load "
+                        f"the new model ({e}); keeping the current model."
+                    )
+                    return False
+
+            previous, self.predictor = self.predictor, predictor
+            if previous is None or previous.version != predictor.version:
+                # Entries are keyed on the old version and can never hit again
+                self._cache.clear()
+                self._explanations.clear()
+            logger.info("Model reloaded successfully.")
+            return True
+
+    def shutdown(self):
+        """Stop inference worker processes and sidecar connections, if any"""
+        pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.shutdown()
+        if self._sidecar is not None:
+            self._sidecar.close()
+
+    async def reload_model_async(self) -> bool:
+        """
+        Reload the model on the loader thread without blocking the event loop
+
+        Raises:
+            ExecutorSaturatedError: If a reload is already running
+        """
+        return await self._loader.run(self.reload_model)
@@ -0,0 +1,503 @@
+"""
+Inference Sidecar
+
+A local inference server that owns the models for every API worker on a
+host, and the client that talks to it over a Unix domain socket. Requests
+are length-prefixed frames carrying packed input blocks, and concurrent
+requests from all workers are micro-batched into one model call.
+
+Frame layout (little-endian)::
+
+    request:  u32 length | u8 op | u16 path length | model path | payload
+    response: u32 length | u8 status | u16 version length | version | payload
+
+A predict payload is ``u32 rows`` followed by a float64 block of
+``rows x INPUT_BLOCK_WIDTH`` values, answered with ``rows`` float64
+predictions. Info answers with JSON metadata, errors with a UTF-8 message.
+
+Artifacts may be pickles, so the server only loads models from its
+configured model directories, and the socket is created owner-only.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from .batching import MicroBatcher
+from .executor import BoundedExecutor
+from .features import INPUT_BLOCK_WIDTH, pack_arrays, pack_inputs, unpack_inputs
+from .predictor import OutbreakPredictor
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+OP_PREDICT = 1
+OP_INFO = 2
+OP_RELOAD = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Largest frame either side accepts
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+_LENGTH = struct.Struct("<I")
+_REQUEST = struct.Struct("<BH")
+_RESPONSE = struct.Struct("<BH")
+_ROWS = struct.Struct("<I")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+class SidecarError(RuntimeError):
+    """Raised when the inference sidecar rejects a request"""
+
+
+def encode_request(op: int, model_path: str, payload: bytes = b"") -> bytes:
+    path = model_path.encode()
+    body = _REQUEST.pack(op, len(path)) + path + payload
+    return _LENGTH.pack(len(body)) + body
+
+
+def decode_request(body: bytes) -> Tuple[int, str, bytes]:
+    op, path_length = _REQUEST.unpack_from(body)
+    start = _REQUEST.size
+    path = body[start : start + path_length].decode()
+    return op, path, body[start + path_length :]
+
+
+def encode_response(status: int, version: str = "", payload: bytes = b"") -> bytes:
+    encoded = version.encode()
+    body = _RESPONSE.pack(status, len(encoded)) + encoded + payload
+    return _LENGTH.pack(len(body)) + body
+
+
+def decode_response(body: bytes) -> Tuple[int, str, bytes]:
+    status, version_length = _RESPONSE.unpack_from(body)
+    start = _RESPONSE.size
+    version = body[start : start + version_length].decode()
+    return status, version, body[start + version_length :]
+
+
+def encode_block(block: np.ndarray) -> bytes:
+    block = np.ascontiguousarray(block, dtype=np.float64)
+    return _ROWS.pack(len(block)) + block.tobytes()
+
+
+def decode_block(payload: bytes) -> np.ndarray:
+    (n_rows,) = _ROWS.unpack_from(payload)
+    values = np.frombuffer(payload, dtype=np.float64, offset=_ROWS.size)
+    if values.size != n_rows * INPUT_BLOCK_WIDTH:
+        raise ValueError(
+            f"Expected {n_rows} rows of {INPUT_BLOCK_WIDTH} values, "
+            f"got {values.size} values"
+        )
+    return values.reshape(n_rows, INPUT_BLOCK_WIDTH)
+
+
+class InferenceServer:
+    """Serves every model on the host to all API workers"""
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        batch_max_size: Optional[int] = None,
+        batch_window_ms: Optional[float] = None,
+        model_dirs: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            socket_path: Unix socket to listen on (defaults to settings)
+            batch_max_size: Requests per cross-worker batch (defaults to settings)
+            batch_window_ms: Batch collection window (defaults to settings)
+            model_dirs: Directories models may be loaded from; relative ones
+                are under the project root (defaults to ``INFERENCE_MODEL_DIRS``
+                and ``TRAINING_ARTIFACT_DIR``)
+        """
+        settings = get_settings()
+        self.socket_path = socket_path or settings.INFERENCE_SOCKET_PATH
+        if model_dirs is None:
+            model_dirs = [
+                *settings.INFERENCE_MODEL_DIRS.split(","),
+                settings.TRAINING_ARTIFACT_DIR,
+            ]
+        self.model_dirs = [
+            (PROJECT_ROOT / directory.strip()).resolve()
+            for directory in model_dirs
+            if directory.strip()
+        ]
+        self.batch_max_size = (
+            batch_max_size
+            if batch_max_size is not None
+            else settings.PREDICTION_BATCH_MAX_SIZE
+        )
+        self.batch_window_ms = (
+            batch_window_ms
+            if batch_window_ms is not None
+            else settings.PREDICTION_BATCH_WINDOW_MS
+        )
+        self._executor = BoundedExecutor(
+            max_workers=settings.INFERENCE_MAX_WORKERS,
+            max_queue=settings.INFERENCE_MAX_QUEUE,
+            name="sidecar",
+        )
+        self._loader = BoundedExecutor(
+            max_workers=1, max_queue=settings.INFERENCE_MAX_QUEUE, name="sidecar-loader"
+        )
+        self._predictors: Dict[str, OutbreakPredictor] = {}
+        self._batchers: Dict[str, MicroBatcher] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _load(self, model_path: str, replace: bool = False) -> OutbreakPredictor:
+        """Load a model once, or again on reload"""
+        # Loading a pickle runs code, so never load one a client points at
+        # outside the model directories. The checked path is the one opened
+        # and cached, so a relative or symlinked path cannot slip past it
+        resolved = Path(model_path).resolve()
+        if not any(resolved.is_relative_to(d) for d in self.model_dirs):
+            raise ValueError(f"{model_path} is outside the sidecar's model directories")
+        model_path = str(resolved)
+
+        with self._lock:
+            predictor = self._predictors.get(model_path)
+        if predictor is not None and not replace:
+            return predictor
+
+        predictor = OutbreakPredictor(model_path)
+        if not predictor.is_loaded():
+            raise ValueError(f"Model not loaded from {model_path}")
+        with self._lock:
+            if replace or model_path not in self._predictors:
+                self._predictors[model_path] = predictor
+            logger.info(f"Sidecar serving {model_path} ({predictor.version})")
+            return self._predictors[model_path]
+
+    async def _predictor(self, model_path: str) -> OutbreakPredictor:
+        predictor = self._predictors.get(model_path)
+        if predictor is None:
+            predictor = await self._loader.run(self._load, model_path)
+        return predictor
+
+    def _batcher(self, model_path: str) -> MicroBatcher:
+        batcher = self._batchers.get(model_path)
+        if batcher is None:
+            batcher = MicroBatcher(
+                lambda blocks: self._score_blocks(model_path, blocks),
+                max_batch_size=self.batch_max_size,
+                max_wait_ms=self.batch_window_ms,
+                executor=self._executor,
+            )
+            self._batchers[model_path] = batcher
+        return batcher
+
+    def _score_blocks(
+        self, model_path: str, blocks: List[np.ndarray]
+    ) -> List[Tuple[str, np.ndarray]]:
+        """Score requests from many workers with one model call"""
+        predictor = self._predictors[model_path]
+        merged = blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+        predicted, _, _ = predictor.predict_arrays(*unpack_inputs(merged))
+        splits = np.cumsum([len(block) for block in blocks])[:-1]
+        return [(predictor.version, part) for part in np.split(predicted, splits)]
+
+    async def dispatch(self, op: int, model_path: str, payload: bytes) -> bytes:
+        """Answer one decoded request with an encoded response frame"""
+        try:
+            # Models are cached under their resolved path, as ``_load`` opens
+            model_path = str(Path(model_path).resolve())
+            if op == OP_PREDICT:
+                block = decode_block(payload)
+                await self._predictor(model_path)
+                version, predicted = await self._batcher(model_path).submit(block)
+                return encode_response(
+                    STATUS_OK, version, predicted.astype(np.float64).tobytes()
+                )
+            if op == OP_INFO:
+                predictor = await self._predictor(model_path)
+                info = predictor.get_model_info()
+                return encode_response(
+                    STATUS_OK,
+                    predictor.version,
+                    json.dumps(info, default=float).encode(),
+                )
+            if op == OP_RELOAD:
+                predictor = await self._loader.run(self._load, model_path, True)
+                return encode_response(STATUS_OK, predictor.version)
+            raise ValueError(f"Unknown op {op}")
+        except Exception as e:
+            logger.warning(f"Sidecar request for {model_path} failed: {e}")
+            return encode_response(STATUS_ERROR, payload=str(e).encode())
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one API worker connection until it closes"""
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_LENGTH.size)
+                except asyncio.IncompleteReadError:
+                    break
+                (length,) = _LENGTH.unpack(header)
+                if length > MAX_FRAME_BYTES:
+                    logger.warning(f"Closing connection after a {length} byte frame")
+                    break
+                op, model_path, payload = decode_request(
+                    await reader.readexactly(length)
+                )
+                writer.write(await self.dispatch(op, model_path, payload))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, preload: Optional[List[str]] = None):
+        """Load ``preload`` models and start listening"""
+        for model_path in preload or []:
+            await self._loader.run(self._load, str(Path(model_path).resolve()))
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        # Only processes running as the same user may connect. The socket is
+        # created with these permissions, so there is no window before a chmod
+        umask = os.umask(0o077)
+        try:
+            self._server = await asyncio.start_unix_server(
+                self._handle, path=self.socket_path
+            )
+        finally:
+            os.umask(umask)
+        logger.info(f"Inference sidecar listening on {self.socket_path}")
+
+    async def serve_forever(self, preload: Optional[List[str]] = None):
+        await self.start(preload)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server.close_clients()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._executor.shutdown(wait=False)
+        self._loader.shutdown(wait=False)
+
+
+class InferenceClient:
+    """Blocking sidecar client; each thread keeps its own connection"""
+
+    def __init__(
+        self, socket_path: Optional[str] = None, timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            socket_path: Sidecar socket (defaults to settings)
+            timeout: Seconds to wait for a response (defaults to settings)
+        """
+        settings = get_settings()
+        self.socket_path = socket_path or settings.INFERENCE_SOCKET_PATH
+        self.timeout = (
+            timeout
+            if timeout is not None
+            else settings.INFERENCE_SIDECAR_TIMEOUT_SECONDS
+        )
+        self._local = threading.local()
+        self._connections: set = set()
+        self._lock = threading.Lock()
+
+    def _connection(self) -> socket.socket:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(self.socket_path)
+            except OSError:
+                connection.close()
+                raise
+            self._local.connection = connection
+            with self._lock:
+                self._connections.add(connection)
+        return connection
+
+    def _disconnect(self):
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            with self._lock:
+                self._connections.discard(connection)
+            connection.close()
+
+    @staticmethod
+    def _receive(connection: socket.socket, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = connection.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Inference sidecar closed the connection")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _call(
+        self, op: int, model_path: str, payload: bytes = b""
+    ) -> Tuple[str, bytes]:
+        """
+        Send one request and wait for its response
+
+        A connection that fails before the request is sent (e.g. to a
+        restarted sidecar) is retried once. Failures after sending, timeouts
+        included, are not: the sidecar may already have run the request.
+
+        Raises:
+            SidecarError: If the sidecar answered with an error
+            OSError: If the sidecar cannot be reached
+        """
+        # The sidecar may run from another working directory
+        frame = encode_request(op, str(Path(model_path).resolve()), payload)
+        for attempt in (1, 2):
+            sent = False
+            try:
+                connection = self._connection()
+                connection.sendall(frame)
+                sent = True
+                (length,) = _LENGTH.unpack(self._receive(connection, _LENGTH.size))
+                if length > MAX_FRAME_BYTES:
+                    raise ConnectionError(f"Sidecar sent a {length} byte frame")
+                body = self._receive(connection, length)
+                break
+            except OSError:
+                # The stream may be mid-frame; never reuse it
+                self._disconnect()
+                if sent or attempt == 2:
+                    raise
+
+        status, version, payload = decode_response(body)
+        if status != STATUS_OK:
+            raise SidecarError(payload.decode(errors="replace"))
+        return version, payload
+
+    def info(self, model_path: str) -> Dict[str, Any]:
+        """Metadata of the sidecar's model for ``model_path``"""
+        _, payload = self._call(OP_INFO, model_path)
+        return json.loads(payload)
+
+    def predict(self, model_path: str, block: np.ndarray) -> Tuple[str, np.ndarray]:
+        """
+        Predicted cases for a packed input block
+
+        Returns:
+            Version of the model that scored the block, and its predictions
+        """
+        version, payload = self._call(OP_PREDICT, model_path, encode_block(block))
+        return version, np.frombuffer(payload, dtype=np.float64)
+
+    def reload(self, model_path: str) -> str:
+        """Make the sidecar reload ``model_path`` from disk"""
+        version, _ = self._call(OP_RELOAD, model_path)
+        return version
+
+    def close(self):
+        """Close every thread's connection"""
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+class RemotePredictor(OutbreakPredictor):
+    """
+    Predictor whose model lives in the inference sidecar
+
+    Only metadata is held locally; risk levels and confidences are still
+    derived here from the predicted cases.
+    """
+
+    def __init__(self, model_path: str, client: InferenceClient):
+        self.client = client
+        super().__init__(model_path)
+
+    def load_model(self) -> bool:
+        """Fetch the sidecar model's metadata"""
+        try:
+            info = self.client.info(self.model_path)
+        except (OSError, SidecarError) as e:
+            logger.error(f"Inference sidecar has no model for {self.model_path}: {e}")
+            self._loaded = False
+            return False
+
+        self.version = info["model_version"]
+        self.feature_columns = info["feature_list"]
+        self.outbreak_threshold = info["outbreak_threshold"]
+        self.metrics = info["performance_metrics"]
+        self.data_source = info["data_source"]
+        self._remote_backend = info["inference_backend"]
+        self._loaded = True
+        return True
+
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def _predict_block(self, block: np.ndarray) -> np.ndarray:
+        version, predicted = self.client.predict(self.model_path, block)
+        if version != self.version:
+            # Another worker reloaded the sidecar; pick up the new threshold
+            logger.info(f"Sidecar model changed to {version}, refreshing metadata")
+            self.load_model()
+        return predicted
+
+    def predict(self, **row: Any) -> Dict[str, Any]:
+        return self.predict_batch([row])[0]
+
+    def predict_batch(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not self.is_loaded():
+            raise ValueError("Model not loaded")
+        if not rows:
+            return []
+        block = pack_inputs(rows, np.empty((len(rows), INPUT_BLOCK_WIDTH)))
+        return self.results_from_predictions(self._predict_block(block))
+
+    def predict_arrays(
+        self,
+        columns: Dict[str, np.ndarray],
+        cases: np.ndarray,
+        previous: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if not self.is_loaded():
+            raise ValueError("Model not loaded")
+        predicted = self._predict_block(pack_arrays(columns, cases, previous))
+        return (
+            predicted,
+            self._assess_risk_array(predicted),
+            self._calculate_confidence_array(predicted),
+        )
+
+    def feature_matrix(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        raise ValueError("Explanations need a model loaded in the API process")
+
+    def get_model_info(self) -> Dict[str, Any]:
+        if not self.is_loaded():
+            return {"status": "not_loaded"}
+
+        return {
+            "status": "loaded",
+            "model_type": "XGBoost",
+            "inference_backend": f"sidecar:{self._remote_backend}",
+            "model_version": self.version,
+            "features_count": len(self.feature_columns),
+            "feature_list": self.feature_columns,
+            "outbreak_threshold": self.outbreak_threshold,
+            "performance_metrics": self.metrics,
+            "data_source": self.data_source,
+        }
@@ -0,0 +1,545 @@
+"""
+Model Training
+
+Rebuilds the notebook's training run as a library: weekly history from the
+database or the DengAI CSVs, the predictor's own feature layout, rolling-origin
+cross-validation of hyperparameter candidates on a process pool, and a native
+artifact written at the end.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .artifacts import artifact_digest, save_artifact
+from .drift import feature_distribution
+from .features import (
+    FEATURE_NAMES,
+    HISTORY_WEEKS,
+    ROLLING_FIELDS,
+    FeatureVectorBuilder,
+)
+
+logger = logging.getLogger(__name__)
+
+# Weekly input columns every history frame carries, next to series / date /
+# cases
+WEEKLY_FIELDS = (
+    "weekofyear",
+    "temp_avg",
+    "temp_min",
+    "temp_max",
+    "precipitation_mm",
+    "humidity_percent",
+)
+
+# DengAI column -> weekly field, as renamed in the training notebook
+DENGAI_COLUMNS = {
+    "reanalysis_avg_temp_k": "temp_avg",
+    "reanalysis_min_air_temp_k": "temp_min",
+    "reanalysis_max_air_temp_k": "temp_max",
+    "precipitation_amt_mm": "precipitation_mm",
+    "reanalysis_relative_humidity_percent": "humidity_percent",
+}
+
+# Hyperparameter candidates tried by default; includes the notebook's model
+DEFAULT_PARAM_GRID = [
+    {"n_estimators": n_estimators, "max_depth": max_depth, "learning_rate": rate}
+    for n_estimators, max_depth, rate in itertools.product(
+        (100, 300), (3, 6), (0.05, 0.1)
+    )
+]
+
+# Case counts above this quantile of the training target count as outbreaks
+OUTBREAK_QUANTILE = 0.75
+
+RANDOM_STATE = 42
+
+
+@dataclass
+class TrainingSet:
+    """Feature matrix and target, rows sorted by week"""
+
+    features: np.ndarray
+    target: np.ndarray
+    dates: np.ndarray
+    series: np.ndarray
+    feature_columns: List[str]
+
+    def __len__(self) -> int:
+        return len(self.target)
+
+
+@dataclass
+class CandidateScore:
+    """Cross-validated metrics of one hyperparameter candidate"""
+
+    params: Dict[str, Any]
+    mae: float
+    rmse: float
+    r2: float
+    folds: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "params": self.params,
+            "MAE": self.mae,
+            "RMSE": self.rmse,
+            "R2": self.r2,
+            "folds": self.folds,
+        }
+
+
+@dataclass
+class TrainingResult:
+    """Artifact written by a training run and how it was chosen"""
+
+    artifact_path: Path
+    model_version: str
+    params: Dict[str, Any]
+    metrics: Dict[str, float]
+    outbreak_threshold: float
+    rows: int
+    series: int
+    data_start: datetime
+    data_end: datetime
+    candidates: List[CandidateScore] = field(default_factory=list)
+
+
+def load_dengai_csv(
+    data_dir: Union[str, Path], cities: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """
+    Weekly history from the DengAI training CSVs
+
+    Applies the notebook's preparation: its column renames, Kelvin to Celsius,
+    and forward / backward filled gaps within each city.
+
+    Args:
+        data_dir: Folder with ``dengue_features_train.csv`` and
+            ``dengue_labels_train.csv``
+        cities: Cities to keep (e.g. ``["sj"]``); all of them by default
+
+    Returns:
+        Frame with ``series`` (the city), ``date``, ``cases`` and
+        ``WEEKLY_FIELDS`` columns
+    """
+    data_dir = Path(data_dir)
+    labels_path = data_dir / "dengue_labels_train.csv"
+    if not labels_path.exists():
+        raise FileNotFoundError(
+            f"{labels_path} not found; download it from "
+            f"https://www.drivendata.org/competitions/44/"
+            f"dengai-predicting-disease-spread/"
+        )
+
+    features = pd.read_csv(data_dir / "dengue_features_train.csv")
+    labels = pd.read_csv(labels_path)
+    frame = features.merge(labels, on=["city", "year", "weekofyear"])
+    if cities:
+        frame = frame[frame["city"].isin(cities)]
+
+    frame = frame.rename(columns={**DENGAI_COLUMNS, "total_cases": "cases"})
+    for column in ("temp_avg", "temp_min", "temp_max"):
+        frame[column] = frame[column] - 273.15
+    frame["series"] = frame["city"]
+    frame["date"] = pd.to_datetime(frame["week_start_date"])
+    frame = frame.sort_values(["series", "date"])
+
+    columns = ["series", "date", "cases", *WEEKLY_FIELDS]
+    frame = frame[columns].copy()
+    filled = list(WEEKLY_FIELDS[1:])
+    frame[filled] = frame.groupby("series")[filled].transform(
+        lambda values: values.ffill().bfill()
+    )
+    return frame.reset_index(drop=True)
+
+
+async def load_database_history(
+    db, disease_id: Optional[int] = None, region_id: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Weekly history of every disease / region series in the database
+
+    Weekly totals are aggregated in Postgres with the same rules as the
+    forecast service, so training sees what inference will be fed.
+
+    Returns:
+        Frame in the ``load_dengai_csv`` layout; ``series`` is
+        ``"<disease_id>:<region_id>"``
+    """
+    from sqlalchemy import func, select
+
+    from ..database.models import EnvironmentalData, OutbreakData
+
+    week = func.date_trunc("week", OutbreakData.date).label("week")
+    cases = select(
+        OutbreakData.disease_id,
+        OutbreakData.region_id,
+        week,
+        func.sum(OutbreakData.case_count).label("cases"),
+    ).group_by(OutbreakData.disease_id, OutbreakData.region_id, week)
+    if disease_id:
+        cases = cases.where(OutbreakData.disease_id == disease_id)
+    if region_id:
+        cases = cases.where(OutbreakData.region_id == region_id)
+    case_rows = (await db.execute(cases)).all()
+
+    week = func.date_trunc("week", EnvironmentalData.date).label("week")
+    weather = select(
+        EnvironmentalData.region_id,
+        week,
+        func.avg(EnvironmentalData.temperature_avg).label("temp_avg"),
+        func.avg(EnvironmentalData.temperature_min).label("temp_min"),
+        func.avg(EnvironmentalData.temperature_max).label("temp_max"),
+        func.sum(EnvironmentalData.rainfall_mm).label("precipitation_mm"),
+        func.avg(EnvironmentalData.humidity_avg).label("humidity_percent"),
+    ).group_by(EnvironmentalData.region_id, week)
+    if region_id:
+        weather = weather.where(EnvironmentalData.region_id == region_id)
+    weather_rows = (await db.execute(weather)).all()
+
+    case_frame = pd.DataFrame(
+        case_rows, columns=["disease_id", "region_id", "date", "cases"]
+    )
+    weather_frame = pd.DataFrame(
+        weather_rows, columns=["region_id", "date", *WEEKLY_FIELDS[1:]]
+    ).astype({name: float for name in WEEKLY_FIELDS[1:]})
+    frame = case_frame.merge(weather_frame, on=["region_id", "date"], how="left")
+
+    frame["date"] = pd.to_datetime(frame["date"]).dt.tz_localize(None)
+    frame["cases"] = frame["cases"].astype(float)
+    frame["weekofyear"] = frame["date"].dt.isocalendar().week.astype(float)
+    frame["series"] = (
+        frame["disease_id"].astype(str) + ":" + frame["region_id"].astype(str)
+    )
+    frame = frame.sort_values(["series", "date"])
+    return frame[["series", "date", "cases", *WEEKLY_FIELDS]].reset_index(drop=True)
+
+
+def _regular_weeks(group: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per week from a series' first week to its last
+
+    Consecutive rows a few days off a full week (DengAI restarts its weeks
+    on January 1st) still count as adjacent; missing weeks become NaN rows so
+    lags never reach across a gap.
+    """
+    days = group["date"].diff().dt.days.to_numpy()[1:]
+    steps = np.maximum(1, np.rint(days / 7)).astype(int)
+    index = np.concatenate(([0], np.cumsum(steps)))
+    return group.set_index(index).reindex(np.arange(index[-1] + 1))
+
+
+def build_training_set(
+    history: pd.DataFrame, feature_columns: Sequence[str] = FEATURE_NAMES
+) -> TrainingSet:
+    """
+    Feature rows for every week with four weeks of case history before it
+
+    Features are written by the predictor's ``FeatureVectorBuilder``, so a
+    model trained on them sees exactly the layout it is served with.
+
+    Args:
+        history: Frame in the ``load_dengai_csv`` layout
+        feature_columns: Feature layout of the model to train
+    """
+    history = history.drop_duplicates(["series", "date"])
+    frame = pd.concat(
+        [
+            _regular_weeks(group).assign(series=name)
+            for name, group in history.groupby("series", sort=True)
+        ],
+        ignore_index=True,
+    )
+    by_series = frame.groupby("series", sort=False)
+
+    # Case history, oldest week first, and weather for the preceding weeks
+    cases = np.column_stack(
+        [by_series["cases"].shift(lag).to_numpy(float) for lag in (4, 3, 2, 1)]
+    )
+    previous = np.stack(
+        [
+            np.column_stack(
+                [by_series[name].shift(lag).to_numpy(float) for name in ROLLING_FIELDS]
+            )
+            for lag in range(HISTORY_WEEKS, 0, -1)
+        ],
+        axis=1,
+    )
+    columns = {name: frame[name].to_numpy(float) for name in WEEKLY_FIELDS}
+    target = frame["cases"].to_numpy(float)
+
+    valid = ~np.isnan(target) & ~np.isnan(cases).any(axis=1)
+    for values in columns.values():
+        valid &= ~np.isnan(values)
+
+    order = np.argsort(frame["date"].to_numpy()[valid], kind="stable")
+    builder = FeatureVectorBuilder(feature_columns)
+    features = builder.build_matrix_from_arrays(
+        {name: values[valid][order] for name, values in columns.items()},
+        cases[valid][order],
+        previous[valid][order],
+    )
+    return TrainingSet(
+        features=features,
+        target=target[valid][order],
+        dates=frame["date"].to_numpy()[valid][order],
+        series=frame["series"].to_numpy()[valid][order],
+        feature_columns=list(feature_columns),
+    )
+
+
+def rolling_origin_folds(
+    dates: np.ndarray, folds: int, min_train_fraction: float = 0.5
+) -> List[Tuple[int, int]]:
+    """
+    Expanding-window folds over rows sorted by date
+
+    The weeks after the first ``min_train_fraction`` of the history are cut
+    into ``folds`` consecutive test blocks; each fold trains on every row
+    before its block, so no fold sees the future.
+
+    Returns:
+        ``(train_end, test_end)`` row offsets: rows ``[0, train_end)`` train,
+        ``[train_end, test_end)`` test
+    """
+    weeks = np.unique(dates)
+    first_test = int(len(weeks) * min_train_fraction)
+    if folds < 1 or len(weeks) - first_test < folds or first_test < 1:
+        raise ValueError(f"{len(weeks)} weeks of history are too few for {folds} folds")
+
+    cutoffs = weeks[np.linspace(first_test, len(weeks), folds + 1).astype(int)[:-1]]
+    offsets = np.searchsorted(dates, cutoffs).tolist() + [len(dates)]
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def regression_metrics(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
+    """MAE, RMSE and R² as reported by the notebook"""
+    errors = predicted - actual
+    total = ((actual - actual.mean()) ** 2).sum()
+    return {
+        "MAE": float(np.abs(errors).mean()),
+        "RMSE": float(np.sqrt((errors**2).mean())),
+        "R2": float(1 - (errors**2).sum() / total) if total else 0.0,
+    }
+
+
+# Training data of the current worker process
+_worker_features: Optional[np.ndarray] = None
+_worker_target: Optional[np.ndarray] = None
+
+
+def _init_worker(features: np.ndarray, target: np.ndarray):
+    """Receive the training data once per worker rather than once per fit"""
+    global _worker_features, _worker_target
+    _worker_features, _worker_target = features, target
+
+
+def _fit(params: Dict[str, Any], n_jobs: int, features, target):
+    from xgboost import XGBRegressor
+
+    model = XGBRegressor(**params, random_state=RANDOM_STATE, n_jobs=n_jobs)
+    model.fit(features, target)
+    return model
+
+
+def _score_fold(
+    candidate: int, params: Dict[str, Any], train_end: int, test_end: int
+) -> Tuple[int, Dict[str, float]]:
+    """Fit one candidate on one fold's training rows and score its test rows"""
+    features, target = _worker_features, _worker_target
+    model = _fit(params, 1, features[:train_end], target[:train_end])
+    predicted = model.predict(features[train_end:test_end])
+    return candidate, regression_metrics(target[train_end:test_end], predicted)
+
+
+def cross_validate(
+    training_set: TrainingSet,
+    param_grid: Sequence[Dict[str, Any]],
+    folds: int = 5,
+    processes: int = 0,
+) -> List[CandidateScore]:
+    """
+    Score every candidate on every rolling-origin fold
+
+    Each (candidate, fold) fit is a separate single-threaded task, so the
+    whole grid spreads across ``processes`` workers. Workers are spawned
+    rather than forked because XGBoost's OpenMP runtime is not fork-safe.
+
+    Args:
+        processes: Worker processes (0 = one per CPU, 1 = run in this process)
+
+    Returns:
+        Candidate scores, best (lowest mean RMSE) first
+    """
+    splits = rolling_origin_folds(training_set.dates, folds)
+    tasks = [
+        (candidate, params, train_end, test_end)
+        for candidate, params in enumerate(param_grid)
+        for train_end, test_end in splits
+    ]
+    processes = min(processes or os.cpu_count() or 1, len(tasks))
+
+    started = time.perf_counter()
+    if processes <= 1:
+        _init_worker(training_set.features, training_set.target)
+        results = [_score_fold(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(training_set.features, training_set.target),
+        ) as pool:
+            results = list(pool.map(_score_fold, *zip(*tasks)))
+    logger.info(
+        f"Cross-validated {len(param_grid)} candidates on {len(splits)} folds "
+        f"with {processes} process(es) in {time.perf_counter() - started:.1f}s"
+    )
+
+    by_candidate: Dict[int, List[Dict[str, float]]] = {}
+    for candidate, metrics in results:
+        by_candidate.setdefault(candidate, []).append(metrics)
+    scores = [
+        CandidateScore(
+            params=dict(param_grid[candidate]),
+            mae=float(np.mean([m["MAE"] for m in fold_metrics])),
+            rmse=float(np.mean([m["RMSE"] for m in fold_metrics])),
+            r2=float(np.mean([m["R2"] for m in fold_metrics])),
+            folds=len(fold_metrics),
+        )
+        for candidate, fold_metrics in sorted(by_candidate.items())
+    ]
+    scores.sort(key=lambda score: score.rmse)
+    return scores
+
+
+def train_model(
+    training_set: TrainingSet,
+    artifact_path: Union[str, Path],
+    param_grid: Optional[Sequence[Dict[str, Any]]] = None,
+    folds: int = 5,
+    processes: int = 0,
+    data_source: str = "Unknown",
+) -> TrainingResult:
+    """
+    Pick hyperparameters by cross-validation and write the final model
+
+    The winning candidate is refit on every row using all cores, and its
+    cross-validated scores are stored as the artifact's metrics.
+
+    Args:
+        artifact_path: Destination ``.ubj`` path
+        param_grid: Candidates to compare (defaults to ``DEFAULT_PARAM_GRID``)
+        processes: Cross-validation worker processes (0 = one per CPU)
+    """
+    if len(training_set) == 0:
+        raise ValueError("No training rows with four weeks of case history")
+
+    scores = cross_validate(
+        training_set, param_grid or DEFAULT_PARAM_GRID, folds, processes
+    )
+    best = scores[0]
+    model = _fit(
+        best.params, os.cpu_count() or 1, training_set.features, training_set.target
+    )
+
+    threshold = float(np.quantile(training_set.target, OUTBREAK_QUANTILE))
+    metrics = {"MAE": best.mae, "RMSE": best.rmse, "R2": best.r2}
+    data_start = pd.Timestamp(training_set.dates[0]).to_pydatetime()
+    data_end = pd.Timestamp(training_set.dates[-1]).to_pydatetime()
+    series = len(np.unique(training_set.series))
+    path = save_artifact(
+        model,
+        artifact_path,
+        feature_columns=training_set.feature_columns,
+        outbreak_threshold=threshold,
+        metrics=metrics,
+        data_source=data_source,
+        extra={
+            "feature_distribution": feature_distribution(
+                training_set.features, training_set.feature_columns
+            ),
+            "training": {
+                "trained_at": datetime.now(timezone.utc).isoformat(),
+                "params": best.params,
+                "rows": len(training_set),
+                "series": series,
+                "data_start": data_start.isoformat(),
+                "data_end": data_end.isoformat(),
+                "cv_folds": folds,
+                "candidates": [score.to_dict() for score in scores],
+            },
+        },
+    )
+    logger.info(
+        f"Trained {path} with {best.params}: CV MAE {best.mae:.2f}, "
+        f"RMSE {best.rmse:.2f}"
+    )
+    return TrainingResult(
+        artifact_path=path,
+        model_version=artifact_digest(path),
+        params=best.params,
+        metrics=metrics,
+        outbreak_threshold=threshold,
+        rows=len(training_set),
+        series=series,
+        data_start=data_start,
+        data_end=data_end,
+        candidates=scores,
+    )
+
+
+async def register_model_version(
+    db,
+    result: TrainingResult,
+    model_name: str,
+    disease_id: Optional[int] = None,
+    region_id: Optional[int] = None,
+    artifact_path: Optional[str] = None,
+    activate: bool = True,
+):
+    """
+    Record a trained artifact in ``model_versions``
+
+    The registry prefers the most recently trained active version for a
+    scope, so an activated row takes over once scope lookups refresh.
+
+    Args:
+        artifact_path: Path to store (defaults to the written path); relative
+            paths are resolved against the registry's base directory
+    """
+    from ..database.models import ModelVersion
+
+    version = ModelVersion(
+        model_name=model_name,
+        model_version=result.model_version,
+        model_type="xgboost",
+        disease_id=disease_id,
+        region_id=region_id,
+        training_date=datetime.now(),
+        training_data_range_start=result.data_start,
+        training_data_range_end=result.data_end,
+        model_metrics={
+            **result.metrics,
+            "outbreak_threshold": result.outbreak_threshold,
+            "params": result.params,
+            "rows": result.rows,
+        },
+        model_artifact_path=artifact_path or str(result.artifact_path),
+        is_active=activate,
+    )
+    db.add(version)
+    await db.commit()
+    return version
@@ -0,0 +1,102 @@
+"""
+ETL Checkpoints
+
+Progress of resumable loads. A checkpoint records how many raw input records
+a load has fully committed, and is written in the same transaction as the
+loaded rows, so after an interruption the load restarts right after the last
+committed chunk with nothing lost or applied twice.
+"""
+
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from ...database.models import ETLCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+class LoadCheckpoint:
+    """In-memory view of one ``etl_checkpoints`` row"""
+
+    def __init__(
+        self,
+        job_id: str,
+        data_type: str,
+        records_done: int = 0,
+        rows_loaded: int = 0,
+        rows_failed: int = 0,
+        completed: bool = False,
+    ):
+        self.job_id = job_id
+        self.data_type = data_type
+        self.records_done = records_done
+        self.rows_loaded = rows_loaded
+        self.rows_failed = rows_failed
+        self.completed = completed
+
+    @classmethod
+    async def resume(
+        cls, db: AsyncSession, job_id: str, data_type: str
+    ) -> "LoadCheckpoint":
+        """The stored progress of a job, or a fresh checkpoint"""
+        result = await db.execute(
+            select(ETLCheckpoint).where(ETLCheckpoint.job_id == job_id)
+        )
+        row: Optional[ETLCheckpoint] = result.scalars().first()
+        if row is None:
+            return cls(job_id, data_type)
+        if row.data_type != data_type:
+            raise ValueError(
+                f"Checkpoint {job_id!r} belongs to a {row.data_type} load, "
+                f"not {data_type}"
+            )
+
+        logger.info(
+            f"Resuming {data_type} load {job_id!r} after {row.records_done} records"
+        )
+        return cls(
+            job_id,
+            data_type,
+            records_done=row.records_done,
+            rows_loaded=row.rows_loaded,
+            rows_failed=row.rows_failed,
+            completed=row.completed_at is not None,
+        )
+
+    async def save(
+        self,
+        db: AsyncSession,
+        loaded: int = 0,
+        failed: int = 0,
+        completed: bool = False,
+    ):
+        """
+        Write the checkpoint in the current transaction; the caller commits
+
+        Args:
+            loaded: Rows inserted or updated since the last save
+            failed: Rows rejected since the last save
+            completed: Mark the whole load as finished
+        """
+        self.rows_loaded += loaded
+        self.rows_failed += failed
+        self.completed = self.completed or completed
+
+        values = {
+            "records_done": self.records_done,
+            "rows_loaded": self.rows_loaded,
+            "rows_failed": self.rows_failed,
+            "completed_at": func.now() if self.completed else None,
+        }
+        stmt = insert(ETLCheckpoint.__table__).values(
+            job_id=self.job_id, data_type=self.data_type, **values
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["job_id"],
+                set_={**values, "updated_at": func.now()},
+            )
+        )
@@ -0,0 +1,377 @@
+"""
+Columnar ETL
+
+Vectorized counterparts of ``DataValidator`` and ``DataCleaner`` for large
+batches. Records are split into per-key columns once, every validation rule
+is evaluated as a boolean mask and every cleaning step as an array operation,
+so the per-record work left is building the output dicts.
+
+Cleaned records equal the record-by-record path's, values and Python types
+alike (e.g. a humidity clamped by ``min(100, max(0, h))`` is the int 100 or
+0, not a float). Rows whose values the arrays cannot reproduce (NaN counts,
+unparseable dates) are cleaned by the record cleaner, and batches that cannot
+be held as columns at all raise ``IrregularBatch`` so the caller can fall
+back.
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Record = Dict[str, Any]
+
+# Floats at or beyond this magnitude do not fit the int64 count columns
+_INT64_LIMIT = 2.0**63
+
+
+class IrregularBatch(ValueError):
+    """The batch has values the columnar path cannot reproduce exactly"""
+
+
+class ColumnarBatch:
+    """A batch of records, read one column at a time as rules need them"""
+
+    def __init__(self, records: Sequence[Record]):
+        self.records = records
+        self.size = len(records)
+        self._columns: Dict[str, Optional[List[Any]]] = {}
+        self._numeric: Dict[str, np.ndarray] = {}
+
+    def column(self, key: str) -> Optional[List[Any]]:
+        """Values of ``key`` in record order, or None if no record has it"""
+        if key not in self._columns:
+            values = None
+            if key in self.records[0]:
+                try:
+                    values = [record[key] for record in self.records]
+                except KeyError:
+                    raise IrregularBatch(f"some records lack {key}")
+            elif any(key in record for record in self.records):
+                raise IrregularBatch(f"some records lack {key}")
+            self._columns[key] = values
+        return self._columns[key]
+
+    def value(self, key: str, index: int, default: Any = 0) -> Any:
+        """The original value of one record"""
+        column = self.column(key)
+        return default if column is None else column[index]
+
+    def truthy(self, key: str) -> np.ndarray:
+        """``bool(record.get(key))`` for every record"""
+        column = self.column(key)
+        if column is None:
+            return np.zeros(self.size, dtype=bool)
+        return np.array([bool(value) for value in column], dtype=bool)
+
+    def numeric(self, key: str, default: Any = 0) -> np.ndarray:
+        """``record.get(key, default)`` for every record, as a numeric array"""
+        column = self.column(key)
+        if column is None:
+            return np.full(self.size, default)
+        if key not in self._numeric:
+            values = np.asarray(column)
+            if values.dtype.kind not in "bif":
+                raise IrregularBatch(f"{key} is not numeric")
+            self._numeric[key] = values
+        return self._numeric[key]
+
+    def unchanged(self, key: str, rows: np.ndarray, values: Any) -> bool:
+        """Whether the rows already hold these cleaned values, as the same type"""
+        original = self._numeric.get(key)
+        if (
+            not isinstance(values, np.ndarray)
+            or original is None
+            or not np.array_equal(original[rows], values)
+        ):
+            return False
+        # Equal arrays can still hide other Python types (True for 1.0)
+        expected = {"b": bool, "i": int, "f": float}[values.dtype.kind]
+        return all(type(value) is expected for value in self.column(key))
+
+    def optional(self, key: str) -> np.ndarray:
+        """Numeric array of a present column that may hold None (read as 0)"""
+        if key not in self._numeric:
+            values = np.asarray([0 if v is None else v for v in self.column(key)])
+            if values.dtype.kind not in "bif":
+                raise IrregularBatch(f"{key} is not numeric")
+            self._numeric[key] = values
+        return self._numeric[key]
+
+
+# A rule flags records that fail it; its message may reference {value}
+Rule = Tuple[str, Callable[[ColumnarBatch, str], np.ndarray], str]
+
+
+def _missing(batch: ColumnarBatch, key: str) -> np.ndarray:
+    return ~batch.truthy(key)
+
+
+def _negative(batch: ColumnarBatch, key: str) -> np.ndarray:
+    return batch.numeric(key) < 0
+
+
+def _outside(low: float, high: float) -> Callable[[ColumnarBatch, str], np.ndarray]:
+    def check(batch: ColumnarBatch, key: str) -> np.ndarray:
+        values = batch.numeric(key)
+        return (values < low) | (values > high)
+
+    return check
+
+
+OUTBREAK_RULES: Sequence[Rule] = (
+    ("disease_id", _missing, "Missing disease_id"),
+    ("region_id", _missing, "Missing region_id"),
+    ("date", _missing, "Missing date"),
+    ("case_count", _negative, "case_count cannot be negative"),
+    ("hospitalization_count", _negative, "hospitalization_count cannot be negative"),
+)
+
+ENVIRONMENTAL_RULES: Sequence[Rule] = (
+    ("region_id", _missing, "Missing region_id"),
+    ("date", _missing, "Missing date"),
+    ("temperature_avg", _outside(-50, 60), "Invalid temperature_avg: {value}"),
+    ("rainfall_mm", _negative, "Invalid rainfall_mm: {value}"),
+    ("humidity_avg", _outside(0, 100), "Invalid humidity_avg: {value}"),
+)
+
+DIGITAL_SIGNAL_RULES: Sequence[Rule] = (
+    ("region_id", _missing, "Missing region_id"),
+    ("date", _missing, "Missing date"),
+    ("signal_type", _missing, "Missing signal_type"),
+    ("signal_source", _missing, "Missing signal_source"),
+    ("signal_value", _negative, "signal_value cannot be negative"),
+)
+
+
+def validate_columns(
+    batch: ColumnarBatch, rules: Sequence[Rule]
+) -> Tuple[np.ndarray, List[Tuple[int, str]]]:
+    """
+    Apply rules in order; each record reports the first rule it fails
+
+    Returns:
+        Mask of valid records and ``(index, message)`` for the others
+    """
+    failed = np.zeros(batch.size, dtype=bool)
+    errors = []
+    for key, check, message in rules:
+        flagged = check(batch, key) & ~failed
+        for index in np.flatnonzero(flagged).tolist():
+            errors.append((index, message.format(value=batch.value(key, index))))
+        failed |= flagged
+    return ~failed, errors
+
+
+def _round(values: np.ndarray, digits: int) -> np.ndarray:
+    """``round(value, digits)`` elementwise, with Python's rounding"""
+    values = values.astype(np.float64)
+    rounded = np.round(values, digits)
+    # np.round scales by 10**digits first, which can push a value that is
+    # just below a tie over it; redo values that close to a tie exactly
+    scaled = values * 10.0**digits
+    with np.errstate(invalid="ignore"):
+        ties = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-9 * (np.abs(scaled) + 1)
+    for index in np.flatnonzero(ties).tolist():
+        rounded[index] = round(float(values[index]), digits)
+    return rounded
+
+
+def _positive(values: np.ndarray) -> np.ndarray:
+    """``max(0, value)`` elementwise (NaN becomes 0, as with ``max``)"""
+    return np.where(values > 0, values, 0)
+
+
+def _clamped(
+    values: np.ndarray, cleaned: np.ndarray, high: Optional[int] = None
+) -> List[Any]:
+    """
+    Cleaned floats as Python values, with the int bounds ``max(0, value)``
+    and ``min(high, value)`` return when they clamp
+    """
+    result = cleaned.tolist()
+    for index in np.flatnonzero(~(values > 0)).tolist():
+        result[index] = 0
+    if high is not None:
+        for index in np.flatnonzero((values > 0) & (values >= high)).tolist():
+            result[index] = high
+    return result
+
+
+def _to_int(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """``int(value)`` elementwise, plus a mask of values ``int`` rejects"""
+    if values.dtype.kind != "f":
+        return values.astype(np.int64), np.zeros(len(values), dtype=bool)
+    bad = ~(np.abs(values) < _INT64_LIMIT)
+    return np.trunc(np.where(bad, 0, values)).astype(np.int64), bad
+
+
+def _parse_dates(values: List[Any]) -> Tuple[List[Any], np.ndarray]:
+    """
+    ISO date strings parsed once per distinct value
+
+    Returns:
+        The column with strings replaced by datetimes, and a mask of
+        strings that failed to parse (left as they were)
+    """
+    try:
+        distinct = set(values)
+    except TypeError:
+        raise IrregularBatch("date column holds unhashable values")
+
+    parsed: Dict[str, datetime] = {}
+    invalid = set()
+    for value in {v for v in distinct if isinstance(v, str)}:
+        try:
+            parsed[value] = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            invalid.add(value)
+
+    dates = [parsed.get(v, v) if isinstance(v, str) else v for v in values]
+    bad = np.zeros(len(values), dtype=bool)
+    if invalid:
+        bad = np.array(
+            [isinstance(v, str) and v in invalid for v in values], dtype=bool
+        )
+    return dates, bad
+
+
+def _truthy_only(
+    batch: ColumnarBatch, key: str, rows: np.ndarray, cleaned: Sequence[Any]
+) -> List[Any]:
+    """Cleaned values where the original is truthy, the original elsewhere"""
+    column = batch.column(key)
+    truthy = batch.truthy(key)[rows].tolist()
+    return [
+        value if keep else column[index]
+        for value, keep, index in zip(cleaned, truthy, rows.tolist())
+    ]
+
+
+# A cleaner returns replacement columns for the valid rows and a mask of
+# rows that must go through the record cleaner instead
+Overrides = Tuple[Dict[str, Any], np.ndarray]
+
+
+def _clean_dates(
+    batch: ColumnarBatch, rows: np.ndarray, overrides: Dict[str, Any], bad: np.ndarray
+):
+    column = batch.column("date")
+    if column is not None:
+        dates = [column[index] for index in rows.tolist()]
+        overrides["date"], invalid = _parse_dates(dates)
+        bad |= invalid
+
+
+def clean_outbreak_columns(batch: ColumnarBatch, rows: np.ndarray) -> Overrides:
+    overrides: Dict[str, Any] = {}
+    bad = np.zeros(len(rows), dtype=bool)
+    for key in (
+        "case_count",
+        "hospitalization_count",
+        "death_count",
+        "recovered_count",
+    ):
+        counts, invalid = _to_int(batch.numeric(key)[rows])
+        overrides[key] = _positive(counts)
+        bad |= invalid
+    overrides["is_preliminary"] = batch.truthy("is_preliminary")[rows]
+    _clean_dates(batch, rows, overrides, bad)
+    return overrides, bad
+
+
+def clean_environmental_columns(batch: ColumnarBatch, rows: np.ndarray) -> Overrides:
+    overrides: Dict[str, Any] = {}
+    bad = np.zeros(len(rows), dtype=bool)
+    for key in ("temperature_avg", "temperature_min", "temperature_max", "rainfall_mm"):
+        overrides[key] = _round(batch.numeric(key)[rows], 2)
+    # min(100, max(0, h)), including max's NaN -> 0
+    raw = batch.numeric("humidity_avg")[rows].astype(np.float64)
+    humidity = _positive(raw)
+    humidity = np.where(humidity < 100, humidity, 100)
+    overrides["humidity_avg"] = _clamped(raw, _round(humidity, 2), high=100)
+    for key in ("wind_speed_avg", "vector_index"):
+        if batch.column(key) is not None:
+            raw = batch.optional(key)[rows].astype(np.float64)
+            cleaned = _clamped(raw, _round(_positive(raw), 2))
+            overrides[key] = _truthy_only(batch, key, rows, cleaned)
+    _clean_dates(batch, rows, overrides, bad)
+    return overrides, bad
+
+
+def clean_digital_signal_columns(batch: ColumnarBatch, rows: np.ndarray) -> Overrides:
+    overrides: Dict[str, Any] = {}
+    bad = np.zeros(len(rows), dtype=bool)
+    raw = batch.numeric("signal_value")[rows].astype(np.float64)
+    overrides["signal_value"] = _clamped(raw, _round(_positive(raw), 4))
+    if batch.column("signal_volume") is not None:
+        volumes, invalid = _to_int(batch.optional("signal_volume")[rows])
+        bad |= invalid & batch.truthy("signal_volume")[rows]
+        overrides["signal_volume"] = _truthy_only(
+            batch, "signal_volume", rows, _positive(volumes).tolist()
+        )
+    overrides["is_anomaly"] = batch.truthy("is_anomaly")[rows]
+    _clean_dates(batch, rows, overrides, bad)
+    return overrides, bad
+
+
+def _select(values: Any, keep: np.ndarray) -> List[Any]:
+    if isinstance(values, np.ndarray):
+        return values[keep].tolist()
+    return [value for value, kept in zip(values, keep.tolist()) if kept]
+
+
+def process_columns(
+    records: Sequence[Record],
+    rules: Sequence[Rule],
+    clean_columns: Callable[[ColumnarBatch, np.ndarray], Overrides],
+    clean_record: Callable[[Record], Record],
+    offset: int = 0,
+) -> Tuple[List[Record], List[str]]:
+    """
+    Validate and clean a batch column-wise
+
+    Args:
+        records: Raw records
+        rules: Validation rules in the order the record validator checks them
+        clean_columns: Column-wise cleaner for the valid rows
+        clean_record: Record cleaner for rows the columns cannot reproduce
+        offset: Number of the first record in error messages
+
+    Returns:
+        Cleaned records and ``"Record {i}: ..."`` errors, in record order
+
+    Raises:
+        IrregularBatch: The records cannot be held as columns
+    """
+    if not records:
+        return [], []
+
+    batch = ColumnarBatch(records)
+    valid, errors = validate_columns(batch, rules)
+    rows = np.flatnonzero(valid)
+    overrides, bad = clean_columns(batch, rows)
+
+    # Copies of the kept records with the cleaned columns written over them,
+    # the same keys in the same order as the record cleaner produces
+    keep = ~bad
+    cleaned = [records[index].copy() for index in rows[keep].tolist()]
+    for key, values in overrides.items():
+        if batch.unchanged(key, rows, values):
+            continue
+        for record, value in zip(cleaned, _select(values, keep)):
+            record[key] = value
+
+    fallback = {}
+    for index in rows[bad].tolist():
+        try:
+            fallback[index] = clean_record(records[index])
+        except Exception as e:
+            errors.append((index, f"Cleaning error - {str(e)}"))
+    if fallback:
+        by_index = dict(zip(rows[keep].tolist(), cleaned))
+        by_index.update(fallback)
+        cleaned = [by_index[index] for index in sorted(by_index)]
+
+    errors.sort(key=lambda error: error[0])
+    return cleaned, [f"Record {offset + index}: {message}" for index, message in errors]
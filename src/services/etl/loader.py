@@ -4,146 +4,359 @@ ETL Data Loader
 Handles bulk loading of cleaned data into the database.
 """
 
-from datetime import datetime
-from typing import List, Dict, Any
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import List, Dict, Any, Callable, Optional, Sequence, Type
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import (
+    Boolean,
+    Select,
+    column,
+    false,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.exc import DataError, IntegrityError
 import logging
 
+from ...core.config import get_settings
+from ...database.core import Base
 from ...database.models import (
     OutbreakData,
     EnvironmentalData,
     DigitalSignal,
 )
+from ...models.feature_store import OnlineFeatureStore, get_feature_store
+from .checkpoint import LoadCheckpoint
 
 logger = logging.getLogger(__name__)
 
+# Natural key of each table, matching its unique constraint
+OUTBREAK_KEY = ("disease_id", "region_id", "date")
+ENVIRONMENTAL_KEY = ("region_id", "date")
+DIGITAL_SIGNAL_KEY = ("region_id", "date", "signal_type", "signal_source")
+
+
+def _on_conflict_update(
+    stmt: Insert, key: Sequence[str], columns: Sequence[str]
+) -> Insert:
+    """
+    Overwrite the given non-key columns on conflict when any of them differs;
+    return inserted flags
+
+    Rows whose values all match the stored row are left alone (no new tuple,
+    WAL record or ``updated_at`` bump) and return nothing.
+    """
+    updates = {column: stmt.excluded[column] for column in columns if column not in key}
+    changed = [
+        stmt.table.c[column].is_distinct_from(value)
+        for column, value in updates.items()
+    ]
+    updates["updated_at"] = func.now()
+    return stmt.on_conflict_do_update(
+        index_elements=key,
+        set_=updates,
+        where=or_(*changed) if changed else false(),
+    ).returning(literal_column("xmax = 0", Boolean).label("inserted"))
+
+
+def upsert_statement(
+    model: Type[Base], key: Sequence[str], columns: Sequence[str]
+) -> Insert:
+    """
+    ``INSERT ... ON CONFLICT (key) DO UPDATE`` for rows with these columns
+
+    Only the given columns are overwritten on conflict, so a record that
+    omits an optional column leaves the stored value alone. Each inserted or
+    changed row returns whether it was inserted (``xmax = 0``) or updated;
+    unchanged rows return nothing.
+    """
+    return _on_conflict_update(insert(model.__table__), key, columns)
+
+
+def merge_statement(
+    model: Type[Base], key: Sequence[str], columns: Sequence[str], stage: str
+) -> Select:
+    """
+    Upsert every row of a staging table in one statement
+
+    Returns:
+        A query for ``(inserted, total)`` over the inserted or changed rows
+    """
+    source = table(stage, *[column(name) for name in columns])
+    stmt = insert(model.__table__).from_select(list(columns), select(source))
+    merged = _on_conflict_update(stmt, key, columns).cte("merged")
+    return select(func.count().filter(merged.c.inserted), func.count()).select_from(
+        merged
+    )
+
+
+def dedupe_by_key(
+    records: List[Dict[str, Any]], key: Sequence[str]
+) -> List[Dict[str, Any]]:
+    """
+    Keep the last record per natural key
+
+    One statement cannot insert and then update the same row, so a batch
+    that repeats a key keeps its last version, as sequential writes would.
+    """
+    latest = {tuple(record[column] for column in key): record for record in records}
+    if len(latest) < len(records):
+        logger.debug(f"Dropped {len(records) - len(latest)} repeated keys")
+    return list(latest.values())
+
+
+@dataclass
+class LoadResult:
+    """Outcome of loading one batch of cleaned records"""
+
+    inserted: int = 0
+    updated: int = 0
+    # Rows identical to the stored row, skipped without a write
+    unchanged: int = 0
+    # Rows rejected by the database, isolated without aborting the batch
+    failed: int = 0
+    # Records replaced by a later record with the same key in the batch
+    superseded: int = 0
+    errors: List[str] = field(default_factory=list)
+
 
 class DataLoader:
     """Loads cleaned data into database with upsert logic"""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        feature_store: Optional[OnlineFeatureStore] = None,
+        batch_rows: Optional[int] = None,
+        copy_min_rows: Optional[int] = None,
+        savepoint_rows: Optional[int] = None,
+    ):
+        """
+        Args:
+            batch_rows: Rows per multi-row INSERT statement (default:
+                ``ETL_UPSERT_BATCH_ROWS``)
+            copy_min_rows: Batches of at least this many rows are bulk loaded
+                through COPY and a staging table (default:
+                ``ETL_COPY_MIN_ROWS``; 0 disables it)
+            savepoint_rows: Rows per savepoint within the load transaction
+                (default: ``ETL_SAVEPOINT_ROWS``)
+        """
+        settings = get_settings()
         self.db = db
+        # Committed rows are mirrored into the online feature store
+        self.feature_store = feature_store or get_feature_store()
+        self.batch_rows = batch_rows or settings.ETL_UPSERT_BATCH_ROWS
+        self.copy_min_rows = (
+            settings.ETL_COPY_MIN_ROWS if copy_min_rows is None else copy_min_rows
+        )
+        self.savepoint_rows = savepoint_rows or settings.ETL_SAVEPOINT_ROWS
 
     async def load_outbreak_data(
-        self, records: List[Dict[str, Any]]
-    ) -> tuple[int, int]:
-        """
-        Load outbreak data with upsert logic.
-        Returns (inserted_count, updated_count)
+        self,
+        records: List[Dict[str, Any]],
+        checkpoint: Optional[LoadCheckpoint] = None,
+    ) -> LoadResult:
+        """Load outbreak data with upsert logic in one transaction"""
+        return await self._load(
+            OutbreakData,
+            OUTBREAK_KEY,
+            records,
+            checkpoint,
+            self.feature_store.record_outbreak_rows,
+        )
+
+    async def load_environmental_data(
+        self,
+        records: List[Dict[str, Any]],
+        checkpoint: Optional[LoadCheckpoint] = None,
+    ) -> LoadResult:
+        """Load environmental data with upsert logic in one transaction"""
+        return await self._load(
+            EnvironmentalData,
+            ENVIRONMENTAL_KEY,
+            records,
+            checkpoint,
+            self.feature_store.record_environmental_rows,
+        )
+
+    async def load_digital_signals(
+        self,
+        records: List[Dict[str, Any]],
+        checkpoint: Optional[LoadCheckpoint] = None,
+    ) -> LoadResult:
+        """Load digital signals with upsert logic in one transaction"""
+        return await self._load(DigitalSignal, DIGITAL_SIGNAL_KEY, records, checkpoint)
+
+    async def _load(
+        self,
+        model: Type[Base],
+        key: Sequence[str],
+        records: List[Dict[str, Any]],
+        checkpoint: Optional[LoadCheckpoint],
+        mirror: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    ) -> LoadResult:
         """
-        inserted = 0
-        updated = 0
+        Upsert records in one transaction of ``savepoint_rows`` savepoints
 
-        for record in records:
-            try:
-                existing = await self.db.execute(
-                    select(OutbreakData).where(
-                        OutbreakData.disease_id == record["disease_id"],
-                        OutbreakData.region_id == record["region_id"],
-                        OutbreakData.date == record["date"],
-                    )
+        A savepoint whose rows violate a constraint is rolled back and split
+        in halves until the offending rows are isolated, so a bad row costs a
+        few extra statements instead of the whole batch. The checkpoint, if
+        given, is saved in the same transaction, so it only advances when the
+        rows it covers are committed.
+        """
+        result = LoadResult()
+        loaded: List[Dict[str, Any]] = []
+        rows = dedupe_by_key(records, key)
+        result.superseded = len(records) - len(rows)
+        try:
+            for start in range(0, len(rows), self.savepoint_rows):
+                chunk = rows[start : start + self.savepoint_rows]
+                loaded.extend(await self._load_savepoint(model, key, chunk, result))
+            if checkpoint is not None:
+                await checkpoint.save(
+                    self.db,
+                    loaded=result.inserted + result.updated,
+                    failed=result.failed,
                 )
-                existing_record = existing.scalars().first()
-
-                if existing_record:
-                    for key, value in record.items():
-                        if key not in ["disease_id", "region_id", "date"]:
-                            setattr(existing_record, key, value)
-                    existing_record.updated_at = datetime.now()
-                    updated += 1
-                else:
-                    new_record = OutbreakData(**record)
-                    self.db.add(new_record)
-                    inserted += 1
-
-            except SQLAlchemyError as e:
-                logger.error(f"Error loading outbreak data: {e}")
-                continue
+            await self.db.commit()
+        except Exception as e:
+            logger.error(f"Error loading {model.__tablename__}: {e}")
+            await self.db.rollback()
+            raise
 
-        await self.db.commit()
-        return inserted, updated
+        if mirror is not None:
+            mirror(loaded)
+        return result
 
-    async def load_environmental_data(
-        self, records: List[Dict[str, Any]]
-    ) -> tuple[int, int]:
+    async def _load_savepoint(
+        self,
+        model: Type[Base],
+        key: Sequence[str],
+        rows: List[Dict[str, Any]],
+        result: LoadResult,
+    ) -> List[Dict[str, Any]]:
         """
-        Load environmental data with upsert logic.
-        Returns (inserted_count, updated_count)
+        Upsert rows in a savepoint, bisecting on constraint or data errors
+
+        Returns:
+            The rows that were written
         """
-        inserted = 0
-        updated = 0
+        try:
+            async with self.db.begin_nested():
+                inserted, updated, unchanged = await self._upsert(model, key, rows)
+        except (IntegrityError, DataError) as e:
+            if len(rows) > 1:
+                middle = len(rows) // 2
+                return await self._load_savepoint(
+                    model, key, rows[:middle], result
+                ) + await self._load_savepoint(model, key, rows[middle:], result)
 
-        for record in records:
-            try:
-                existing = await self.db.execute(
-                    select(EnvironmentalData).where(
-                        EnvironmentalData.region_id == record["region_id"],
-                        EnvironmentalData.date == record["date"],
-                    )
-                )
-                existing_record = existing.scalars().first()
-
-                if existing_record:
-                    for key, value in record.items():
-                        if key not in ["region_id", "date"]:
-                            setattr(existing_record, key, value)
-                    existing_record.updated_at = datetime.now()
-                    updated += 1
-                else:
-                    new_record = EnvironmentalData(**record)
-                    self.db.add(new_record)
-                    inserted += 1
-
-            except SQLAlchemyError as e:
-                logger.error(f"Error loading environmental data: {e}")
-                continue
+            values = ", ".join(f"{column}={rows[0].get(column)}" for column in key)
+            error = f"Load error ({values}): {e.orig}"
+            logger.warning(f"{model.__tablename__}: {error}")
+            result.failed += 1
+            result.errors.append(error)
+            return []
 
-        await self.db.commit()
-        return inserted, updated
+        result.inserted += inserted
+        result.updated += updated
+        result.unchanged += unchanged
+        return rows
 
-    async def load_digital_signals(
-        self, records: List[Dict[str, Any]]
-    ) -> tuple[int, int]:
+    async def _upsert(
+        self, model: Type[Base], key: Sequence[str], records: List[Dict[str, Any]]
+    ) -> tuple[int, int, int]:
         """
-        Load digital signals with upsert logic.
-        Returns (inserted_count, updated_count)
+        Upsert records with multi-row statements of ``batch_rows`` rows
+
+        Records are grouped by their set of columns (normally one group), and
+        each group is sent as one executemany that SQLAlchemy splits into
+        multi-row ``INSERT ... VALUES`` pages, so a batch costs a handful of
+        round trips instead of one SELECT and one write per record.
+
+        Returns:
+            ``(inserted, updated, unchanged)`` row counts
         """
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for record in records:
+            groups.setdefault(tuple(record), []).append(record)
+
         inserted = 0
         updated = 0
-
-        for record in records:
-            try:
-                existing = await self.db.execute(
-                    select(DigitalSignal).where(
-                        DigitalSignal.region_id == record["region_id"],
-                        DigitalSignal.date == record["date"],
-                        DigitalSignal.signal_type == record["signal_type"],
-                        DigitalSignal.signal_source == record["signal_source"],
-                    )
+        unchanged = 0
+        for columns, rows in groups.items():
+            if self.copy_min_rows and len(rows) >= self.copy_min_rows:
+                group_inserted, group_total = await self._copy_merge(
+                    model, key, columns, rows
                 )
-                existing_record = existing.scalars().first()
-
-                if existing_record:
-                    for key, value in record.items():
-                        if key not in [
-                            "region_id",
-                            "date",
-                            "signal_type",
-                            "signal_source",
-                        ]:
-                            setattr(existing_record, key, value)
-                    existing_record.updated_at = datetime.now()
-                    updated += 1
-                else:
-                    new_record = DigitalSignal(**record)
-                    self.db.add(new_record)
-                    inserted += 1
-
-            except SQLAlchemyError as e:
-                logger.error(f"Error loading digital signal: {e}")
+                inserted += group_inserted
+                updated += group_total - group_inserted
+                unchanged += len(rows) - group_total
                 continue
 
-        await self.db.commit()
-        return inserted, updated
+            # Stay under the 32767 bind parameters allowed per statement
+            page_size = max(1, min(self.batch_rows, 32767 // len(columns)))
+            stmt = upsert_statement(model, key, columns).execution_options(
+                insertmanyvalues_page_size=page_size
+            )
+            result = await self.db.execute(stmt, rows)
+            flags = result.scalars().all()
+            inserted += sum(flags)
+            updated += len(flags) - sum(flags)
+            unchanged += len(rows) - len(flags)
+
+        return inserted, updated, unchanged
+
+    async def _copy_merge(
+        self,
+        model: Type[Base],
+        key: Sequence[str],
+        columns: Sequence[str],
+        rows: List[Dict[str, Any]],
+    ) -> tuple[int, int]:
+        """
+        Bulk load rows through a staging table
+
+        Rows are streamed into a temporary table with the binary COPY
+        protocol, then merged into the target with one set-based upsert.
+        Temporary tables skip the WAL like unlogged ones and are private to
+        the connection, so concurrent loads do not share a staging table.
+
+        Returns:
+            ``(inserted, total)`` rows merged; unchanged rows are not counted
+        """
+        target = model.__tablename__
+        stage = f"etl_stage_{target}"
+        names = ", ".join(columns)
+        # Created through the session so it joins the session transaction
+        await self.db.execute(
+            text(
+                f"CREATE TEMPORARY TABLE {stage} ON COMMIT DROP AS "
+                f"SELECT {names} FROM {target} WITH NO DATA"
+            )
+        )
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        try:
+            await raw.driver_connection.copy_records_to_table(
+                stage, records=map(itemgetter(*columns), rows), columns=list(columns)
+            )
+        except Exception as e:
+            # COPY bypasses SQLAlchemy, so wrap driver errors (bad values
+            # rejected by the staging table) for the savepoint to isolate
+            raise DataError(f"COPY {stage}", None, e) from e
+        result = await self.db.execute(merge_statement(model, key, columns, stage))
+        inserted, total = result.one()
+        await self.db.execute(text(f"DROP TABLE {stage}"))
+
+        logger.info(
+            f"Bulk loaded {len(rows)} rows into {target} "
+            f"({inserted} new, {total - inserted} changed)"
+        )
+        return inserted, total
@@ -5,14 +5,45 @@ Core ETL pipeline for data validation, cleaning, and loading.
 """
 
 from datetime import datetime
-from typing import List, Dict, Any, TypeVar, Generic
+from itertools import islice
+from typing import (
+    List,
+    Dict,
+    Any,
+    TypeVar,
+    Generic,
+    Callable,
+    Optional,
+    Sequence,
+    Iterable,
+    AsyncIterable,
+    AsyncIterator,
+    Union,
+)
 from pydantic import BaseModel
 import logging
 
+from ...core.config import get_settings
+from .columnar import (
+    DIGITAL_SIGNAL_RULES,
+    ENVIRONMENTAL_RULES,
+    OUTBREAK_RULES,
+    IrregularBatch,
+    Rule,
+    clean_digital_signal_columns,
+    clean_environmental_columns,
+    clean_outbreak_columns,
+    process_columns,
+)
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
 
+# Raw records from a list, a generator or an async source (e.g. a paginated
+# API client or a database cursor)
+RawRecords = Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+
 
 class ETLResult(BaseModel):
     """Result of ETL operation"""
@@ -21,9 +52,42 @@ class ETLResult(BaseModel):
     records_processed: int
     records_inserted: int = 0
     records_updated: int = 0
+    # Records matching the stored row, which the loader leaves untouched
+    records_unchanged: int = 0
+    # Records replaced by a later record with the same key in their chunk
+    records_superseded: int = 0
+    # Records rejected by validation, cleaning or the database; errors may
+    # list fewer when a streamed ingestion caps how many messages it keeps
+    records_failed: int = 0
     errors: List[str] = []
 
 
+async def iter_chunks(
+    records: RawRecords, chunk_size: int, skip: int = 0
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Lists of up to ``chunk_size`` records from a sync or async iterable,
+    after dropping the first ``skip`` records
+    """
+    if isinstance(records, AsyncIterable):
+        chunk = []
+        async for record in records:
+            if skip:
+                skip -= 1
+                continue
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        return
+
+    iterator = islice(records, skip, None)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
 class DataValidator:
     """Validates incoming data against schemas"""
 
@@ -175,83 +239,170 @@ class DataCleaner:
 class ETLPipeline(Generic[T]):
     """Main ETL pipeline orchestrator"""
 
-    def __init__(self, validator: DataValidator, cleaner: DataCleaner):
+    def __init__(
+        self,
+        validator: DataValidator,
+        cleaner: DataCleaner,
+        columnar_min_records: Optional[int] = None,
+        chunk_size: int = 5000,
+    ):
+        """
+        Args:
+            columnar_min_records: Batches of at least this many records are
+                validated and cleaned column-wise (None keeps every batch on
+                the record-by-record path)
+            chunk_size: Records per chunk yielded by the ``stream_*`` methods
+        """
         self.validator = validator
         self.cleaner = cleaner
+        self.columnar_min_records = columnar_min_records
+        self.chunk_size = chunk_size
 
     def process_outbreak_data(
-        self, raw_data: List[Dict[str, Any]]
+        self,
+        raw_data: List[Dict[str, Any]],
+        columnar: Optional[bool] = None,
+        offset: int = 0,
     ) -> tuple[List[Dict[str, Any]], ETLResult]:
-        errors = []
-        cleaned_records = []
-
-        for i, record in enumerate(raw_data):
-            is_valid, error_msg = self.validator.validate_outbreak_data(record)
-            if not is_valid:
-                errors.append(f"Record {i}: {error_msg}")
-                continue
-
-            try:
-                cleaned = self.cleaner.clean_outbreak_data(record)
-                cleaned_records.append(cleaned)
-            except Exception as e:
-                errors.append(f"Record {i}: Cleaning error - {str(e)}")
-
-        result = ETLResult(
-            success=len(errors) == 0,
-            records_processed=len(raw_data),
-            errors=errors,
+        return self._process(
+            raw_data,
+            self.validator.validate_outbreak_data,
+            self.cleaner.clean_outbreak_data,
+            OUTBREAK_RULES,
+            clean_outbreak_columns,
+            columnar,
+            offset,
         )
 
-        return cleaned_records, result
-
     def process_environmental_data(
-        self, raw_data: List[Dict[str, Any]]
+        self,
+        raw_data: List[Dict[str, Any]],
+        columnar: Optional[bool] = None,
+        offset: int = 0,
     ) -> tuple[List[Dict[str, Any]], ETLResult]:
-        errors = []
-        cleaned_records = []
-
-        for i, record in enumerate(raw_data):
-            is_valid, error_msg = self.validator.validate_environmental_data(record)
-            if not is_valid:
-                errors.append(f"Record {i}: {error_msg}")
-                continue
-
-            try:
-                cleaned = self.cleaner.clean_environmental_data(record)
-                cleaned_records.append(cleaned)
-            except Exception as e:
-                errors.append(f"Record {i}: Cleaning error - {str(e)}")
-
-        result = ETLResult(
-            success=len(errors) == 0,
-            records_processed=len(raw_data),
-            errors=errors,
+        return self._process(
+            raw_data,
+            self.validator.validate_environmental_data,
+            self.cleaner.clean_environmental_data,
+            ENVIRONMENTAL_RULES,
+            clean_environmental_columns,
+            columnar,
+            offset,
         )
 
-        return cleaned_records, result
-
     def process_digital_signals(
-        self, raw_data: List[Dict[str, Any]]
+        self,
+        raw_data: List[Dict[str, Any]],
+        columnar: Optional[bool] = None,
+        offset: int = 0,
     ) -> tuple[List[Dict[str, Any]], ETLResult]:
-        errors = []
-        cleaned_records = []
+        return self._process(
+            raw_data,
+            self.validator.validate_digital_signal,
+            self.cleaner.clean_digital_signal,
+            DIGITAL_SIGNAL_RULES,
+            clean_digital_signal_columns,
+            columnar,
+            offset,
+        )
 
-        for i, record in enumerate(raw_data):
-            is_valid, error_msg = self.validator.validate_digital_signal(record)
-            if not is_valid:
-                errors.append(f"Record {i}: {error_msg}")
-                continue
+    def stream_outbreak_data(
+        self, raw_data: RawRecords, chunk_size: Optional[int] = None, skip: int = 0
+    ) -> AsyncIterator[tuple[List[Dict[str, Any]], ETLResult]]:
+        return self._stream(raw_data, self.process_outbreak_data, chunk_size, skip)
+
+    def stream_environmental_data(
+        self, raw_data: RawRecords, chunk_size: Optional[int] = None, skip: int = 0
+    ) -> AsyncIterator[tuple[List[Dict[str, Any]], ETLResult]]:
+        return self._stream(raw_data, self.process_environmental_data, chunk_size, skip)
+
+    def stream_digital_signals(
+        self, raw_data: RawRecords, chunk_size: Optional[int] = None, skip: int = 0
+    ) -> AsyncIterator[tuple[List[Dict[str, Any]], ETLResult]]:
+        return self._stream(raw_data, self.process_digital_signals, chunk_size, skip)
+
+    async def _stream(
+        self,
+        raw_data: RawRecords,
+        process: Callable[..., tuple[List[Dict[str, Any]], ETLResult]],
+        chunk_size: Optional[int],
+        skip: int = 0,
+    ) -> AsyncIterator[tuple[List[Dict[str, Any]], ETLResult]]:
+        """
+        Validate and clean records one chunk at a time
+
+        Only the current chunk is held, so memory does not grow with the
+        input. Error messages number records from the start of the stream,
+        including the ``skip`` records dropped when resuming a load.
+
+        Yields:
+            ``(cleaned_records, result)`` for each chunk of raw records
+        """
+        offset = skip
+        async for chunk in iter_chunks(raw_data, chunk_size or self.chunk_size, skip):
+            yield process(chunk, offset=offset)
+            offset += len(chunk)
+
+    def _use_columnar(self, raw_data: List[Dict[str, Any]], columnar: Optional[bool]):
+        # The column rules mirror the built-in validator and cleaner, so
+        # subclasses with their own rules always run record by record
+        if (
+            type(self.validator) is not DataValidator
+            or type(self.cleaner) is not DataCleaner
+        ):
+            return False
+        if columnar is not None:
+            return columnar
+        return (
+            self.columnar_min_records is not None
+            and len(raw_data) >= self.columnar_min_records
+        )
 
+    def _process(
+        self,
+        raw_data: List[Dict[str, Any]],
+        validate: Callable[[Dict[str, Any]], tuple[bool, str]],
+        clean: Callable[[Dict[str, Any]], Dict[str, Any]],
+        rules: Sequence[Rule],
+        clean_columns: Callable,
+        columnar: Optional[bool],
+        offset: int,
+    ) -> tuple[List[Dict[str, Any]], ETLResult]:
+        """
+        Validate and clean a batch, column-wise when ``columnar`` (default:
+        batches of ``columnar_min_records`` or more), record by record
+        otherwise. Both paths return the same records and errors, numbering
+        records from ``offset``.
+        """
+        cleaned_records = None
+        if self._use_columnar(raw_data, columnar):
             try:
-                cleaned = self.cleaner.clean_digital_signal(record)
-                cleaned_records.append(cleaned)
-            except Exception as e:
-                errors.append(f"Record {i}: Cleaning error - {str(e)}")
+                cleaned_records, errors = process_columns(
+                    raw_data, rules, clean_columns, clean, offset
+                )
+            except IrregularBatch as e:
+                logger.debug(f"Columnar ETL skipped for {len(raw_data)} records: {e}")
+
+        if cleaned_records is None:
+            errors = []
+            cleaned_records = []
+
+            for i, record in enumerate(raw_data, offset):
+                is_valid, error_msg = validate(record)
+                if not is_valid:
+                    errors.append(f"Record {i}: {error_msg}")
+                    continue
+
+                try:
+                    cleaned = clean(record)
+                    cleaned_records.append(cleaned)
+                except Exception as e:
+                    errors.append(f"Record {i}: Cleaning error - {str(e)}")
 
         result = ETLResult(
             success=len(errors) == 0,
             records_processed=len(raw_data),
+            records_failed=len(errors),
             errors=errors,
         )
 
@@ -261,4 +412,9 @@ class ETLPipeline(Generic[T]):
 # Global pipeline instance
 _validator = DataValidator()
 _cleaner = DataCleaner()
-etl_pipeline = ETLPipeline(_validator, _cleaner)
+etl_pipeline = ETLPipeline(
+    _validator,
+    _cleaner,
+    columnar_min_records=get_settings().ETL_COLUMNAR_MIN_RECORDS,
+    chunk_size=get_settings().ETL_CHUNK_SIZE,
+)
@@ -4,12 +4,15 @@ ETL Service
 Orchestrates ETL operations for all data types.
 """
 
-from typing import List, Dict, Any
+from collections.abc import Sized
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from .pipeline import etl_pipeline, ETLResult
-from .loader import DataLoader
+from ...core.config import get_settings
+from .pipeline import etl_pipeline, ETLResult, RawRecords
+from .loader import DataLoader, LoadResult
+from .checkpoint import LoadCheckpoint
 
 logger = logging.getLogger(__name__)
 
@@ -17,73 +20,129 @@ logger = logging.getLogger(__name__)
 class ETLService:
     """Main ETL service orchestrating validation, cleaning, and loading"""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        chunk_size: Optional[int] = None,
+        max_errors: Optional[int] = None,
+    ):
+        """
+        Args:
+            chunk_size: Records validated, cleaned and loaded at a time
+                (default: ``ETL_CHUNK_SIZE``)
+            max_errors: Error messages kept in the result; later failures are
+                only counted (default: ``ETL_MAX_ERRORS``)
+        """
+        settings = get_settings()
         self.db = db
         self.loader = DataLoader(db)
+        self.chunk_size = chunk_size or settings.ETL_CHUNK_SIZE
+        self.max_errors = settings.ETL_MAX_ERRORS if max_errors is None else max_errors
 
-    async def ingest_outbreak_data(self, raw_data: List[Dict[str, Any]]) -> ETLResult:
+    async def ingest_outbreak_data(
+        self, raw_data: RawRecords, job_id: Optional[str] = None
+    ) -> ETLResult:
         """Ingest outbreak data through full ETL pipeline"""
-        logger.info(f"Starting outbreak data ingestion: {len(raw_data)} records")
-
-        cleaned_data, validation_result = etl_pipeline.process_outbreak_data(raw_data)
-
-        if not validation_result.success:
-            logger.warning(
-                f"Outbreak data validation had {len(validation_result.errors)} errors"
-            )
-
-        inserted, updated = await self.loader.load_outbreak_data(cleaned_data)
-
-        return ETLResult(
-            success=validation_result.success,
-            records_processed=validation_result.records_processed,
-            records_inserted=inserted,
-            records_updated=updated,
-            errors=validation_result.errors,
+        return await self._ingest(
+            "Outbreak data",
+            etl_pipeline.stream_outbreak_data,
+            self.loader.load_outbreak_data,
+            raw_data,
+            job_id,
         )
 
     async def ingest_environmental_data(
-        self, raw_data: List[Dict[str, Any]]
+        self, raw_data: RawRecords, job_id: Optional[str] = None
     ) -> ETLResult:
         """Ingest environmental data through full ETL pipeline"""
-        logger.info(f"Starting environmental data ingestion: {len(raw_data)} records")
-
-        cleaned_data, validation_result = etl_pipeline.process_environmental_data(
-            raw_data
-        )
-
-        if not validation_result.success:
-            logger.warning(
-                f"Environmental data validation had {len(validation_result.errors)} errors"
-            )
-
-        inserted, updated = await self.loader.load_environmental_data(cleaned_data)
-
-        return ETLResult(
-            success=validation_result.success,
-            records_processed=validation_result.records_processed,
-            records_inserted=inserted,
-            records_updated=updated,
-            errors=validation_result.errors,
+        return await self._ingest(
+            "Environmental data",
+            etl_pipeline.stream_environmental_data,
+            self.loader.load_environmental_data,
+            raw_data,
+            job_id,
         )
 
-    async def ingest_digital_signals(self, raw_data: List[Dict[str, Any]]) -> ETLResult:
+    async def ingest_digital_signals(
+        self, raw_data: RawRecords, job_id: Optional[str] = None
+    ) -> ETLResult:
         """Ingest digital signals through full ETL pipeline"""
-        logger.info(f"Starting digital signals ingestion: {len(raw_data)} records")
-
-        cleaned_data, validation_result = etl_pipeline.process_digital_signals(raw_data)
-
-        if not validation_result.success:
-            logger.warning(
-                f"Digital signals validation had {len(validation_result.errors)} errors"
-            )
+        return await self._ingest(
+            "Digital signals",
+            etl_pipeline.stream_digital_signals,
+            self.loader.load_digital_signals,
+            raw_data,
+            job_id,
+        )
 
-        inserted, updated = await self.loader.load_digital_signals(cleaned_data)
+    async def _ingest(
+        self,
+        label: str,
+        stream: Callable[..., AsyncIterator[tuple[List[Dict[str, Any]], ETLResult]]],
+        load: Callable[..., Awaitable[LoadResult]],
+        raw_data: RawRecords,
+        job_id: Optional[str],
+    ) -> ETLResult:
+        """
+        Stream raw records through the pipeline and loader chunk by chunk
+
+        Each cleaned chunk is loaded as soon as it is produced, so only one
+        chunk of raw and cleaned records is held at a time whatever the size
+        of the input. Each chunk is committed in its own transaction; with a
+        ``job_id`` the position after the last committed chunk is saved with
+        it, and a rerun of the same job skips the records already loaded.
+        Counts in the result cover this run only.
+        """
+        size = f"{len(raw_data)} records" if isinstance(raw_data, Sized) else "stream"
+        logger.info(f"Starting {label.lower()} ingestion: {size}")
+
+        checkpoint = None
+        if job_id is not None:
+            data_type = label.lower().replace(" ", "_")
+            checkpoint = await LoadCheckpoint.resume(self.db, job_id, data_type)
+            if checkpoint.completed:
+                logger.info(f"{label} load {job_id!r} already completed")
+                return ETLResult(success=True, records_processed=0)
+
+        position = checkpoint.records_done if checkpoint else 0
+        processed = inserted = updated = unchanged = superseded = failed = 0
+        errors: List[str] = []
+        chunks = stream(raw_data, self.chunk_size, skip=position)
+        async for cleaned_data, validation_result in chunks:
+            processed += validation_result.records_processed
+            failed += validation_result.records_failed
+            errors.extend(validation_result.errors[: self.max_errors - len(errors)])
+
+            position += validation_result.records_processed
+            if checkpoint is not None:
+                checkpoint.records_done = position
+            if cleaned_data or checkpoint is not None:
+                result = await load(cleaned_data, checkpoint)
+                inserted += result.inserted
+                updated += result.updated
+                unchanged += result.unchanged
+                superseded += result.superseded
+                failed += result.failed
+                errors.extend(result.errors[: self.max_errors - len(errors)])
+
+        if checkpoint is not None:
+            await checkpoint.save(self.db, completed=True)
+            await self.db.commit()
+        if failed:
+            logger.warning(f"{label} ingestion had {failed} errors")
+        logger.info(
+            f"{label} ingestion complete: {processed} processed, "
+            f"{inserted} inserted, {updated} updated, {unchanged} unchanged, "
+            f"{superseded} superseded"
+        )
 
         return ETLResult(
-            success=validation_result.success,
-            records_processed=validation_result.records_processed,
+            success=failed == 0,
+            records_processed=processed,
             records_inserted=inserted,
             records_updated=updated,
-            errors=validation_result.errors,
+            records_unchanged=unchanged,
+            records_superseded=superseded,
+            records_failed=failed,
+            errors=errors,
         )
@@ -0,0 +1,357 @@
+"""
+Forecast Service
+
+Loads the latest weekly history for every disease / region series, runs the
+recursive forecaster per model and bulk-inserts the results as predictions.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from pydantic import BaseModel
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.models import EnvironmentalData, ModelVersion, OutbreakData, Prediction
+from ..models.features import HISTORY_WEEKS
+from ..models.forecasting import Forecast, ForecastSeries
+from ..models.registry import (
+    ModelRegistry,
+    ModelUnavailableError,
+    select_model_version,
+)
+from ..models.service import ModelService
+
+logger = logging.getLogger(__name__)
+
+# Weeks of case history the model's lag features use
+CASE_WEEKS = 4
+
+WeeklyCases = Dict[Tuple[int, int], List[Tuple[datetime, int]]]
+WeeklyWeather = Dict[int, List[Tuple[datetime, Dict[str, float]]]]
+
+
+def build_series(
+    cases: WeeklyCases, weather: WeeklyWeather, min_weeks: int = CASE_WEEKS
+) -> Tuple[List[ForecastSeries], int]:
+    """
+    Align each series' case and weather weeks at its latest case week
+
+    Weeks are placed by their distance from that week, so gaps never shift
+    the lags: a week without case rows counts 0 cases, and a week without
+    weather is missing from the rolling history. The latest weather at or
+    before the anchor stands in for the anchor week's own, as the forecast
+    does for future weeks.
+
+    Returns:
+        Series ready to forecast, and the number of series skipped
+    """
+    series: List[ForecastSeries] = []
+    skipped = 0
+    for (series_disease, series_region), weeks in cases.items():
+        anchor = weeks[-1][0]
+        region_weather = [
+            (week, values)
+            for week, values in weather.get(series_region, [])
+            if week <= anchor
+        ]
+        if len(weeks) < min_weeks or not region_weather:
+            skipped += 1
+            continue
+
+        previous_cases = [0] * CASE_WEEKS
+        for week, count in weeks:
+            offset = (anchor - week).days // 7
+            if offset < CASE_WEEKS:
+                previous_cases[CASE_WEEKS - 1 - offset] = count
+        history: List[Any] = [None] * HISTORY_WEEKS
+        for week, values in region_weather:
+            offset = (anchor - week).days // 7
+            if 1 <= offset <= HISTORY_WEEKS:
+                history[HISTORY_WEEKS - offset] = (
+                    values["temp_avg"],
+                    values["precipitation_mm"],
+                    values["humidity_percent"],
+                )
+        series.append(
+            ForecastSeries(
+                disease_id=series_disease,
+                region_id=series_region,
+                week_start=anchor.date(),
+                weather=region_weather[-1][1],
+                previous_cases=previous_cases,
+                history=tuple(history),
+            )
+        )
+    return series, skipped
+
+
+class ForecastRunResult(BaseModel):
+    """Result of a forecast run"""
+
+    series_forecast: int
+    series_skipped: int
+    horizon_weeks: int
+    predictions_saved: int = 0
+    predictions: List[Dict[str, Any]] = []
+
+
+class ForecastService:
+    """Multi-week forecasts for many disease / region pairs"""
+
+    def __init__(self, db: AsyncSession, registry: ModelRegistry):
+        self.db = db
+        self.registry = registry
+
+    async def _weekly_cases(
+        self, disease_id: Optional[int], region_id: Optional[int]
+    ) -> WeeklyCases:
+        """Latest weekly case totals per series, oldest first"""
+        week = func.date_trunc("week", OutbreakData.date).label("week")
+        weekly = select(
+            OutbreakData.disease_id,
+            OutbreakData.region_id,
+            week,
+            func.sum(OutbreakData.case_count).label("cases"),
+        ).group_by(OutbreakData.disease_id, OutbreakData.region_id, week)
+        if disease_id:
+            weekly = weekly.where(OutbreakData.disease_id == disease_id)
+        if region_id:
+            weekly = weekly.where(OutbreakData.region_id == region_id)
+        weekly = weekly.subquery()
+
+        ranked = select(
+            weekly,
+            func.row_number()
+            .over(
+                partition_by=(weekly.c.disease_id, weekly.c.region_id),
+                order_by=weekly.c.week.desc(),
+            )
+            .label("rank"),
+        ).subquery()
+        result = await self.db.execute(
+            select(ranked)
+            .where(ranked.c.rank <= CASE_WEEKS)
+            .order_by(ranked.c.disease_id, ranked.c.region_id, ranked.c.week)
+        )
+
+        cases = defaultdict(list)
+        for row in result.all():
+            cases[(row.disease_id, row.region_id)].append((row.week, int(row.cases)))
+        return cases
+
+    async def _weekly_weather(self, latest_weeks: Dict[int, datetime]) -> WeeklyWeather:
+        """
+        Latest weekly weather per region, oldest first
+
+        Args:
+            latest_weeks: Last week to read for each region
+        """
+        if not latest_weeks:
+            return {}
+        week = func.date_trunc("week", EnvironmentalData.date).label("week")
+        weekly = (
+            select(
+                EnvironmentalData.region_id,
+                week,
+                func.avg(EnvironmentalData.temperature_avg).label("temp_avg"),
+                func.avg(EnvironmentalData.temperature_min).label("temp_min"),
+                func.avg(EnvironmentalData.temperature_max).label("temp_max"),
+                func.sum(EnvironmentalData.rainfall_mm).label("precipitation_mm"),
+                func.avg(EnvironmentalData.humidity_avg).label("humidity_percent"),
+            )
+            .where(EnvironmentalData.region_id.in_(latest_weeks))
+            .where(
+                EnvironmentalData.date
+                < case(
+                    {
+                        region: week + timedelta(weeks=1)
+                        for region, week in latest_weeks.items()
+                    },
+                    value=EnvironmentalData.region_id,
+                )
+            )
+            .group_by(EnvironmentalData.region_id, week)
+            .subquery()
+        )
+        ranked = select(
+            weekly,
+            func.row_number()
+            .over(partition_by=weekly.c.region_id, order_by=weekly.c.week.desc())
+            .label("rank"),
+        ).subquery()
+        result = await self.db.execute(
+            select(ranked)
+            .where(ranked.c.rank <= HISTORY_WEEKS + 1)
+            .order_by(ranked.c.region_id, ranked.c.week)
+        )
+
+        weather = defaultdict(list)
+        for row in result.all():
+            values = {
+                field: float(getattr(row, field) or 0.0)
+                for field in (
+                    "temp_avg",
+                    "temp_min",
+                    "temp_max",
+                    "precipitation_mm",
+                    "humidity_percent",
+                )
+            }
+            weather[row.region_id].append((row.week, values))
+        return weather
+
+    async def load_series(
+        self,
+        disease_id: Optional[int] = None,
+        region_id: Optional[int] = None,
+        min_weeks: int = CASE_WEEKS,
+    ) -> Tuple[List[ForecastSeries], int]:
+        """
+        Latest observations for every series with enough history
+
+        Two windowed queries fetch the data for all series at once.
+
+        Returns:
+            Series ready to forecast, and the number of series skipped
+        """
+        cases = await self._weekly_cases(disease_id, region_id)
+        # Weather later than a region's latest case week is never used
+        latest_weeks: Dict[int, datetime] = {}
+        for (_, series_region), weeks in cases.items():
+            latest = latest_weeks.get(series_region)
+            if latest is None or weeks[-1][0] > latest:
+                latest_weeks[series_region] = weeks[-1][0]
+        weather = await self._weekly_weather(latest_weeks)
+
+        series, skipped = build_series(cases, weather, min_weeks)
+        if skipped:
+            logger.warning(
+                f"Skipped {skipped} series without {min_weeks} weeks of cases "
+                f"or any weather data"
+            )
+        return series, skipped
+
+    async def _group_by_model(
+        self, series: List[ForecastSeries]
+    ) -> List[Tuple[Optional[ModelService], Optional[str], List[ForecastSeries]]]:
+        """
+        Split series by the model version that serves them
+
+        A group whose model version cannot be loaded gets no service, so its
+        series are skipped instead of forecast with the default model.
+        """
+        result = await self.db.execute(
+            select(ModelVersion).where(ModelVersion.is_active.is_(True))
+        )
+        versions = result.scalars().all()
+
+        groups: Dict[Optional[int], List[ForecastSeries]] = defaultdict(list)
+        selected: Dict[Optional[int], Any] = {}
+        for item in series:
+            version = select_model_version(versions, item.disease_id, item.region_id)
+            key = version.id if version is not None else None
+            selected[key] = version
+            groups[key].append(item)
+
+        grouped = []
+        for key, members in groups.items():
+            version = selected[key]
+            if version is None:
+                grouped.append((self.registry.default_service, None, members))
+            else:
+                try:
+                    service = await self.registry.get_service(
+                        self.db, members[0].disease_id, members[0].region_id
+                    )
+                except ModelUnavailableError as e:
+                    logger.error(str(e))
+                    service = None
+                grouped.append((service, version.model_version, members))
+        return grouped
+
+    async def save(self, forecast: Forecast, model_version: Optional[str]) -> int:
+        """Bulk insert a forecast as prediction rows"""
+        records = [
+            {
+                "disease_id": item.disease_id,
+                "region_id": item.region_id,
+                "prediction_date": datetime.combine(
+                    forecast.target_date(i, horizon), datetime.min.time()
+                ),
+                "prediction_type": "case_count",
+                "predicted_value": float(forecast.predicted_cases[i, horizon - 1]),
+                "risk_level": forecast.risk_levels[i, horizon - 1].lower(),
+                "model_version": model_version or forecast.model_version or "v1.0",
+                "features_used": {"horizon_weeks": horizon},
+                "is_alert_triggered": forecast.risk_levels[i, horizon - 1]
+                in ("High", "Critical"),
+            }
+            for i, item in enumerate(forecast.series)
+            for horizon in range(1, forecast.horizon_weeks + 1)
+        ]
+        if records:
+            await self.db.execute(insert(Prediction), records)
+        return len(records)
+
+    async def run(
+        self,
+        horizon_weeks: int,
+        disease_id: Optional[int] = None,
+        region_id: Optional[int] = None,
+        persist: bool = True,
+    ) -> ForecastRunResult:
+        """
+        Forecast every matching series and optionally persist the results
+
+        Args:
+            horizon_weeks: Weeks ahead to forecast
+            disease_id: Limit to one disease
+            region_id: Limit to one region
+            persist: Insert the forecasts into ``predictions``
+        """
+        series, skipped = await self.load_series(disease_id, region_id)
+
+        saved = 0
+        forecast_count = 0
+        predictions: List[Dict[str, Any]] = []
+        for service, model_version, members in await self._group_by_model(series):
+            if service is None or not service.is_model_loaded():
+                logger.warning("Model not loaded, skipping forecast group")
+                skipped += len(members)
+                continue
+
+            forecast = await service.forecast_async(members, horizon_weeks)
+            forecast_count += len(members)
+            if persist:
+                saved += await self.save(forecast, model_version)
+            predictions.extend(
+                {
+                    "disease_id": item.disease_id,
+                    "region_id": item.region_id,
+                    "horizon_weeks": horizon,
+                    "prediction_date": forecast.target_date(i, horizon),
+                    "predicted_cases": float(forecast.predicted_cases[i, horizon - 1]),
+                    "risk_level": forecast.risk_levels[i, horizon - 1],
+                    "confidence": float(forecast.confidences[i, horizon - 1]),
+                }
+                for i, item in enumerate(forecast.series)
+                for horizon in range(1, forecast.horizon_weeks + 1)
+            )
+
+        if persist:
+            await self.db.commit()
+
+        logger.info(
+            f"Forecast {forecast_count} series {horizon_weeks} weeks ahead, "
+            f"saved {saved} predictions"
+        )
+        return ForecastRunResult(
+            series_forecast=forecast_count,
+            series_skipped=skipped,
+            horizon_weeks=horizon_weeks,
+            predictions_saved=saved,
+            predictions=predictions,
+        )
@@ -6,12 +6,13 @@ Background tasks for ETL, predictions, and alerts.
 
 from celery import Task
 from datetime import datetime, timedelta
+import asyncio
 import logging
 from typing import List
 
 from src.core.celery_app import celery_app
-from src.database.core import AsyncSessionLocal
-from src.database.models import Disease, GeographicRegion, OutbreakData, Prediction
+from src.database.core import AsyncSessionLocal, isolated_session
+from src.database.models import GeographicRegion, Prediction
 from src.services.etl import ETLService
 from src.services.ingestion.weather import WeatherDataClient
 from src.services.ingestion.digital_signals import DigitalSignalsClient
@@ -144,88 +145,107 @@ def ingest_digital_signals(self, region_ids: List[int] = None):
         raise
 
 
-@celery_app.task(base=DBTask, bind=True)
-def generate_predictions(self, disease_id: int = None, region_id: int = None):
-    """Generate predictions for all disease-region pairs"""
+@celery_app.task
+def generate_predictions(
+    disease_id: int = None, region_id: int = None, horizon_weeks: int = None
+):
+    """Forecast all disease-region pairs 1..N weeks ahead"""
     logger.info("Starting prediction generation task")
 
     try:
-        db = self.db
-
-        query = select(Disease, GeographicRegion)
-        if disease_id:
-            query = query.where(Disease.id == disease_id)
-        if region_id:
-            query = query.where(GeographicRegion.id == region_id)
+        from src.api.dependencies import get_model_registry
+        from src.core.config import get_settings
+        from src.services.forecasting import ForecastService
+
+        horizon_weeks = horizon_weeks or get_settings().FORECAST_HORIZON_WEEKS
+
+        async def forecast():
+            # The session and its connection live and die with this loop
+            async with isolated_session() as db:
+                return await ForecastService(db, get_model_registry()).run(
+                    horizon_weeks,
+                    disease_id=disease_id,
+                    region_id=region_id,
+                )
 
-        result = db.execute(query)
-        pairs = result.all()
+        result = asyncio.run(forecast())
 
-        predictions_generated = 0
+        logger.info(f"Generated {result.predictions_saved} predictions")
+        return {
+            "predictions_generated": result.predictions_saved,
+            "series_forecast": result.series_forecast,
+            "series_skipped": result.series_skipped,
+            "horizon_weeks": horizon_weeks,
+        }
 
-        for disease, region in pairs:
-            try:
-                outbreak_result = db.execute(
-                    select(OutbreakData)
-                    .where(
-                        OutbreakData.disease_id == disease.id,
-                        OutbreakData.region_id == region.id,
-                    )
-                    .order_by(OutbreakData.date.desc())
-                    .limit(4)
-                )
-                recent_outbreaks = outbreak_result.scalars().all()
+    except Exception as e:
+        logger.error(f"Prediction generation task failed: {e}")
+        raise
 
-                if len(recent_outbreaks) < 4:
-                    logger.warning(
-                        f"Insufficient data for {disease.name} in {region.name}"
-                    )
-                    continue
 
-                from src.models.service import ModelService
+@celery_app.task(name="tasks.retrain_model")
+def retrain_model(disease_id: int = None, region_id: int = None):
+    """Retrain on the full database history and register the new version"""
+    logger.info("Starting model retraining task")
 
-                model_service = ModelService()
-                if not model_service.is_model_loaded():
-                    logger.warning("Model not loaded, skipping prediction")
-                    continue
+    try:
+        import os
+
+        from src.core.config import get_settings
+        from src.models.training import (
+            build_training_set,
+            load_database_history,
+            register_model_version,
+            train_model,
+        )
 
-                latest = recent_outbreaks[0]
-                prediction = model_service.predict_outbreak(
-                    temp_avg=getattr(latest, "temperature_avg", 25.0),
-                    temp_min=getattr(latest, "temperature_min", 20.0),
-                    temp_max=getattr(latest, "temperature_max", 30.0),
-                    precipitation_mm=getattr(latest, "precipitation_mm", 10.0),
-                    humidity_percent=getattr(latest, "humidity_avg", 70.0),
-                    weekofyear=latest.date.isocalendar().week,
-                    previous_cases=[o.case_count for o in reversed(recent_outbreaks)],
-                )
+        settings = get_settings()
+        scope = "-".join(
+            f"{name}{value}"
+            for name, value in (("d", disease_id), ("r", region_id))
+            if value
+        )
+        artifact = os.path.join(
+            settings.TRAINING_ARTIFACT_DIR,
+            f"outbreak_predictor{'-' + scope if scope else ''}-"
+            f"{datetime.now():%Y%m%d%H%M%S}.ubj",
+        )
 
-                new_prediction = Prediction(
-                    disease_id=disease.id,
-                    region_id=region.id,
-                    prediction_date=datetime.now() + timedelta(days=7),
-                    predicted_value=prediction["predicted_cases"],
-                    risk_level=prediction["risk_level"].lower(),
-                    model_version="v1.0",
-                    features_used=prediction["features_used"],
-                    is_alert_triggered=prediction["risk_level"] in ["High", "Critical"],
+        async def retrain():
+            # No connection is held open while the model trains
+            async with isolated_session() as db:
+                history = await load_database_history(db, disease_id, region_id)
+            result = train_model(
+                build_training_set(history),
+                artifact,
+                folds=settings.TRAINING_CV_FOLDS,
+                processes=settings.TRAINING_PROCESSES,
+                data_source="Database",
+            )
+            async with isolated_session() as db:
+                version = await register_model_version(
+                    db,
+                    result,
+                    model_name="outbreak_predictor",
+                    disease_id=disease_id,
+                    region_id=region_id,
                 )
+            return result, version
 
-                db.add(new_prediction)
-                predictions_generated += 1
+        result, version = asyncio.run(retrain())
 
-            except Exception as e:
-                logger.error(
-                    f"Error generating prediction for {disease.name} in {region.name}: {e}"
-                )
-                continue
-
-        db.commit()
-        logger.info(f"Generated {predictions_generated} predictions")
-        return {"predictions_generated": predictions_generated}
+        logger.info(f"Registered model version {version.id} from {artifact}")
+        return {
+            "model_version_id": version.id,
+            "model_version": result.model_version,
+            "artifact_path": str(result.artifact_path),
+            "rows": result.rows,
+            "params": result.params,
+            "metrics": result.metrics,
+        }
 
     except Exception as e:
-        logger.error(f"Prediction generation task failed: {e}")
+        logger.error(f"Model retraining task failed: {e}")
         raise
 
 
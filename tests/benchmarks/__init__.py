@@ -0,0 +1,7 @@
+"""
+Benchmark Suite
+
+Timings for the inference, ETL, loader and analytics hot paths, written as
+JSON and compared against a baseline run. Not collected by pytest; run with
+``python -m tests.benchmarks``.
+"""
@@ -0,0 +1,440 @@
+"""
+Benchmark Cases
+
+Synthetic workloads for each hot path. Database groups run against the test
+Postgres (TEST_DATABASE_URL) on rows they seed themselves, and are skipped
+when it cannot be reached.
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from .harness import BenchmarkResult, measure, measure_async
+
+MODEL_PATH = (
+    Path(__file__).parent.parent.parent / "models" / "dengue_outbreak_predictor.ubj"
+)
+
+ETL_SIZES = (10_000, 100_000, 1_000_000)
+LOADER_SIZES = (1_000, 10_000)
+
+# Synthetic backtest history: series x weeks
+BACKTEST_SERIES = 300
+BACKTEST_WEEKS = 520
+
+# Seeded analytics dataset: regions x weeks of outbreaks and predictions
+ANALYTICS_REGIONS = 50
+ANALYTICS_WEEKS = 104
+
+_START = datetime(2022, 1, 3)
+
+
+def synthetic_requests(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Prediction inputs spread over realistic weather and case ranges"""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        temp = rng.uniform(20.0, 32.0)
+        rows.append(
+            {
+                "temp_avg": temp,
+                "temp_min": temp - rng.uniform(2.0, 6.0),
+                "temp_max": temp + rng.uniform(2.0, 6.0),
+                "precipitation_mm": rng.uniform(0.0, 150.0),
+                "humidity_percent": rng.uniform(50.0, 95.0),
+                "weekofyear": rng.randint(1, 52),
+                "previous_cases": [rng.randint(0, 120) for _ in range(4)],
+            }
+        )
+    return rows
+
+
+def synthetic_outbreak_records(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "disease_id": 1,
+            "region_id": 1 + i % 50,
+            "date": (_START + timedelta(days=i // 50)).isoformat(),
+            "case_count": rng.randint(0, 200),
+            "hospitalization_count": rng.randint(0, 20),
+            "death_count": rng.randint(0, 2),
+            "data_source": "benchmark",
+        }
+        for i in range(n)
+    ]
+
+
+def synthetic_environmental_records(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "region_id": 1 + i % 50,
+            "date": (_START + timedelta(days=i // 50)).isoformat(),
+            "temperature_avg": rng.uniform(20.0, 32.0),
+            "temperature_min": rng.uniform(15.0, 24.0),
+            "temperature_max": rng.uniform(28.0, 38.0),
+            "rainfall_mm": rng.uniform(0.0, 150.0),
+            "humidity_avg": rng.uniform(50.0, 95.0),
+            "wind_speed_avg": rng.uniform(0.0, 30.0),
+            "data_source": "benchmark",
+        }
+        for i in range(n)
+    ]
+
+
+def synthetic_digital_signals(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "region_id": 1 + i % 50,
+            "date": (_START + timedelta(days=i // 50)).isoformat(),
+            "signal_type": "search_trend",
+            "signal_source": "benchmark",
+            "signal_value": rng.uniform(0.0, 100.0),
+            "signal_volume": rng.randint(1, 5000),
+        }
+        for i in range(n)
+    ]
+
+
+def bench_predictor(model_path: Path = MODEL_PATH) -> List[BenchmarkResult]:
+    """Single and batch predictions on the bundled model"""
+    from src.models.predictor import OutbreakPredictor
+
+    predictor = OutbreakPredictor(str(model_path))
+    if not predictor.is_loaded():
+        raise RuntimeError(f"Could not load model from {model_path}")
+
+    single = synthetic_requests(1)[0]
+    results = [
+        measure(
+            "predictor.predict",
+            lambda: predictor.predict(**single),
+            rounds=2000,
+            warmup=50,
+        )
+    ]
+    for size in (64, 1024, 10_000):
+        rows = synthetic_requests(size)
+        results.append(
+            measure(
+                f"predictor.predict_batch[{size}]",
+                lambda rows=rows: predictor.predict_batch(rows),
+                rounds=200,
+                warmup=5,
+                items=size,
+            )
+        )
+    return results
+
+
+def bench_etl(sizes: Sequence[int] = ETL_SIZES) -> List[BenchmarkResult]:
+    """``ETLPipeline.process_*`` over synthetic raw records, per record and columnar"""
+    from src.services.etl.pipeline import etl_pipeline
+
+    cases = (
+        ("process_outbreak_data", synthetic_outbreak_records),
+        ("process_environmental_data", synthetic_environmental_records),
+        ("process_digital_signals", synthetic_digital_signals),
+    )
+    results = []
+    for method, generate in cases:
+        process = getattr(etl_pipeline, method)
+        for size in sizes:
+            records = generate(size)
+            for suffix, columnar in (("", False), (".columnar", True)):
+                results.append(
+                    measure(
+                        f"etl.{method}{suffix}[{size}]",
+                        lambda records=records, columnar=columnar: process(
+                            records, columnar=columnar
+                        ),
+                        rounds=10,
+                        warmup=1 if size <= 100_000 else 0,
+                        items=size,
+                        max_seconds=20.0,
+                    )
+                )
+            # Free each workload before building the next one
+            del records
+    return results
+
+
+def synthetic_history(series: int, weeks: int, seed: int = 0):
+    """Weekly history frame in the ``load_dengai_csv`` layout"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    n = series * weeks
+    dates = pd.date_range(_START, periods=weeks, freq="7D")
+    return pd.DataFrame(
+        {
+            "series": np.repeat([f"1:{i}" for i in range(series)], weeks),
+            "date": np.tile(dates, series),
+            "cases": rng.poisson(30, n).astype(float),
+            "weekofyear": np.tile(dates.isocalendar().week.to_numpy(float), series),
+            "temp_avg": rng.uniform(20.0, 32.0, n),
+            "temp_min": rng.uniform(15.0, 24.0, n),
+            "temp_max": rng.uniform(28.0, 38.0, n),
+            "precipitation_mm": rng.uniform(0.0, 150.0, n),
+            "humidity_percent": rng.uniform(50.0, 95.0, n),
+        }
+    )
+
+
+def bench_backtest(model_path: Path = MODEL_PATH) -> List[BenchmarkResult]:
+    """Feature building and a fixed-model backtest over years of history"""
+    from src.models.backtesting import backtest
+    from src.models.predictor import OutbreakPredictor
+    from src.models.training import build_training_set
+
+    predictor = OutbreakPredictor(str(model_path))
+    history = synthetic_history(BACKTEST_SERIES, BACKTEST_WEEKS)
+    training_set = build_training_set(history, predictor.feature_columns)
+    size = len(history)
+    return [
+        measure(
+            f"backtest.build_training_set[{size}]",
+            lambda: build_training_set(history, predictor.feature_columns),
+            rounds=5,
+            warmup=1,
+            items=size,
+        ),
+        measure(
+            f"backtest.fixed_model[{size}]",
+            lambda: backtest(training_set, predictor=predictor),
+            rounds=5,
+            warmup=1,
+            items=size,
+        ),
+    ]
+
+
+async def _engine(database_url: str):
+    """Engine on the benchmark database with the schema created"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from src.database.core import Base
+
+    engine = create_async_engine(database_url)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return engine
+
+
+async def _seed_scope(session, regions: int):
+    """A disease and regions owned by this run"""
+    from src.database.models import Disease, GeographicRegion
+
+    tag = uuid.uuid4().hex[:8]
+    disease = Disease(name=f"benchmark-{tag}")
+    members = [
+        GeographicRegion(
+            name=f"benchmark-{tag}-{i}",
+            latitude=10.0 + i * 0.01,
+            longitude=-60.0 - i * 0.01,
+        )
+        for i in range(regions)
+    ]
+    session.add(disease)
+    session.add_all(members)
+    await session.commit()
+    return disease.id, [region.id for region in members]
+
+
+async def _drop_scope(session, disease_id: int, region_ids: List[int]):
+    """Delete everything a run seeded"""
+    from sqlalchemy import delete
+
+    from src.database.models import (
+        Disease,
+        EnvironmentalData,
+        GeographicRegion,
+        OutbreakData,
+        Prediction,
+    )
+
+    for model in (OutbreakData, EnvironmentalData, Prediction):
+        await session.execute(delete(model).where(model.region_id.in_(region_ids)))
+    await session.execute(
+        delete(GeographicRegion).where(GeographicRegion.id.in_(region_ids))
+    )
+    await session.execute(delete(Disease).where(Disease.id == disease_id))
+    await session.commit()
+
+
+async def bench_loader(
+    database_url: str, sizes: Sequence[int] = LOADER_SIZES
+) -> List[BenchmarkResult]:
+    """``DataLoader`` upserts and COPY bulk loads against the test database"""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from src.models.feature_store import OnlineFeatureStore
+    from src.services.etl.loader import DataLoader
+    from src.services.etl.pipeline import etl_pipeline
+
+    engine = await _engine(database_url)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    results = []
+    try:
+        async with sessions() as session:
+            disease_id, region_ids = await _seed_scope(session, 50)
+        try:
+            for size in sizes:
+                records, _ = etl_pipeline.process_outbreak_data(
+                    synthetic_outbreak_records(size)
+                )
+                for record in records:
+                    record["disease_id"] = disease_id
+                    record["region_id"] = region_ids[record["region_id"] - 1]
+
+                async with sessions() as session:
+                    loader = DataLoader(
+                        session, feature_store=OnlineFeatureStore(), copy_min_rows=0
+                    )
+                    # The first pass inserts every row, later passes update them
+                    results.append(
+                        await measure_async(
+                            f"loader.load_outbreak_data[insert,{size}]",
+                            lambda: loader.load_outbreak_data(records),
+                            rounds=1,
+                            warmup=0,
+                            items=size,
+                        )
+                    )
+                    results.append(
+                        await measure_async(
+                            f"loader.load_outbreak_data[update,{size}]",
+                            lambda: loader.load_outbreak_data(records),
+                            rounds=3,
+                            warmup=0,
+                            items=size,
+                            max_seconds=60.0,
+                        )
+                    )
+                    # The same updates bulk loaded through COPY and a merge
+                    copy_loader = DataLoader(
+                        session, feature_store=OnlineFeatureStore(), copy_min_rows=1
+                    )
+                    results.append(
+                        await measure_async(
+                            f"loader.load_outbreak_data[copy,{size}]",
+                            lambda: copy_loader.load_outbreak_data(records),
+                            rounds=3,
+                            warmup=0,
+                            items=size,
+                            max_seconds=60.0,
+                        )
+                    )
+        finally:
+            async with sessions() as session:
+                await _drop_scope(session, disease_id, region_ids)
+    finally:
+        await engine.dispose()
+    return results
+
+
+async def _seed_analytics(session, disease_id: int, region_ids: List[int]):
+    from sqlalchemy import insert
+
+    from src.database.models import OutbreakData, Prediction
+
+    rng = random.Random(0)
+    weeks = [_START + timedelta(weeks=w) for w in range(ANALYTICS_WEEKS)]
+    await session.execute(
+        insert(OutbreakData),
+        [
+            {
+                "disease_id": disease_id,
+                "region_id": region_id,
+                "date": week,
+                "case_count": rng.randint(0, 200),
+            }
+            for region_id in region_ids
+            for week in weeks
+        ],
+    )
+    await session.execute(
+        insert(Prediction),
+        [
+            {
+                "disease_id": disease_id,
+                "region_id": region_id,
+                "prediction_date": week,
+                "prediction_type": "case_count",
+                "predicted_value": rng.uniform(0, 200),
+                "risk_level": rng.choice(["low", "medium", "high"]),
+            }
+            for region_id in region_ids
+            for week in weeks
+        ],
+    )
+    await session.commit()
+
+
+async def bench_analytics(database_url: str) -> List[BenchmarkResult]:
+    """Dashboard and analytics routes over a seeded dataset"""
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from src.app import create_app
+    from src.database.core import get_db
+
+    engine = await _engine(database_url)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    results = []
+    try:
+        async with sessions() as session:
+            disease_id, region_ids = await _seed_scope(session, ANALYTICS_REGIONS)
+            await _seed_analytics(session, disease_id, region_ids)
+
+        app = create_app()
+
+        async def override_get_db():
+            async with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        end = _START + timedelta(weeks=ANALYTICS_WEEKS)
+        routes = {
+            "analytics.overview": ("/api/v1/dashboard/overview", {}),
+            "analytics.map_data": (
+                "/api/v1/dashboard/map-data",
+                {"disease_id": disease_id},
+            ),
+            "analytics.trends": (
+                "/api/v1/analytics/trends",
+                {
+                    "disease_id": disease_id,
+                    "region_id": region_ids[0],
+                    "start_date": _START.isoformat(),
+                    "end_date": end.isoformat(),
+                },
+            ),
+            "analytics.predictions": (
+                "/api/v1/predictions",
+                {"disease_id": disease_id, "limit": 100},
+            ),
+        }
+        try:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://benchmark"
+            ) as client:
+                for name, (path, params) in routes.items():
+
+                    async def call(path=path, params=params):
+                        response = await client.get(path, params=params)
+                        response.raise_for_status()
+
+                    results.append(await measure_async(name, call, rounds=50))
+        finally:
+            async with sessions() as session:
+                await _drop_scope(session, disease_id, region_ids)
+    finally:
+        await engine.dispose()
+    return results
@@ -0,0 +1,201 @@
+"""
+Benchmark Harness
+
+Timing helpers, JSON result files and the baseline comparison used as a
+regression gate.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Results file layout version
+SCHEMA_VERSION = 1
+
+
+@dataclass
+class BenchmarkResult:
+    """Latency distribution of one benchmark, in milliseconds per call"""
+
+    name: str
+    median_ms: float
+    p95_ms: float
+    mean_ms: float
+    rounds: int
+    # Records or rows handled per call
+    items: int = 1
+
+    @property
+    def throughput(self) -> float:
+        """Items per second at the median latency"""
+        return self.items / (self.median_ms / 1000) if self.median_ms else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "throughput": round(self.throughput, 1)}
+
+
+@dataclass
+class Regression:
+    """A benchmark that got slower than the baseline allows"""
+
+    name: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def change(self) -> float:
+        """Relative slowdown, e.g. 0.25 for 25% slower"""
+        return self.current_ms / self.baseline_ms - 1
+
+
+def _summarize(name: str, timings: List[float], items: int) -> BenchmarkResult:
+    ms = np.array(timings) * 1000
+    return BenchmarkResult(
+        name=name,
+        median_ms=round(float(np.median(ms)), 4),
+        p95_ms=round(float(np.percentile(ms, 95)), 4),
+        mean_ms=round(float(ms.mean()), 4),
+        rounds=len(ms),
+        items=items,
+    )
+
+
+def measure(
+    name: str,
+    fn: Callable[[], Any],
+    rounds: int = 20,
+    warmup: int = 2,
+    items: int = 1,
+    max_seconds: float = 10.0,
+) -> BenchmarkResult:
+    """
+    Time ``fn`` over several rounds
+
+    Args:
+        rounds: Rounds to time, cut short after ``max_seconds`` (at least 3
+            rounds always run so the median is meaningful)
+        warmup: Untimed calls first
+        items: Records or rows each call handles
+    """
+    for _ in range(warmup):
+        fn()
+
+    timings: List[float] = []
+    deadline = time.perf_counter() + max_seconds
+    while len(timings) < rounds:
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+        if len(timings) >= 3 and time.perf_counter() > deadline:
+            break
+    return _summarize(name, timings, items)
+
+
+async def measure_async(
+    name: str,
+    fn: Callable[[], Awaitable[Any]],
+    rounds: int = 20,
+    warmup: int = 2,
+    items: int = 1,
+    max_seconds: float = 10.0,
+) -> BenchmarkResult:
+    """``measure`` for coroutine functions"""
+    for _ in range(warmup):
+        await fn()
+
+    timings: List[float] = []
+    deadline = time.perf_counter() + max_seconds
+    while len(timings) < rounds:
+        started = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - started)
+        if len(timings) >= 3 and time.perf_counter() > deadline:
+            break
+    return _summarize(name, timings, items)
+
+
+def environment() -> Dict[str, Any]:
+    """Host and version details stored next to the results"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+
+    import xgboost
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "xgboost": xgboost.__version__,
+        "commit": commit or None,
+    }
+
+
+def write_results(path: Path, results: List[BenchmarkResult]):
+    """Write results and environment details as JSON"""
+    document = {
+        "schema": SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "results": {result.name: result.to_dict() for result in results},
+    }
+    Path(path).write_text(json.dumps(document, indent=2, sort_keys=True))
+
+
+def read_results(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Benchmark name -> result dict from a results file"""
+    document = json.loads(Path(path).read_text())
+    if document.get("schema") != SCHEMA_VERSION:
+        raise ValueError(
+            f"{path} has results schema {document.get('schema')}, "
+            f"expected {SCHEMA_VERSION}"
+        )
+    return document["results"]
+
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = 0.2,
+    min_delta_ms: float = 0.05,
+) -> Tuple[List[Regression], List[str]]:
+    """
+    Find benchmarks whose median got slower than the baseline allows
+
+    Args:
+        threshold: Allowed relative slowdown (0.2 = 20%)
+        min_delta_ms: Absolute slowdowns below this are timer noise and
+            never count as regressions
+
+    Returns:
+        Regressions, slowest first, and baseline benchmarks missing from the
+        current run
+    """
+    regressions: List[Regression] = []
+    for name, result in current.items():
+        reference: Optional[Dict[str, Any]] = baseline.get(name)
+        if reference is None or reference["median_ms"] <= 0:
+            continue
+        regression = Regression(name, reference["median_ms"], result["median_ms"])
+        slower_by = regression.current_ms - regression.baseline_ms
+        if regression.change > threshold and slower_by > min_delta_ms:
+            regressions.append(regression)
+
+    missing = sorted(set(baseline) - set(current))
+    regressions.sort(key=lambda r: r.change, reverse=True)
+    return regressions, missing
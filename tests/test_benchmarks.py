@@ -0,0 +1,53 @@
+"""
+Tests for the Benchmark Harness
+
+Test result files and the regression gate used by ``tests.benchmarks``.
+"""
+
+import pytest
+
+from tests.benchmarks.harness import (
+    BenchmarkResult,
+    compare,
+    measure,
+    read_results,
+    write_results,
+)
+
+
+def result(name, median_ms):
+    return {"name": name, "median_ms": median_ms}
+
+
+class TestMeasure:
+    def test_measure_counts_rounds_and_items(self):
+        calls = []
+        timed = measure("noop", lambda: calls.append(1), rounds=5, warmup=2, items=10)
+        assert len(calls) == 7
+        assert timed.rounds == 5
+        assert timed.median_ms <= timed.p95_ms
+        assert timed.throughput > 0
+
+    def test_results_round_trip(self, tmp_path):
+        path = tmp_path / "results.json"
+        write_results(path, [BenchmarkResult("a", 1.5, 2.0, 1.6, 10, items=100)])
+        loaded = read_results(path)
+        assert loaded["a"]["median_ms"] == 1.5
+        assert loaded["a"]["throughput"] == pytest.approx(100 / 0.0015, rel=1e-3)
+
+
+class TestCompare:
+    def test_flags_regressions_beyond_threshold(self):
+        baseline = {"fast": result("fast", 10.0), "slow": result("slow", 10.0)}
+        current = {"fast": result("fast", 11.0), "slow": result("slow", 15.0)}
+        regressions, missing = compare(current, baseline, threshold=0.2)
+        assert [r.name for r in regressions] == ["slow"]
+        assert regressions[0].change == pytest.approx(0.5)
+        assert missing == []
+
+    def test_ignores_timer_noise_and_new_benchmarks(self):
+        baseline = {"tiny": result("tiny", 0.01), "gone": result("gone", 1.0)}
+        current = {"tiny": result("tiny", 0.03), "new": result("new", 5.0)}
+        regressions, missing = compare(current, baseline, threshold=0.2)
+        assert regressions == []
+        assert missing == ["gone"]
@@ -5,8 +5,20 @@ Test validation, cleaning, and loading.
 """
 
 import pytest
+from contextlib import asynccontextmanager
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError, OperationalError
+from src.database.models import ETLCheckpoint
 from src.services.etl.pipeline import DataValidator, DataCleaner, ETLPipeline
+from src.services.etl.service import ETLService
+from src.services.etl.loader import (
+    OUTBREAK_KEY,
+    DataLoader,
+    LoadResult,
+    dedupe_by_key,
+    upsert_statement,
+)
+from src.models.feature_store import OnlineFeatureStore
 
 
 class TestDataValidator:
@@ -201,3 +213,455 @@ class TestETLPipeline:
         cleaned, result = pipeline.process_digital_signals(raw_data)
         assert result.success is True
         assert len(cleaned) == 1
+
+
+class TestColumnarETL:
+    @pytest.fixture
+    def pipeline(self):
+        return ETLPipeline(DataValidator(), DataCleaner())
+
+    def test_outbreak_matches_record_path(self, pipeline):
+        raw_data = [
+            {"disease_id": 1, "region_id": 1, "date": "2024-01-01", "case_count": 10},
+            {"disease_id": 0, "region_id": 1, "date": "2024-01-01", "case_count": 3},
+            {"disease_id": 1, "region_id": 2, "date": "", "case_count": 3},
+            {"disease_id": 1, "region_id": 2, "date": "2024-01-08Z", "case_count": -1},
+            {"disease_id": 1, "region_id": 3, "date": "soon", "case_count": 2.7},
+            {"disease_id": 1, "region_id": 4, "date": "2024-01-08", "case_count": 4.9},
+        ]
+        expected = pipeline.process_outbreak_data(raw_data, columnar=False)
+        cleaned, result = pipeline.process_outbreak_data(raw_data, columnar=True)
+        assert (cleaned, result) == expected
+        assert result.errors[0] == "Record 1: Missing disease_id"
+        assert result.errors[-1].startswith("Record 4: Cleaning error - ")
+        assert cleaned[1]["case_count"] == 4
+        assert cleaned[1]["is_preliminary"] is False
+
+    def test_environmental_matches_record_path(self, pipeline):
+        raw_data = [
+            {
+                "region_id": 1,
+                "date": "2024-01-01T00:00:00Z",
+                "temperature_avg": temp,
+                "rainfall_mm": 2.675,
+                "humidity_avg": humidity,
+                "wind_speed_avg": wind,
+            }
+            for temp, humidity, wind in [
+                (25.125, 70.0, None),
+                (100, 70.0, 3.0),
+                (20.0, 101.5, 0),
+                (21.0, float("nan"), -2.0),
+            ]
+        ]
+        expected = pipeline.process_environmental_data(raw_data, columnar=False)
+        cleaned, result = pipeline.process_environmental_data(raw_data, columnar=True)
+        assert (cleaned, result) == expected
+        assert result.errors == [
+            "Record 1: Invalid temperature_avg: 100",
+            "Record 2: Invalid humidity_avg: 101.5",
+        ]
+        assert cleaned[0]["rainfall_mm"] == round(2.675, 2)
+        assert cleaned[0]["wind_speed_avg"] is None
+        assert cleaned[1]["humidity_avg"] == 0
+        assert cleaned[1]["wind_speed_avg"] == 0
+
+    def test_digital_signals_match_record_path(self, pipeline):
+        raw_data = [
+            {
+                "region_id": 1,
+                "date": "2024-01-01",
+                "signal_type": signal_type,
+                "signal_source": "google_trends",
+                "signal_value": value,
+                "signal_volume": volume,
+            }
+            for signal_type, value, volume in [
+                ("search_trend", 75.12345, 120),
+                ("", 10.0, 5),
+                ("search_trend", -1.0, 5),
+                ("search_trend", 3.0, float("nan")),
+                ("search_trend", 3.0, None),
+            ]
+        ]
+        expected = pipeline.process_digital_signals(raw_data, columnar=False)
+        assert pipeline.process_digital_signals(raw_data, columnar=True) == expected
+
+    def test_columnar_values_keep_record_path_types(self, pipeline):
+        raw_data = [
+            {
+                "region_id": 1,
+                "date": "2024-01-01",
+                "temperature_avg": temp,
+                "temperature_min": 20,
+                "humidity_avg": humidity,
+            }
+            for temp, humidity in [(True, 100), (21.5, -3.0), (22.0, 55.5)]
+        ]
+        expected, _ = pipeline.process_environmental_data(raw_data, columnar=False)
+        cleaned, _ = pipeline.process_environmental_data(raw_data, columnar=True)
+
+        def types(records):
+            return [{k: type(v) for k, v in record.items()} for record in records]
+
+        assert types(cleaned) == types(expected)
+        assert cleaned[0]["temperature_avg"] == 1.0
+        assert type(cleaned[0]["humidity_avg"]) is int
+
+    def test_irregular_batch_falls_back(self, pipeline):
+        raw_data = [
+            {"disease_id": 1, "region_id": 1, "date": "2024-01-01", "case_count": 1},
+            {"disease_id": 1, "region_id": 1, "date": "2024-01-02"},
+            {"disease_id": 1, "region_id": 1, "date": "2024-01-03", "death_count": "2"},
+        ]
+        expected = pipeline.process_outbreak_data(raw_data, columnar=False)
+        assert pipeline.process_outbreak_data(raw_data, columnar=True) == expected
+        assert expected[0][2]["death_count"] == 2
+
+    def test_min_records_selects_columnar(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            "src.services.etl.pipeline.process_columns",
+            lambda records, *args: calls.append(len(records)) or ([], []),
+        )
+        pipeline = ETLPipeline(DataValidator(), DataCleaner(), columnar_min_records=2)
+        record = {"disease_id": 1, "region_id": 1, "date": "2024-01-01"}
+
+        pipeline.process_outbreak_data([record])
+        pipeline.process_outbreak_data([record, record])
+        assert calls == [2]
+
+        class StrictValidator(DataValidator):
+            pass
+
+        pipeline.validator = StrictValidator()
+        pipeline.process_outbreak_data([record, record])
+        assert calls == [2]
+
+
+def outbreak_records(n, negative_every=0):
+    for i in range(n):
+        case_count = -1 if negative_every and i % negative_every == 0 else i
+        yield {
+            "disease_id": 1,
+            "region_id": 1,
+            "date": "2024-01-01",
+            "case_count": case_count,
+        }
+
+
+class TestStreamingETL:
+    @pytest.fixture
+    def pipeline(self):
+        return ETLPipeline(DataValidator(), DataCleaner(), chunk_size=4)
+
+    async def test_stream_chunks_a_generator(self, pipeline):
+        chunks = [
+            chunk
+            async for chunk in pipeline.stream_outbreak_data(
+                outbreak_records(10, negative_every=3)
+            )
+        ]
+        assert [result.records_processed for _, result in chunks] == [4, 4, 2]
+        errors = [error for _, result in chunks for error in result.errors]
+        # Records are numbered from the start of the stream, not the chunk
+        assert errors == [
+            f"Record {i}: case_count cannot be negative" for i in (0, 3, 6, 9)
+        ]
+        assert sum(len(cleaned) for cleaned, _ in chunks) == 6
+
+    async def test_stream_accepts_async_iterables(self, pipeline):
+        async def source():
+            for record in outbreak_records(5):
+                yield record
+
+        chunks = [chunk async for chunk in pipeline.stream_outbreak_data(source(), 2)]
+        assert [len(cleaned) for cleaned, _ in chunks] == [2, 2, 1]
+
+    async def test_service_loads_each_chunk(self):
+        class RecordingLoader:
+            def __init__(self):
+                self.chunks = []
+
+            async def load_outbreak_data(self, records, checkpoint):
+                self.chunks.append(len(records))
+                return LoadResult(inserted=len(records))
+
+        service = ETLService(db=None, chunk_size=4, max_errors=2)
+        service.loader = RecordingLoader()
+        result = await service.ingest_outbreak_data(
+            outbreak_records(10, negative_every=3)
+        )
+
+        assert service.loader.chunks == [2, 3, 1]
+        assert result.records_processed == 10
+        assert result.records_inserted == 6
+        assert result.records_failed == 4
+        assert result.success is False
+        assert result.errors == [
+            "Record 0: case_count cannot be negative",
+            "Record 3: case_count cannot be negative",
+        ]
+
+
+CHECKPOINT_COLUMNS = (
+    "job_id",
+    "data_type",
+    "records_done",
+    "rows_loaded",
+    "rows_failed",
+)
+
+
+class FakeSession:
+    """
+    Records executed statements; rows not in ``existing`` are inserted, and
+    rows in ``unchanged`` match the stored row so they return nothing
+
+    Rows whose region is in ``rejected`` fail with an integrity error, and
+    rows whose region is in ``broken`` fail as if the connection dropped.
+    """
+
+    def __init__(self, existing=(), unchanged=(), rejected=(), broken=()):
+        self.existing = set(existing) | set(unchanged)
+        self.unchanged = set(unchanged)
+        self.rejected = set(rejected)
+        self.broken = set(broken)
+        self.executed = []
+        self.copied = []
+        self.savepoints = 0
+        self.commits = 0
+        self.checkpoint = None
+
+    def _flags(self, rows):
+        keys = [tuple(row[column] for column in OUTBREAK_KEY) for row in rows]
+        return [key not in self.existing for key in keys if key not in self.unchanged]
+
+    async def execute(self, stmt, rows=None):
+        if getattr(stmt, "table", None) is ETLCheckpoint.__table__:
+            params = stmt.compile().params
+            self.checkpoint = ETLCheckpoint(
+                **{column: params[column] for column in CHECKPOINT_COLUMNS}
+            )
+            # A completed checkpoint sets completed_at with now(), not a bind
+            self.checkpoint.completed_at = params.get("completed_at", "now()")
+            return None
+        if getattr(stmt, "is_select", False) and self.checkpoint_query(stmt):
+            checkpoint = self.checkpoint
+
+            class Checkpoints:
+                def scalars(self):
+                    return self
+
+                def first(self):
+                    return checkpoint
+
+            return Checkpoints()
+
+        regions = {row["region_id"] for row in rows or []}
+        if regions & self.broken:
+            raise OperationalError("INSERT", None, Exception("connection lost"))
+        if regions & self.rejected:
+            raise IntegrityError("INSERT", None, Exception("foreign key violation"))
+
+        self.executed.append((stmt, rows))
+        flags = self._flags(rows or [])
+        merged = self._flags(dict(zip(OUTBREAK_KEY, row)) for row in self.copied)
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return flags
+
+            def one(self):
+                return sum(merged), len(merged)
+
+        return Result()
+
+    @staticmethod
+    def checkpoint_query(stmt):
+        return ETLCheckpoint.__table__ in stmt.get_final_froms()
+
+    async def connection(self):
+        session = self
+
+        class Driver:
+            async def copy_records_to_table(self, name, records, columns):
+                session.copied.extend(records)
+
+        class Connection:
+            async def get_raw_connection(self):
+                raw = type("Raw", (), {})()
+                raw.driver_connection = Driver()
+                return raw
+
+        return Connection()
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        self.savepoints += 1
+        yield
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+class TestDataLoader:
+    def test_upsert_statement_updates_given_columns(self):
+        from sqlalchemy.dialects import postgresql
+
+        from src.database.models import OutbreakData
+
+        stmt = upsert_statement(
+            OutbreakData, OUTBREAK_KEY, [*OUTBREAK_KEY, "case_count"]
+        )
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (disease_id, region_id, date) DO UPDATE" in sql
+        assert "SET case_count = excluded.case_count, updated_at = now()" in sql
+        assert "WHERE outbreak_data.case_count IS DISTINCT FROM" in sql
+        assert "RETURNING xmax = 0" in sql
+
+    def test_dedupe_keeps_last_record_per_key(self):
+        day = datetime(2024, 1, 1)
+        records = [
+            {"disease_id": 1, "region_id": 1, "date": day, "case_count": 1},
+            {"disease_id": 1, "region_id": 2, "date": day, "case_count": 2},
+            {"disease_id": 1, "region_id": 1, "date": day, "case_count": 3},
+        ]
+        assert [r["case_count"] for r in dedupe_by_key(records, OUTBREAK_KEY)] == [
+            3,
+            2,
+        ]
+
+    async def test_load_groups_by_columns_and_counts(self):
+        day = datetime(2024, 1, 1)
+        records = [
+            {"disease_id": 1, "region_id": region_id, "date": day, "case_count": 5}
+            for region_id in range(1, 5)
+        ]
+        records.append({"disease_id": 1, "region_id": 9, "date": day})
+        session = FakeSession(existing=[(1, 2, day), (1, 3, day)])
+        loader = DataLoader(session, feature_store=OnlineFeatureStore())
+
+        assert await loader.load_outbreak_data(records) == LoadResult(3, 2)
+        assert [len(rows) for _, rows in session.executed] == [4, 1]
+        assert session.commits == 1
+
+    async def test_unchanged_rows_are_counted_separately(self):
+        day = datetime(2024, 1, 1)
+        records = [
+            {"disease_id": 1, "region_id": region_id, "date": day, "case_count": 5}
+            for region_id in range(1, 6)
+        ]
+        session = FakeSession(
+            existing=[(1, 2, day)], unchanged=[(1, 3, day), (1, 4, day)]
+        )
+        loader = DataLoader(session, feature_store=OnlineFeatureStore())
+
+        assert await loader.load_outbreak_data(records) == LoadResult(2, 1, 2)
+
+    async def test_superseded_duplicates_are_counted(self):
+        records = [
+            {
+                "disease_id": 1,
+                "region_id": region_id,
+                "date": "2024-01-01",
+                "case_count": count,
+            }
+            for region_id, count in [(1, 1), (2, 2), (1, 3), (3, 3), (1, 5)]
+        ]
+        session = FakeSession(existing=[(1, 2, datetime(2024, 1, 1))])
+        service = ETLService(session)
+        service.loader = DataLoader(session, feature_store=OnlineFeatureStore())
+
+        result = await service.ingest_outbreak_data(records)
+
+        assert (result.records_inserted, result.records_updated) == (2, 1)
+        assert result.records_superseded == 2
+        assert result.records_processed == (
+            result.records_inserted
+            + result.records_updated
+            + result.records_unchanged
+            + result.records_superseded
+            + result.records_failed
+        )
+        loaded = [row["case_count"] for _, rows in session.executed for row in rows]
+        assert loaded == [5, 2, 3]
+
+    async def test_large_batches_copy_through_staging_table(self):
+        day = datetime(2024, 1, 1)
+        records = [
+            {"disease_id": 1, "region_id": region_id, "date": day}
+            for region_id in range(1, 7)
+        ]
+        session = FakeSession(existing=[(1, 1, day)])
+        loader = DataLoader(
+            session, feature_store=OnlineFeatureStore(), copy_min_rows=5
+        )
+
+        assert await loader.load_outbreak_data(records) == LoadResult(5, 1)
+        assert session.copied == [(1, region_id, day) for region_id in range(1, 7)]
+        statements = [str(stmt) for stmt, _ in session.executed]
+        assert statements[0].startswith("CREATE TEMPORARY TABLE etl_stage_")
+        assert "ON CONFLICT (disease_id, region_id, date)" in statements[1]
+        assert statements[2] == "DROP TABLE etl_stage_outbreak_data"
+
+    async def test_failing_rows_are_isolated_by_savepoints(self):
+        day = datetime(2024, 1, 1)
+        records = [
+            {"disease_id": 1, "region_id": region_id, "date": day, "case_count": 5}
+            for region_id in range(1, 9)
+        ]
+        session = FakeSession(rejected=[3, 6])
+        store = OnlineFeatureStore()
+        loader = DataLoader(session, feature_store=store, savepoint_rows=4)
+
+        result = await loader.load_outbreak_data(records)
+
+        assert (result.inserted, result.updated, result.failed) == (6, 0, 2)
+        assert result.errors[0].startswith(
+            "Load error (disease_id=1, region_id=3, date=2024-01-01"
+        )
+        loaded = [row["region_id"] for _, rows in session.executed for row in rows]
+        assert loaded == [1, 2, 4, 5, 7, 8]
+        # Two savepoints, each split in halves and then in single rows
+        assert session.savepoints == 2 + 2 * (2 + 2)
+        assert session.commits == 1
+
+    async def test_interrupted_ingestion_resumes_from_checkpoint(self):
+        def records():
+            for region_id in range(1, 11):
+                yield {
+                    "disease_id": 1,
+                    "region_id": region_id,
+                    "date": "2024-01-01",
+                    "case_count": region_id,
+                }
+
+        session = FakeSession(broken=[9])
+        service = ETLService(session, chunk_size=4)
+        service.loader = DataLoader(session, feature_store=OnlineFeatureStore())
+
+        with pytest.raises(OperationalError):
+            await service.ingest_outbreak_data(records(), job_id="backfill")
+        assert session.checkpoint.records_done == 8
+        assert session.checkpoint.completed_at is None
+
+        session.broken.clear()
+        result = await service.ingest_outbreak_data(records(), job_id="backfill")
+
+        assert result.records_processed == 2
+        assert result.records_inserted == 2
+        loaded = [row["region_id"] for _, rows in session.executed for row in rows]
+        assert loaded == list(range(1, 11))
+        assert session.checkpoint.records_done == 10
+        assert session.checkpoint.rows_loaded == 10
+        assert session.checkpoint.completed_at is not None
+
+        rerun = await service.ingest_outbreak_data(records(), job_id="backfill")
+        assert rerun.records_processed == 0
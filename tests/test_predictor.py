@@ -0,0 +1,1160 @@
+"""
+Tests for Outbreak Predictor
+
+Test single and batch predictions against the bundled model artifact.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.core.metrics import MetricsRegistry
+from src.models.artifacts import (
+    ModelArtifact,
+    convert_pickle_artifact,
+    sidecar_path,
+)
+from src.models.backends import BoosterBackend, EstimatorBackend, create_backend
+from src.models.batching import MicroBatcher
+from src.models.cache import PredictionCache
+from src.models.drift import DriftMonitor, feature_distribution
+from src.models.executor import BoundedExecutor, ExecutorSaturatedError
+from src.models.feature_store import OnlineFeatureStore
+from src.models.forecasting import ForecastSeries, RecursiveForecaster
+from src.models.features import (
+    FEATURE_NAMES,
+    INPUT_BLOCK_WIDTH,
+    FeatureVectorBuilder,
+    pack_inputs,
+    unpack_inputs,
+)
+from src.models.predictor import OutbreakPredictor
+from src.models.process_pool import ProcessInferencePool
+from src.models.registry import (
+    ModelRegistry,
+    ModelUnavailableError,
+    ResolvedModel,
+    select_model_version,
+)
+from src.models.sidecar import (
+    InferenceClient,
+    InferenceServer,
+    RemotePredictor,
+    SidecarError,
+    decode_block,
+    decode_request,
+    encode_block,
+    encode_request,
+)
+from src.models.service import ModelService
+
+MODEL_PATH = Path(__file__).parent.parent / "models" / "dengue_outbreak_predictor.pkl"
+
+SAMPLE_INPUTS = [
+    {
+        "temp_avg": 27.5,
+        "temp_min": 23.0,
+        "temp_max": 32.0,
+        "precipitation_mm": 45.0,
+        "humidity_percent": 78.0,
+        "weekofyear": 32,
+        "previous_cases": [12, 18, 25, 31],
+    },
+    {
+        "temp_avg": 24.0,
+        "temp_min": 20.0,
+        "temp_max": 28.0,
+        "precipitation_mm": 5.0,
+        "humidity_percent": 60.0,
+        "weekofyear": 3,
+        "previous_cases": [2],
+    },
+    {
+        "temp_avg": 29.0,
+        "temp_min": 25.0,
+        "temp_max": 34.0,
+        "precipitation_mm": 120.0,
+        "humidity_percent": 90.0,
+        "weekofyear": 40,
+        "previous_cases": [80, 95, 120, 150],
+    },
+]
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    predictor = OutbreakPredictor(str(MODEL_PATH))
+    assert predictor.is_loaded()
+    return predictor
+
+
+class TestOutbreakPredictor:
+    def test_predict_returns_expected_keys(self, predictor):
+        result = predictor.predict(**SAMPLE_INPUTS[0])
+        assert set(result) == {
+            "predicted_cases",
+            "risk_level",
+            "confidence",
+            "threshold",
+            "features_used",
+        }
+        assert result["risk_level"] in ("Low", "Medium", "High")
+
+    def test_predict_batch_matches_single(self, predictor):
+        batch = predictor.predict_batch(SAMPLE_INPUTS)
+        assert len(batch) == len(SAMPLE_INPUTS)
+        for row, result in zip(SAMPLE_INPUTS, batch):
+            single = predictor.predict(**row)
+            assert result["predicted_cases"] == pytest.approx(
+                single["predicted_cases"], rel=1e-5
+            )
+            assert result["risk_level"] == single["risk_level"]
+            assert result["confidence"] == single["confidence"]
+
+    def test_predict_batch_empty(self, predictor):
+        assert predictor.predict_batch([]) == []
+
+    def test_risk_arrays_match_scalar(self, predictor):
+        import numpy as np
+
+        threshold = predictor.outbreak_threshold
+        values = np.array([0.0, threshold * 0.49, threshold * 0.75, threshold, 500.0])
+        risks = predictor._assess_risk_array(values)
+        confidences = predictor._calculate_confidence_array(values)
+        for value, risk, confidence in zip(values, risks, confidences):
+            assert risk == predictor._assess_risk(float(value))
+            assert confidence == predictor._calculate_confidence(float(value))
+
+    def test_unloaded_predictor_raises(self, tmp_path):
+        predictor = OutbreakPredictor(str(tmp_path / "missing.pkl"))
+        assert not predictor.is_loaded()
+        with pytest.raises(ValueError):
+            predictor.predict_batch(SAMPLE_INPUTS)
+
+
+class TestModelService:
+    def test_predict_outbreak_batch(self):
+        service = ModelService(str(MODEL_PATH))
+        results = service.predict_outbreak_batch(SAMPLE_INPUTS)
+        assert len(results) == len(SAMPLE_INPUTS)
+
+    def test_predict_outbreak_batch_without_model(self, tmp_path):
+        service = ModelService(str(tmp_path / "missing.pkl"))
+        with pytest.raises(ValueError):
+            service.predict_outbreak_batch(SAMPLE_INPUTS)
+
+
+class TestExplanations:
+    def test_contributions_add_up_to_the_prediction(self, predictor):
+        matrix = predictor.feature_matrix(SAMPLE_INPUTS)
+        expected = predictor.predict_batch(SAMPLE_INPUTS)
+        stats = predictor.get_drift_stats()
+        observed = stats["rows_observed"] if stats else None
+        explanations = predictor.explain_matrix(matrix)
+        # Explanations are not counted as traffic by the drift monitor
+        if stats:
+            assert predictor.get_drift_stats()["rows_observed"] == observed
+        for explanation, prediction in zip(explanations, expected):
+            total = explanation["base_value"] + sum(
+                c["contribution"] for c in explanation["contributions"]
+            )
+            assert total == pytest.approx(prediction["predicted_cases"], abs=1e-3)
+            # Same scoring path as /predict, so risk levels never disagree
+            assert explanation["predicted_cases"] == prediction["predicted_cases"]
+            assert explanation["risk_level"] == prediction["risk_level"]
+            magnitudes = [abs(c["contribution"]) for c in explanation["contributions"]]
+            assert magnitudes == sorted(magnitudes, reverse=True)
+
+    def test_service_caches_per_feature_vector(self):
+        service = ModelService(str(MODEL_PATH))
+        first = service.explain(SAMPLE_INPUTS)
+        # Same features under another scope hit the cache
+        scoped = [{**row, "disease_id": 7} for row in SAMPLE_INPUTS]
+        assert service.explain(scoped, top_k=3) == [
+            {**e, "contributions": e["contributions"][:3]} for e in first
+        ]
+        assert service._explanations.get_stats()["hits"] == len(SAMPLE_INPUTS)
+
+
+class TestPredictionRoutes:
+    async def test_predict_endpoint(self, client):
+        response = await client.post("/api/v1/predict", json=SAMPLE_INPUTS[0])
+        assert response.status_code == 200
+        assert response.json()["risk_level"] in ("Low", "Medium", "High")
+
+    async def test_predict_batch_endpoint(self, client):
+        response = await client.post(
+            "/api/v1/predict/batch", json={"requests": SAMPLE_INPUTS}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == len(SAMPLE_INPUTS)
+        assert len(data["predictions"]) == len(SAMPLE_INPUTS)
+
+    async def test_explain_endpoint(self, client):
+        response = await client.post(
+            "/api/v1/predict/explain", json={"requests": SAMPLE_INPUTS, "top_k": 5}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == len(SAMPLE_INPUTS)
+        assert all(len(e["contributions"]) == 5 for e in data["explanations"])
+
+    async def test_model_stats_report_drift(self, client):
+        await client.post("/api/v1/predict", json=SAMPLE_INPUTS[0])
+        response = await client.get("/api/v1/model/stats")
+        assert response.status_code == 200
+        drift = response.json()["drift"]
+        assert drift["rows_observed"] >= 1
+        assert "temp_avg" in drift["features"]
+
+    async def test_predict_batch_rejects_empty(self, client):
+        response = await client.post("/api/v1/predict/batch", json={"requests": []})
+        assert response.status_code == 422
+
+
+class TestDriftMonitor:
+    COLUMNS = ["a", "b"]
+
+    def reference(self, rng):
+        training = np.column_stack([rng.normal(0, 1, 5000), rng.uniform(0, 10, 5000)])
+        return feature_distribution(training, self.COLUMNS)
+
+    def test_streaming_moments_match_numpy(self):
+        rng = np.random.default_rng(0)
+        data = rng.normal([5.0, -2.0], [2.0, 0.5], size=(1000, 2))
+        monitor = DriftMonitor(self.COLUMNS, buffer_rows=64)
+        for chunk in np.array_split(data, 37):
+            monitor.observe(chunk)
+        monitor.observe(data[0])
+
+        observed = np.vstack([data, data[:1]])
+        stats = monitor.get_stats()
+        assert stats["rows_observed"] == 1001
+        assert stats["reference"] is False
+        assert stats["status"] is None
+        for j, name in enumerate(self.COLUMNS):
+            assert stats["features"][name]["mean"] == pytest.approx(
+                observed[:, j].mean()
+            )
+            assert stats["features"][name]["std"] == pytest.approx(observed[:, j].std())
+
+    def test_same_distribution_is_stable(self):
+        rng = np.random.default_rng(1)
+        monitor = DriftMonitor(self.COLUMNS, self.reference(rng))
+        monitor.observe(
+            np.column_stack([rng.normal(0, 1, 2000), rng.uniform(0, 10, 2000)])
+        )
+
+        stats = monitor.get_stats()
+        assert stats["status"] == "stable"
+        assert stats["max_psi"] < 0.1
+        assert stats["drifted_features"] == []
+
+    def test_shifted_feature_is_flagged(self):
+        rng = np.random.default_rng(2)
+        monitor = DriftMonitor(self.COLUMNS, self.reference(rng))
+        monitor.observe(
+            np.column_stack([rng.normal(1.5, 1, 2000), rng.uniform(0, 10, 2000)])
+        )
+
+        stats = monitor.get_stats()
+        assert stats["status"] == "drift"
+        assert stats["drifted_features"] == ["a"]
+        assert stats["features"]["a"]["ks"] > 0.4
+        assert stats["features"]["a"]["mean_shift"] == pytest.approx(1.5, abs=0.15)
+
+    def test_window_keeps_recent_rows_dominant(self):
+        rng = np.random.default_rng(3)
+        monitor = DriftMonitor(self.COLUMNS, self.reference(rng), window_rows=1000)
+        for shift in (3, 0):
+            rows = np.column_stack(
+                [rng.normal(shift, 1, 5000), rng.uniform(0, 10, 5000)]
+            )
+            for chunk in np.array_split(rows, 50):
+                monitor.observe(chunk)
+
+        stats = monitor.get_stats()
+        assert stats["rows_weighted"] <= 1000
+        assert stats["features"]["a"]["psi"] < 0.1
+
+    def test_predictor_observes_scored_rows(self, predictor):
+        before = predictor.get_drift_stats()["rows_observed"]
+        predictor.predict(**SAMPLE_INPUTS[0])
+        predictor.predict_batch(SAMPLE_INPUTS)
+        after = predictor.get_drift_stats()
+        assert after["rows_observed"] == before + 1 + len(SAMPLE_INPUTS)
+        assert set(after["features"]) == set(predictor.feature_columns)
+
+
+class TestFeatureVectorBuilder:
+    def test_feature_names_match_create_features(self, predictor):
+        features = predictor.create_features(**SAMPLE_INPUTS[0])
+        assert tuple(features) == FEATURE_NAMES
+
+    def test_build_row_matches_dataframe_path(self, predictor):
+        import pandas as pd
+
+        builder = FeatureVectorBuilder(predictor.feature_columns)
+        for row in SAMPLE_INPUTS:
+            expected = (
+                pd.DataFrame([predictor.create_features(**row)])
+                .reindex(columns=predictor.feature_columns, fill_value=0.0)
+                .to_numpy(dtype=float)[0]
+            )
+            assert builder.build_row(**row).tolist() == expected.tolist()
+
+    def test_build_matrix_matches_rows(self, predictor):
+        builder = FeatureVectorBuilder(predictor.feature_columns)
+        matrix = builder.build_matrix(SAMPLE_INPUTS)
+        assert matrix.shape == (len(SAMPLE_INPUTS), len(predictor.feature_columns))
+        for i, row in enumerate(SAMPLE_INPUTS):
+            assert matrix[i].tolist() == builder.build_row(**row).tolist()
+
+    def test_build_matrix_reuses_buffer(self, predictor):
+        import numpy as np
+
+        builder = FeatureVectorBuilder(predictor.feature_columns)
+        buffer = np.full((8, builder.n_features), np.nan)
+        matrix = builder.build_matrix(SAMPLE_INPUTS, out=buffer)
+        assert np.shares_memory(matrix, buffer)
+        assert not np.isnan(matrix).any()
+
+
+class TestInferenceBackends:
+    def test_xgboost_model_uses_booster(self, predictor):
+        assert isinstance(predictor._backend, BoosterBackend)
+        assert predictor.get_model_info()["inference_backend"] == "xgboost_booster"
+
+    def test_booster_matches_estimator(self, predictor):
+        builder = FeatureVectorBuilder(predictor.feature_columns)
+        matrix = builder.build_matrix(SAMPLE_INPUTS)
+        estimator = EstimatorBackend(predictor.model, predictor.feature_columns)
+        booster = BoosterBackend(predictor.model, nthread=1)
+        assert booster.predict(matrix) == pytest.approx(
+            estimator.predict(matrix), rel=1e-6
+        )
+
+    def test_estimator_contributions_leave_shared_booster_alone(self, predictor):
+        import json
+
+        def nthread(booster):
+            config = json.loads(booster.save_config())
+            return config["learner"]["generic_param"]["nthread"]
+
+        shared = predictor.model.get_booster()
+        shared.set_param({"nthread": 3})
+        estimator = EstimatorBackend(predictor.model, predictor.feature_columns)
+        matrix = FeatureVectorBuilder(predictor.feature_columns).build_matrix(
+            SAMPLE_INPUTS
+        )
+        contributions = estimator.contributions(matrix)
+        assert nthread(shared) == "3"
+        assert contributions.sum(axis=1) == pytest.approx(
+            estimator.predict(matrix), rel=1e-5
+        )
+
+    def test_non_xgboost_model_falls_back(self):
+        import numpy as np
+        from sklearn.linear_model import LinearRegression
+
+        model = LinearRegression().fit(np.eye(3), [1.0, 2.0, 3.0])
+        backend = create_backend(model, ["a", "b", "c"], nthread=1)
+        assert isinstance(backend, EstimatorBackend)
+        assert backend.predict(np.eye(3)) == pytest.approx([1.0, 2.0, 3.0])
+
+
+class TestMicroBatcher:
+    async def test_concurrent_requests_share_one_call(self):
+        import asyncio
+
+        calls = []
+
+        def score(rows):
+            calls.append(len(rows))
+            return [{"value": row["value"] * 2} for row in rows]
+
+        batcher = MicroBatcher(score, max_batch_size=64, max_wait_ms=20)
+        results = await asyncio.gather(
+            *(batcher.submit({"value": i}) for i in range(10))
+        )
+        assert [r["value"] for r in results] == [i * 2 for i in range(10)]
+        assert calls == [10]
+
+    async def test_flushes_at_max_batch_size(self):
+        import asyncio
+
+        calls = []
+
+        def score(rows):
+            calls.append(len(rows))
+            return rows
+
+        batcher = MicroBatcher(score, max_batch_size=4, max_wait_ms=20)
+        await asyncio.gather(*(batcher.submit({"value": i}) for i in range(10)))
+        assert sorted(calls) == [2, 4, 4]
+
+    async def test_failing_row_is_isolated(self):
+        import asyncio
+
+        def score(rows):
+            if any(row["value"] < 0 for row in rows):
+                raise ValueError("negative value")
+            return rows
+
+        batcher = MicroBatcher(score, max_batch_size=64, max_wait_ms=20)
+        results = await asyncio.gather(
+            batcher.submit({"value": 1}),
+            batcher.submit({"value": -1}),
+            return_exceptions=True,
+        )
+        assert results[0] == {"value": 1}
+        assert isinstance(results[1], ValueError)
+
+    async def test_service_async_matches_sync(self):
+        import asyncio
+
+        service = ModelService(str(MODEL_PATH))
+        results = await asyncio.gather(
+            *(service.predict_outbreak_async(**row) for row in SAMPLE_INPUTS)
+        )
+        for row, result in zip(SAMPLE_INPUTS, results):
+            expected = service.predict_outbreak(**row)
+            assert result["predicted_cases"] == pytest.approx(
+                expected["predicted_cases"]
+            )
+
+
+class TestBoundedExecutor:
+    async def test_runs_work_and_records_stats(self):
+        executor = BoundedExecutor(max_workers=2, max_queue=2, name="test")
+        assert await executor.run(sum, [1, 2, 3]) == 6
+        stats = executor.get_stats()
+        assert stats["submitted"] == 1
+        assert stats["completed"] == 1
+        assert stats["queue_depth"] == 0
+
+    async def test_rejects_when_saturated(self):
+        import asyncio
+        import threading
+
+        release = threading.Event()
+        executor = BoundedExecutor(max_workers=1, max_queue=1, name="test")
+        blocked = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(release.wait)
+
+        stats = executor.get_stats()
+        assert stats["rejected"] == 1
+        assert stats["queue_depth"] == 1
+
+        release.set()
+        await asyncio.gather(*blocked)
+        executor.shutdown()
+
+    async def test_cancelled_call_holds_its_slot_until_done(self):
+        import asyncio
+        import threading
+
+        release = threading.Event()
+        executor = BoundedExecutor(max_workers=1, max_queue=0, name="test")
+        # Waits are bounded so a leaked slot fails the test instead of hanging
+        blocked = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        blocked.cancel()
+        await asyncio.sleep(0)
+
+        # The thread is still busy, so the pool has no room for more work
+        try:
+            with pytest.raises(ExecutorSaturatedError):
+                await executor.run(release.wait, 5)
+        finally:
+            release.set()
+        for _ in range(100):
+            if executor.get_stats()["completed"]:
+                break
+            await asyncio.sleep(0.01)
+        assert await executor.run(sum, [1, 2]) == 3
+        executor.shutdown()
+
+    async def test_service_reload_runs_off_loop(self):
+        service = ModelService(str(MODEL_PATH))
+        assert await service.reload_model_async() is True
+        assert service.get_executor_stats()["loader"]["completed"] == 1
+
+
+class TestModelHotSwap:
+    @pytest.fixture
+    def service(self, tmp_path):
+        import shutil
+
+        model_path = tmp_path / "model.pkl"
+        shutil.copy(MODEL_PATH, model_path)
+        return ModelService(str(model_path))
+
+    def test_reload_swaps_in_new_predictor(self, service):
+        old = service.predictor
+        assert service.reload_model() is True
+        assert service.predictor is not old
+        assert service.is_model_loaded()
+
+    def test_failed_reload_keeps_old_model(self, service):
+        from pathlib import Path
+
+        old = service.predictor
+        Path(service.model_path).write_bytes(b"not a model")
+        assert service.reload_model() is False
+        assert service.predictor is old
+        assert service.predict_outbreak(**SAMPLE_INPUTS[0])["predicted_cases"] >= 0
+
+    def test_missing_file_keeps_old_model(self, service):
+        from pathlib import Path
+
+        old = service.predictor
+        Path(service.model_path).unlink()
+        assert service.reload_model() is False
+        assert service.predictor is old
+
+    def test_invalid_predictions_are_rejected(self, service, monkeypatch):
+        old = service.predictor
+        monkeypatch.setattr(
+            OutbreakPredictor,
+            "predict_batch",
+            lambda self, rows: [{"predicted_cases": float("nan")} for _ in rows],
+        )
+        assert service.reload_model() is False
+        assert service.predictor is old
+
+
+class TestNativeArtifact:
+    @pytest.fixture
+    def native_path(self, tmp_path):
+        return convert_pickle_artifact(MODEL_PATH, tmp_path / "model.ubj")
+
+    def test_convert_writes_booster_and_sidecar(self, native_path):
+        assert native_path.exists()
+        assert sidecar_path(native_path).exists()
+
+    def test_native_predictions_match_pickle(self, predictor, native_path):
+        native = OutbreakPredictor(str(native_path))
+        assert native.is_loaded()
+        assert native.feature_columns == predictor.feature_columns
+        assert native.outbreak_threshold == pytest.approx(predictor.outbreak_threshold)
+        for row in SAMPLE_INPUTS:
+            assert native.predict(**row) == predictor.predict(**row)
+
+    def test_sidecar_is_parsed_lazily(self, native_path):
+        artifact = ModelArtifact(native_path)
+        assert "metadata" not in artifact.__dict__
+        assert artifact.data_source == "DrivenData (San Juan)"
+        assert "metadata" in artifact.__dict__
+
+    def test_digest_is_cached_until_the_files_change(self, native_path, monkeypatch):
+        import json
+
+        from src.models import artifacts
+
+        first = artifacts.artifact_digest(native_path)
+        monkeypatch.setattr(artifacts, "open", None, raising=False)
+        assert artifacts.artifact_digest(native_path) == first
+        monkeypatch.undo()
+
+        meta = json.loads(sidecar_path(native_path).read_text())
+        meta["outbreak_threshold"] += 1
+        sidecar_path(native_path).write_text(json.dumps(meta))
+        assert artifacts.artifact_digest(native_path) != first
+
+    def test_missing_sidecar_fails_to_load(self, native_path):
+        sidecar_path(native_path).unlink()
+        assert not OutbreakPredictor(str(native_path)).is_loaded()
+
+    def test_bundled_native_artifact_is_served(self):
+        from src.api.dependencies import get_model_path
+
+        assert get_model_path().suffix == ".ubj"
+        assert OutbreakPredictor(str(get_model_path())).is_loaded()
+
+
+class TestPredictionCache:
+    def test_hit_miss_and_eviction_counters(self):
+        cache = PredictionCache(max_size=2, ttl_seconds=60)
+        cache.put("a", {"v": 1})
+        cache.put("b", {"v": 2})
+        assert cache.get("a") == {"v": 1}
+        cache.put("c", {"v": 3})  # evicts "b", the least recently used
+        assert cache.get("b") is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+
+    def test_entries_expire(self, monkeypatch):
+        import time
+
+        now = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+        cache = PredictionCache(max_size=10, ttl_seconds=5)
+        cache.put("a", {"v": 1})
+        now[0] += 6
+        assert cache.get("a") is None
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_canonical_keys_pad_history_and_quantize(self):
+        cache = PredictionCache(decimals=1)
+        first = cache.canonicalize({**SAMPLE_INPUTS[1], "temp_avg": 24.04})
+        second = cache.canonicalize(
+            {**SAMPLE_INPUTS[1], "previous_cases": [0, 0, 0, 2]}
+        )
+        assert cache.make_key("m", first) == cache.make_key("m", second)
+        assert cache.make_key("m", first) != cache.make_key("other", first)
+
+    def test_service_serves_repeats_from_cache(self):
+        service = ModelService(str(MODEL_PATH))
+        first = service.predict_outbreak(**SAMPLE_INPUTS[0])
+        second = service.predict_outbreak(**SAMPLE_INPUTS[0])
+        assert first == second
+        batch = service.predict_outbreak_batch(SAMPLE_INPUTS)
+        assert batch[0] == first
+        stats = service.get_cache_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1 + len(SAMPLE_INPUTS) - 1
+
+    async def test_async_path_uses_cache(self):
+        service = ModelService(str(MODEL_PATH))
+        first = await service.predict_outbreak_async(**SAMPLE_INPUTS[0])
+        second = await service.predict_outbreak_async(**SAMPLE_INPUTS[0])
+        assert first == second
+        assert service.get_cache_stats()["hits"] == 1
+
+    def test_reload_of_changed_model_invalidates(self, tmp_path):
+        import json
+
+        native = convert_pickle_artifact(MODEL_PATH, tmp_path / "model.ubj")
+        service = ModelService(str(native))
+        service.predict_outbreak(**SAMPLE_INPUTS[0])
+        old_version = service.predictor.version
+
+        metadata = json.loads(sidecar_path(native).read_text())
+        metadata["outbreak_threshold"] = 5.0
+        sidecar_path(native).write_text(json.dumps(metadata))
+
+        assert service.reload_model() is True
+        assert service.predictor.version != old_version
+        assert service.get_cache_stats()["size"] == 0
+        assert service.predict_outbreak(**SAMPLE_INPUTS[0])["threshold"] == 5.0
+
+
+class TestModelRegistry:
+    """Per-disease / per-region model resolution and residency"""
+
+    def test_most_specific_active_version_wins(self):
+        from datetime import datetime
+        from types import SimpleNamespace
+
+        def version(name, disease_id=None, region_id=None, day=1, active=True):
+            return SimpleNamespace(
+                model_version=name,
+                disease_id=disease_id,
+                region_id=region_id,
+                training_date=datetime(2024, 1, day),
+                is_active=active,
+                model_artifact_path=f"models/{name}.ubj",
+            )
+
+        versions = [
+            version("global", day=5),
+            version("disease", disease_id=1),
+            version("region", region_id=7, day=9),
+            version("both", disease_id=1, region_id=7, active=False),
+            version("other", disease_id=2, region_id=7),
+        ]
+        assert select_model_version(versions, 1, 7).model_version == "disease"
+        assert select_model_version(versions, 3, 7).model_version == "region"
+        assert select_model_version(versions, 3, 8).model_version == "global"
+        assert select_model_version(versions[1:2], 3, 8) is None
+
+    def test_resident_models_are_evicted_lru(self, tmp_path):
+        default = ModelService(str(MODEL_PATH))
+        paths = [
+            convert_pickle_artifact(MODEL_PATH, tmp_path / f"model_{i}.ubj")
+            for i in range(3)
+        ]
+        size = paths[0].stat().st_size + sidecar_path(paths[0]).stat().st_size
+        registry = ModelRegistry(
+            default, base_dir=tmp_path, max_resident_bytes=2 * size
+        )
+
+        first = registry.get_service_for_path("model_0.ubj")
+        assert first is not default and first.is_model_loaded()
+        assert first._executor is default._executor
+        registry.get_service_for_path("model_1.ubj")
+        assert registry.get_service_for_path("model_0.ubj") is first
+        registry.get_service_for_path("model_2.ubj")
+
+        stats = registry.get_stats()
+        assert stats["resident_models"] == 2
+        assert stats["evictions"] == 1
+        assert str(paths[1].resolve()) not in stats["resident_paths"]
+        with pytest.raises(ModelUnavailableError):
+            registry.get_service_for_path("missing.ubj")
+
+    async def test_scoped_model_that_fails_to_load_is_not_replaced(self, tmp_path):
+        default = ModelService(str(MODEL_PATH))
+        registry = ModelRegistry(default, base_dir=tmp_path)
+
+        async def resolve(db, disease_id, region_id):
+            if disease_id is None:
+                return None
+            return ResolvedModel(1, "v2", tmp_path / "missing.ubj")
+
+        registry.resolve = resolve
+        assert await registry.get_service(None, None, 7) is default
+        with pytest.raises(ModelUnavailableError):
+            await registry.get_service(None, 1, 7)
+
+
+class TestMetrics:
+    """Latency histograms and the Prometheus endpoint"""
+
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram(
+            "test_seconds", "Test", labelnames=("stage",), buckets=(0.1, 1.0)
+        )
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, stage="model")
+
+        text = registry.render()
+        assert 'test_seconds_bucket{stage="model",le="0.1"} 2' in text
+        assert 'test_seconds_bucket{stage="model",le="1"} 3' in text
+        assert 'test_seconds_bucket{stage="model",le="+Inf"} 4' in text
+        assert 'test_seconds_count{stage="model"} 4' in text
+        with pytest.raises(ValueError):
+            histogram.observe(1.0)
+
+    def test_predictor_records_stages(self, predictor):
+        from src.core.metrics import INFERENCE_STAGE_SECONDS
+
+        before = INFERENCE_STAGE_SECONDS.get_count(
+            stage="matrix", model_version=predictor.version
+        )
+        predictor.predict_batch(SAMPLE_INPUTS)
+        for stage in ("matrix", "model", "risk", "confidence"):
+            assert (
+                INFERENCE_STAGE_SECONDS.get_count(
+                    stage=stage, model_version=predictor.version
+                )
+                >= before + 1
+            )
+
+    async def test_metrics_endpoint(self, client):
+        await client.post("/api/v1/predict", json=SAMPLE_INPUTS[2])
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert (
+            'epidemiology_prediction_requests_total{endpoint="predict",status="200"}'
+            in text
+        )
+        assert 'stage="serialize"' in text
+        assert "epidemiology_prediction_batch_size_bucket" in text
+        assert "epidemiology_model_loaded 1" in text
+
+
+class TestFeatureStore:
+    """Rolling weather and case history served from ring buffers"""
+
+    def test_weekly_history_and_rolling_means(self, predictor):
+        from datetime import date, timedelta
+
+        store = OnlineFeatureStore(weeks=6)
+        monday = date(2024, 7, 1)
+        for week, (temp, rain, humidity) in enumerate(
+            [(20.0, 10.0, 60.0), (22.0, 20.0, 70.0), (24.0, 30.0, 80.0)]
+        ):
+            # Two days per week: temperature is averaged, rain summed
+            for day in (0, 1):
+                store.record_environmental(
+                    7,
+                    monday + timedelta(weeks=week, days=day),
+                    temp,
+                    rain / 2,
+                    humidity,
+                )
+        as_of = monday + timedelta(weeks=3)
+        history = store.weather_history(7, as_of=as_of)
+        assert history == ((20.0, 10.0, 60.0), (22.0, 20.0, 70.0), (24.0, 30.0, 80.0))
+
+        features = predictor.create_features(**SAMPLE_INPUTS[0], history=history)
+        assert features["temp_avg_roll_2w"] == (24.0 + 27.5) / 2
+        assert features["precip_roll_4w"] == (10.0 + 20.0 + 30.0 + 45.0) / 4
+
+        builder = FeatureVectorBuilder(predictor.feature_columns)
+        rows = [{**SAMPLE_INPUTS[0], "history": history}, SAMPLE_INPUTS[1]]
+        matrix = builder.build_matrix(rows)
+        assert matrix[0].tolist() == builder.build_row(**rows[0]).tolist()
+        assert matrix[1].tolist() == builder.build_row(**rows[1]).tolist()
+
+    def test_updates_replace_days_and_old_weeks_drop(self):
+        from datetime import date, timedelta
+
+        store = OnlineFeatureStore(weeks=4)
+        monday = date(2024, 7, 1)
+        store.record_outbreak(1, 7, monday, 10)
+        store.record_outbreak(1, 7, monday, 12)
+        store.record_outbreak(1, 7, monday + timedelta(weeks=2), 30)
+        as_of = monday + timedelta(weeks=3)
+        assert store.case_history(1, 7, as_of=as_of) == (None, 12, None, 30)
+        assert store.complete_cases(1, 7, [40], as_of=as_of) == [0, 12, 0, 40]
+
+        store.record_outbreak(1, 7, monday + timedelta(weeks=8), 5)
+        store.record_outbreak(1, 7, monday, 99)
+        assert store.get_stats()["dropped_rows"] == 1
+        assert store.case_history(1, 7, as_of=as_of) is None
+
+    def test_service_uses_history_for_scoped_requests(self):
+        from datetime import date, timedelta
+
+        store = OnlineFeatureStore()
+        service = ModelService(str(MODEL_PATH), feature_store=store)
+        this_week = {**SAMPLE_INPUTS[0], "weekofyear": date.today().isocalendar()[1]}
+        unscoped = service.predict_outbreak(**this_week, region_id=7)
+        for weeks_ago in (1, 2, 3):
+            store.record_environmental(
+                7, date.today() - timedelta(weeks=weeks_ago), 15.0, 0.0, 40.0
+            )
+        scoped = service.predict_outbreak(**this_week, region_id=7)
+        assert scoped["predicted_cases"] != unscoped["predicted_cases"]
+        assert service.predict_outbreak(**this_week) == unscoped
+
+    def test_history_is_anchored_at_the_requested_week(self):
+        from datetime import date, timedelta
+
+        from src.models.feature_store import request_week
+
+        today = date(2026, 1, 1)  # ISO week 1 of 2026
+        assert request_week(1, today=today) == date(2025, 12, 29)
+        assert request_week(30, today=today) is None
+        assert request_week(53, 2020) == date(2020, 12, 28)
+        with pytest.raises(ValueError):
+            request_week(53, 2021)
+
+        store = OnlineFeatureStore()
+        service = ModelService(str(MODEL_PATH), feature_store=store)
+        for weeks_ago in (1, 2, 3):
+            store.record_environmental(
+                7, date.today() - timedelta(weeks=weeks_ago), 15.0, 0.0, 40.0
+            )
+        year, week, _ = (date.today() - timedelta(weeks=20)).isocalendar()
+        past = {**SAMPLE_INPUTS[0], "weekofyear": week}
+        unscoped = service.predict_outbreak(**past)
+        # Another week without a year, or with one, never gets this week's data
+        assert service.predict_outbreak(**past, region_id=7) == unscoped
+        assert service.predict_outbreak(**past, region_id=7, year=year) == unscoped
+
+
+class TestRecursiveForecaster:
+    """Multi-week forecasts fed back through the lag features"""
+
+    @staticmethod
+    def make_series(row, region_id=1, week_start=None):
+        from datetime import date, timedelta
+
+        return ForecastSeries(
+            disease_id=1,
+            region_id=region_id,
+            # The week before ``weekofyear`` in 2024, so forecasts start there
+            week_start=week_start
+            or date.fromisocalendar(2024, row["weekofyear"], 1) - timedelta(weeks=1),
+            weather={
+                field: row[field]
+                for field in (
+                    "temp_avg",
+                    "temp_min",
+                    "temp_max",
+                    "precipitation_mm",
+                    "humidity_percent",
+                )
+            },
+            previous_cases=row["previous_cases"],
+        )
+
+    def test_steps_feed_predictions_back(self, predictor):
+        series = [self.make_series(row, i) for i, row in enumerate(SAMPLE_INPUTS)]
+        forecast = RecursiveForecaster(predictor).forecast(series, horizon_weeks=3)
+        assert forecast.predicted_cases.shape == (len(SAMPLE_INPUTS), 3)
+
+        row = SAMPLE_INPUTS[0]
+        latest = (row["temp_avg"], row["precipitation_mm"], row["humidity_percent"])
+        cases = [float(c) for c in row["previous_cases"]]
+        for step in range(3):
+            expected = predictor.predict(
+                **{
+                    **row,
+                    "weekofyear": row["weekofyear"] + step,
+                    "previous_cases": cases[-4:],
+                    "history": (None,) * (2 - step) + (latest,) * (step + 1),
+                }
+            )
+            assert forecast.predicted_cases[0, step] == pytest.approx(
+                expected["predicted_cases"], rel=1e-5
+            )
+            assert forecast.risk_levels[0, step] == expected["risk_level"]
+            cases.append(max(expected["predicted_cases"], 0.0))
+
+        assert forecast.target_date(0, 2).isoformat() == "2024-08-12"
+
+    def test_weeks_follow_iso_calendar_across_years(self, predictor):
+        from datetime import date
+
+        # 2026 has an ISO week 53
+        row = SAMPLE_INPUTS[0]
+        series = [self.make_series(row, week_start=date(2026, 12, 21))]
+        forecast = RecursiveForecaster(predictor).forecast(series, horizon_weeks=3)
+
+        latest = (row["temp_avg"], row["precipitation_mm"], row["humidity_percent"])
+        cases = [float(c) for c in row["previous_cases"]]
+        for step, week in enumerate((53, 1, 2)):
+            expected = predictor.predict(
+                **{
+                    **row,
+                    "weekofyear": week,
+                    "previous_cases": cases[-4:],
+                    "history": (None,) * (2 - step) + (latest,) * (step + 1),
+                }
+            )
+            assert forecast.predicted_cases[0, step] == pytest.approx(
+                expected["predicted_cases"], rel=1e-5
+            )
+            cases.append(max(expected["predicted_cases"], 0.0))
+
+    def test_service_forecast_and_empty_input(self):
+        service = ModelService(str(MODEL_PATH))
+        forecast = service.forecast([self.make_series(SAMPLE_INPUTS[1])], 2)
+        assert forecast.model_version == service.predictor.version
+        assert service.forecast([], 2).predicted_cases.shape == (0, 2)
+        with pytest.raises(ValueError):
+            service.forecast([], 0)
+
+
+class TestForecastSeries:
+    """Database history aligned into forecast series"""
+
+    WEATHER = {
+        "temp_avg": 27.0,
+        "temp_min": 23.0,
+        "temp_max": 31.0,
+        "precipitation_mm": 40.0,
+        "humidity_percent": 80.0,
+    }
+
+    def test_weeks_are_placed_by_offset_from_the_latest_case_week(self):
+        from datetime import datetime, timedelta
+
+        from src.services.forecasting import build_series
+
+        monday = datetime(2024, 3, 4)
+        weeks = [monday + timedelta(weeks=i) for i in range(6)]
+        cases = {(1, 7): [(weeks[0], 5), (weeks[1], 6), (weeks[3], 8), (weeks[4], 9)]}
+        weather = {
+            7: [
+                (week, {**self.WEATHER, "temp_avg": float(i)})
+                for i, week in enumerate(weeks)
+                if i != 2
+            ]
+        }
+
+        (series,), skipped = build_series(cases, weather)
+        assert skipped == 0
+        # Anchored at the last case week, not the later weather week
+        assert series.week_start == weeks[4].date()
+        assert series.weather["temp_avg"] == 4.0
+        # The week without cases counts 0 instead of shifting the lags
+        assert series.previous_cases == [6, 0, 8, 9]
+        assert [week and week[0] for week in series.history] == [1.0, None, 3.0]
+
+    def test_series_without_weather_up_to_its_cases_are_skipped(self):
+        from datetime import datetime
+
+        from src.services.forecasting import build_series
+
+        cases = {(1, 7): [(datetime(2024, 3, day), 1) for day in (4, 11, 18, 25)]}
+        weather = {7: [(datetime(2024, 4, 1), self.WEATHER)]}
+        assert build_series(cases, weather) == ([], 1)
+
+
+class TestProcessInferencePool:
+    """Batches scored on worker processes through shared memory"""
+
+    HISTORY_ROW = {
+        **SAMPLE_INPUTS[0],
+        "history": (None, (26.0, 30.0, 75.0), (27.0, 60.0, 80.0)),
+    }
+
+    def test_packed_block_builds_the_same_matrix(self, predictor):
+        rows = SAMPLE_INPUTS + [self.HISTORY_ROW]
+        block = pack_inputs(rows, np.empty((8, INPUT_BLOCK_WIDTH)))
+        builder = predictor._feature_builder
+        np.testing.assert_array_equal(
+            builder.build_matrix_from_arrays(*unpack_inputs(block)),
+            builder.build_matrix(rows),
+        )
+        assert unpack_inputs(pack_inputs(SAMPLE_INPUTS, block))[2] is None
+
+    def test_pool_matches_in_thread_scoring(self, predictor):
+        rows = SAMPLE_INPUTS * 3 + [self.HISTORY_ROW]
+        pool = ProcessInferencePool(str(MODEL_PATH), processes=1, max_rows=2)
+        try:
+            predicted, versions = pool.predict(rows)
+            assert versions == {predictor.version}
+            expected = [r["predicted_cases"] for r in predictor.predict_batch(rows)]
+            np.testing.assert_allclose(predicted, expected, rtol=1e-6)
+            # Chunks larger than the slot count recycle slots
+            assert pool.get_stats()["free_slots"] == pool.get_stats()["slots"]
+            assert pool.get_stats()["batches"] == 5
+        finally:
+            pool.shutdown()
+
+    def test_service_process_mode(self):
+        service = ModelService(str(MODEL_PATH), inference_mode="process")
+        try:
+            assert "processes" in service.get_executor_stats()
+            results = service.predict_outbreak_batch(SAMPLE_INPUTS)
+            expected = service.predictor.predict_batch(SAMPLE_INPUTS)
+            assert [r["risk_level"] for r in results] == [
+                r["risk_level"] for r in expected
+            ]
+            assert service.reload_model()
+        finally:
+            service.shutdown()
+
+
+class TestInferenceSidecar:
+    """Shared per-host inference server reached over a Unix socket"""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        import asyncio
+        import threading
+
+        server = InferenceServer(str(tmp_path / "inference.sock"), batch_window_ms=5)
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(server.start())
+            started.set()
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        assert started.wait(10)
+        yield server
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(10)
+
+    def test_frames_round_trip(self):
+        frame = encode_request(1, "/models/a.ubj", b"payload")
+        assert decode_request(frame[4:]) == (1, "/models/a.ubj", b"payload")
+        block = pack_inputs(SAMPLE_INPUTS, np.empty((3, INPUT_BLOCK_WIDTH)))
+        np.testing.assert_array_equal(decode_block(encode_block(block)), block)
+        with pytest.raises(ValueError):
+            decode_block(encode_block(block)[:-8])
+
+    def test_remote_predictor_matches_local(self, server, predictor):
+        client = InferenceClient(server.socket_path, timeout=10)
+        remote = RemotePredictor(str(MODEL_PATH), client)
+        assert remote.is_loaded()
+        assert remote.version == predictor.version
+        assert remote.get_model_info()["inference_backend"].startswith("sidecar:")
+
+        rows = SAMPLE_INPUTS + [
+            {**SAMPLE_INPUTS[0], "history": (None, (26.0, 30.0, 75.0), None)}
+        ]
+        assert remote.predict_batch(rows) == pytest.approx(
+            predictor.predict_batch(rows)
+        )
+        assert remote.predict(**SAMPLE_INPUTS[1]) == pytest.approx(
+            predictor.predict(**SAMPLE_INPUTS[1])
+        )
+        with pytest.raises(SidecarError):
+            client.info("/missing/model.ubj")
+        client.close()
+
+    def test_models_outside_model_dirs_are_refused(self, server, tmp_path):
+        import os
+        import shutil
+        import stat
+
+        # No access for group or others
+        assert stat.S_IMODE(os.stat(server.socket_path).st_mode) & 0o077 == 0
+        outside = tmp_path / "model.pkl"
+        shutil.copy(MODEL_PATH, outside)
+        client = InferenceClient(server.socket_path, timeout=10)
+        with pytest.raises(SidecarError, match="outside the sidecar's model"):
+            client.info(str(outside))
+        assert client.info(str(MODEL_PATH))["model_version"]
+        client.close()
+
+    def test_models_are_loaded_and_cached_by_resolved_path(self, server):
+        import os
+
+        relative = os.path.relpath(
+            MODEL_PATH.parent / ".." / "models" / MODEL_PATH.name
+        )
+        server._load(relative)
+        assert list(server._predictors) == [str(MODEL_PATH.resolve())]
+
+    def test_requests_are_not_resent_after_a_timeout(self, tmp_path):
+        import socket
+        import threading
+
+        path = str(tmp_path / "silent.sock")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen()
+        received = []
+
+        def accept():
+            # Reads requests but never answers them
+            while True:
+                try:
+                    connection, _ = listener.accept()
+                except OSError:
+                    return
+                received.append(connection.recv(65536))
+
+        threading.Thread(target=accept, daemon=True).start()
+        client = InferenceClient(path, timeout=0.2)
+        with pytest.raises(TimeoutError):
+            client.info(str(MODEL_PATH))
+        assert len(received) == 1
+        client.close()
+        listener.close()
+
+    async def test_concurrent_requests_share_batches(self, server):
+        import asyncio
+
+        client = InferenceClient(server.socket_path, timeout=10)
+        service = ModelService(str(MODEL_PATH), sidecar=client)
+        assert service.is_model_loaded()
+        assert service.predictor.model is None
+
+        results = await asyncio.gather(
+            *[service.predict_outbreak_batch_async([row]) for row in SAMPLE_INPUTS]
+        )
+        assert [r[0]["risk_level"] for r in results] == [
+            r["risk_level"]
+            for r in OutbreakPredictor(str(MODEL_PATH)).predict_batch(SAMPLE_INPUTS)
+        ]
+        assert service.reload_model()
+        service.shutdown()
+
+    def test_unreachable_sidecar_leaves_model_unloaded(self, tmp_path):
+        client = InferenceClient(str(tmp_path / "nothing.sock"), timeout=1)
+        service = ModelService(str(MODEL_PATH), sidecar=client)
+        assert not service.is_model_loaded()
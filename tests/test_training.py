@@ -0,0 +1,217 @@
+"""
+Tests for Model Training
+
+Test DengAI loading, feature parity with the notebook, rolling-origin folds,
+artifacts written by a training run and backtests.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.backtesting import backtest, backtest_origins
+from src.models.features import FEATURE_NAMES
+from src.models.predictor import OutbreakPredictor
+from src.models.training import (
+    build_training_set,
+    cross_validate,
+    load_dengai_csv,
+    rolling_origin_folds,
+    train_model,
+)
+
+SMALL_GRID = [
+    {"n_estimators": 20, "max_depth": 2, "learning_rate": 0.3},
+    {"n_estimators": 40, "max_depth": 3, "learning_rate": 0.1},
+]
+
+
+@pytest.fixture
+def dengai_dir(tmp_path):
+    """Two cities of DengAI-shaped CSVs with a few missing readings"""
+    rng = np.random.default_rng(0)
+    rows, labels = [], []
+    for city, weeks in (("sj", 120), ("iq", 80)):
+        for i, start in enumerate(
+            pd.date_range("2000-01-03", periods=weeks, freq="7D")
+        ):
+            year, week, _ = start.isocalendar()
+            rows.append(
+                {
+                    "city": city,
+                    "year": year,
+                    "weekofyear": week,
+                    "week_start_date": start.date().isoformat(),
+                    "precipitation_amt_mm": rng.uniform(0, 100),
+                    "reanalysis_avg_temp_k": rng.uniform(297, 302),
+                    "reanalysis_min_air_temp_k": rng.uniform(292, 296),
+                    "reanalysis_max_air_temp_k": rng.uniform(302, 306),
+                    "reanalysis_relative_humidity_percent": (
+                        np.nan if i == 10 else rng.uniform(60, 95)
+                    ),
+                }
+            )
+            labels.append(
+                {
+                    "city": city,
+                    "year": year,
+                    "weekofyear": week,
+                    "total_cases": int(30 + 20 * np.sin(i / 8) + rng.poisson(4)),
+                }
+            )
+    pd.DataFrame(rows).to_csv(tmp_path / "dengue_features_train.csv", index=False)
+    pd.DataFrame(labels).to_csv(tmp_path / "dengue_labels_train.csv", index=False)
+    return tmp_path
+
+
+def notebook_features(city: pd.DataFrame) -> pd.DataFrame:
+    """``create_features`` from the training notebook"""
+    df = city.rename(columns={"cases": "total_cases"}).copy()
+    for lag in [1, 2, 3, 4]:
+        df[f"cases_lag_{lag}"] = df["total_cases"].shift(lag)
+    for window in [2, 4]:
+        df[f"temp_avg_roll_{window}w"] = df["temp_avg"].rolling(window).mean()
+        df[f"precip_roll_{window}w"] = df["precipitation_mm"].rolling(window).mean()
+        df[f"humidity_roll_{window}w"] = df["humidity_percent"].rolling(window).mean()
+    df["week_sin"] = np.sin(2 * np.pi * df["weekofyear"] / 52)
+    df["week_cos"] = np.cos(2 * np.pi * df["weekofyear"] / 52)
+    return df.dropna()
+
+
+class TestTrainingData:
+    def test_load_converts_and_fills(self, dengai_dir):
+        history = load_dengai_csv(dengai_dir, ["sj"])
+        assert len(history) == 120
+        assert history["temp_avg"].between(23, 29).all()
+        assert not history["humidity_percent"].isna().any()
+
+    def test_missing_labels_point_to_download(self, dengai_dir):
+        (dengai_dir / "dengue_labels_train.csv").unlink()
+        with pytest.raises(FileNotFoundError, match="drivendata"):
+            load_dengai_csv(dengai_dir)
+
+    def test_features_match_notebook(self, dengai_dir):
+        history = load_dengai_csv(dengai_dir, ["sj"])
+        training_set = build_training_set(history)
+        expected = notebook_features(history)
+
+        assert len(training_set) == len(expected)
+        np.testing.assert_allclose(
+            training_set.features, expected[list(FEATURE_NAMES)].to_numpy()
+        )
+        np.testing.assert_array_equal(training_set.target, expected["total_cases"])
+
+    def test_rows_sorted_by_week_across_series(self, dengai_dir):
+        training_set = build_training_set(load_dengai_csv(dengai_dir))
+        assert len(training_set) == (120 - 4) + (80 - 4)
+        assert (np.diff(training_set.dates) >= np.timedelta64(0, "D")).all()
+        assert set(training_set.series) == {"sj", "iq"}
+
+
+class TestRollingOriginFolds:
+    def test_folds_expand_without_lookahead(self):
+        dates = np.repeat(np.arange(100), 2)
+        folds = rolling_origin_folds(dates, 5)
+
+        assert len(folds) == 5
+        assert folds[0][0] == 100
+        assert folds[-1][1] == len(dates)
+        for (_, test_end), (train_end, _) in zip(folds, folds[1:]):
+            assert train_end == test_end
+        for train_end, test_end in folds:
+            assert dates[train_end - 1] < dates[train_end]
+
+    def test_too_little_history(self):
+        with pytest.raises(ValueError):
+            rolling_origin_folds(np.arange(4), 5)
+
+
+class TestTrainModel:
+    def test_writes_loadable_artifact(self, dengai_dir, tmp_path):
+        training_set = build_training_set(load_dengai_csv(dengai_dir))
+        result = train_model(
+            training_set,
+            tmp_path / "trained.ubj",
+            param_grid=SMALL_GRID,
+            folds=3,
+            processes=1,
+        )
+
+        assert result.params in SMALL_GRID
+        assert [score.folds for score in result.candidates] == [3, 3]
+        assert result.candidates[0].rmse <= result.candidates[1].rmse
+
+        predictor = OutbreakPredictor(str(result.artifact_path))
+        assert predictor.is_loaded()
+        assert predictor.version == result.model_version
+        assert predictor.feature_columns == list(FEATURE_NAMES)
+        assert predictor.outbreak_threshold == result.outbreak_threshold
+        assert predictor.get_drift_stats()["reference"] is True
+
+    def test_process_pool_matches_in_process(self, dengai_dir):
+        training_set = build_training_set(load_dengai_csv(dengai_dir, ["sj"]))
+        inline = cross_validate(training_set, SMALL_GRID, folds=3, processes=1)
+        pooled = cross_validate(training_set, SMALL_GRID, folds=3, processes=2)
+        assert [score.to_dict() for score in pooled] == pytest.approx(
+            [score.to_dict() for score in inline]
+        )
+
+
+class TestBacktest:
+    def test_origins_partition_the_scored_weeks(self):
+        dates = np.repeat(np.arange(50), 3)
+        blocks = backtest_origins(dates, min_train_weeks=20, step_weeks=8)
+
+        assert blocks[0][0] == 60
+        assert blocks[-1][1] == len(dates)
+        assert all(end == start for (_, end), (start, _) in zip(blocks, blocks[1:]))
+        with pytest.raises(ValueError):
+            backtest_origins(dates, min_train_weeks=50, step_weeks=8)
+
+    def test_fixed_model_metrics_per_series(self, dengai_dir, tmp_path):
+        history = load_dengai_csv(dengai_dir)
+        result = train_model(
+            build_training_set(history),
+            tmp_path / "trained.ubj",
+            param_grid=SMALL_GRID[:1],
+            folds=2,
+            processes=1,
+        )
+        predictor = OutbreakPredictor(str(result.artifact_path))
+        training_set = build_training_set(history, predictor.feature_columns)
+
+        report = backtest(
+            training_set, predictor=predictor, min_train_weeks=20, step_weeks=10
+        )
+
+        assert [row.series for row in report.series] == ["iq", "sj"]
+        assert report.overall.weeks == sum(row.weeks for row in report.series)
+        scored = training_set.dates >= np.unique(training_set.dates)[20]
+        sj = scored & (training_set.series == "sj")
+        predicted, _, _ = predictor.score_matrix(training_set.features[sj])
+        expected = np.abs(predicted - training_set.target[sj]).mean()
+        assert report.series[1].mae == pytest.approx(expected)
+
+    @pytest.mark.parametrize("window", ["expanding", "rolling"])
+    def test_refit_at_each_origin(self, dengai_dir, window):
+        training_set = build_training_set(load_dengai_csv(dengai_dir, ["sj"]))
+        report = backtest(
+            training_set,
+            params=SMALL_GRID[0],
+            window=window,
+            window_weeks=30,
+            min_train_weeks=60,
+            step_weeks=20,
+            processes=1,
+        )
+
+        assert report.window == window
+        assert report.origins == 3
+        assert report.overall.weeks == 116 - 60
+        assert 0.0 <= report.overall.precision <= 1.0
+        assert 0.0 <= report.overall.recall <= 1.0
+
+    def test_needs_exactly_one_model_source(self, dengai_dir):
+        training_set = build_training_set(load_dengai_csv(dengai_dir, ["sj"]))
+        with pytest.raises(ValueError):
+            backtest(training_set, min_train_weeks=20)